@@ -1,4 +1,6 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+
+from app.api.responses import frame_response
 from app.services.cb_replenishment import load_cb_replenishment
 
 router = APIRouter(
@@ -8,7 +10,7 @@ router = APIRouter(
 
 
 @router.get("/")
-def get_cb_replenishment():
+def get_cb_replenishment(request: Request, columnar: bool = False):
 
     try:
 
@@ -49,10 +51,13 @@ def get_cb_replenishment():
             "po_requirement"
         ]]
 
-        return {
-            "data": response_df.to_dict(orient="records"),
-            "total_models": len(response_df)
-        }
+        return frame_response(
+            response_df,
+            request,
+            columnar=columnar,
+            data_key="data",
+            extra={"total_models": len(response_df)},
+        )
 
     except Exception as e:
 
@@ -0,0 +1,146 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.services.exports import (
+    EXPORT_FORMATS,
+    XLSX_MEDIA_TYPE,
+    ExportError,
+    export_chunks,
+    xlsx_chunks,
+)
+from app.services.fc_final_allocation import calculate_final_allocation
+from app.services.fc_planning import calculate_fc_plan
+from app.services.fc_transfer import calculate_fc_transfers
+from app.services.replenishment import calculate_replenishment
+
+
+# =================================================
+# ROUTER SETUP
+# =================================================
+router = APIRouter(
+    prefix="/export",
+    tags=["export"],
+)
+
+
+def export_response(df, name: str, fmt: str) -> StreamingResponse:
+    """
+    Streams df as CSV / Arrow IPC / Parquet, batch by batch.
+    """
+
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"format must be one of {sorted(EXPORT_FORMATS)}",
+        )
+
+    media_type, extension = EXPORT_FORMATS[fmt]
+
+    try:
+        chunks = export_chunks(df, fmt)
+    except ExportError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename={name}.{extension}"
+        }
+    )
+
+
+def xlsx_response(sheets, name: str) -> StreamingResponse:
+    """
+    Streams an XLSX workbook, one sheet per (sheet name, frame).
+    """
+
+    try:
+        chunks = xlsx_chunks(sheets)
+    except ExportError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+    return StreamingResponse(
+        chunks,
+        media_type=XLSX_MEDIA_TYPE,
+        headers={
+            "Content-Disposition": f"attachment; filename={name}.xlsx"
+        }
+    )
+
+
+# =================================================
+# EXPORT ENDPOINTS
+# =================================================
+@router.get("/fc-final-allocation")
+def export_final_allocation(
+    format: str = Query(default="parquet", description="csv / arrow / parquet"),
+    replenish_weeks: int = Query(default=8, ge=1),
+    channel: str = Query(default="All"),
+    account: str = Query(default="Nexlev"),
+    round_to_carton: bool = Query(default=False),
+    window_days: int = Query(default=90, ge=1, le=365),
+):
+    df = calculate_final_allocation(
+        replenish_weeks=replenish_weeks,
+        channel=channel,
+        account=account,
+        round_to_carton=round_to_carton,
+        window_days=window_days
+    )
+
+    return export_response(df, "fc_allocation", format)
+
+
+@router.get("/replenishment")
+def export_replenishment(
+    format: str = Query(default="parquet", description="csv / arrow / parquet"),
+    sales_window: int = Query(default=4, ge=1),
+    replenish_weeks: int = Query(default=8, ge=1),
+    account: str = Query(default="NEXLEV"),
+    round_to_carton: bool = Query(default=False),
+):
+    df = calculate_replenishment(
+        sales_window=sales_window,
+        replenish_weeks=replenish_weeks,
+        account=account,
+        round_to_carton=round_to_carton
+    )
+
+    return export_response(df, "replenishment", format)
+
+
+@router.get("/fc-planning")
+def export_fc_planning(
+    format: str = Query(default="parquet", description="csv / arrow / parquet"),
+    replenish_weeks: int = Query(default=8, ge=1),
+    channel: str = Query(default="All"),
+    account: str = Query(default="Nexlev"),
+    window_days: int = Query(default=90, ge=1, le=365),
+):
+    df = calculate_fc_plan(
+        replenish_weeks=replenish_weeks,
+        channel=channel,
+        account=account,
+        window_days=window_days
+    )
+
+    return export_response(df, "fc_planning", format)
+
+
+@router.get("/fc-transfer")
+def export_fc_transfer(
+    format: str = Query(default="parquet", description="csv / arrow / parquet"),
+    replenish_weeks: int = Query(default=8, ge=1),
+    channel: str = Query(default="All"),
+    account: str = Query(default="Nexlev"),
+    window_days: int = Query(default=90, ge=1, le=365),
+):
+    df = calculate_fc_transfers(
+        replenish_weeks=replenish_weeks,
+        channel=channel,
+        account=account,
+        window_days=window_days
+    )
+
+    return export_response(df, "fc_transfers", format)
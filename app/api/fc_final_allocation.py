@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Query
-from fastapi.responses import StreamingResponse
-import io
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 
+from app.api.exports import export_response, xlsx_response
+from app.api.responses import etag_headers, not_modified
+from app.api.table_query import TableQuery, query_response, table_query
 from app.services.fc_final_allocation import calculate_final_allocation
+from app.services.master_carton import carton_version
 
 
 # =================================================
@@ -19,6 +21,7 @@ router = APIRouter(
 # =================================================
 @router.get("/fc-final-allocation")
 def get_fc_final_allocation(
+    request: Request,
     replenish_weeks: int = Query(
         default=8,
         ge=1,
@@ -31,7 +34,22 @@ def get_fc_final_allocation(
     account: str = Query(
         default="Nexlev",
         description="Account selector: Nexlev / Viomi"
-    )
+    ),
+    round_to_carton: bool = Query(
+        default=False,
+        description="Round send_qty up to the model's master carton"
+    ),
+    window_days: int = Query(
+        default=90,
+        ge=1,
+        le=365,
+        description="Shipment window (days) the FC velocity is measured over"
+    ),
+    columnar: bool = Query(
+        default=False,
+        description='Columnar body: {"columns": [...], "data": [[...]]}'
+    ),
+    query: TableQuery = Depends(table_query),
 ):
     """
     Final FC Allocation API (JSON)
@@ -39,50 +57,99 @@ def get_fc_final_allocation(
 
     print("🚨 ACCOUNT FROM API:", account)
 
+    headers = etag_headers(
+        request, extra=(carton_version(),) if round_to_carton else ()
+    )
+    cached = not_modified(request, headers)
+    if cached:
+        return cached
+
     df = calculate_final_allocation(
         replenish_weeks=replenish_weeks,
         channel=channel,
-        account=account
+        account=account,
+        round_to_carton=round_to_carton,
+        window_days=window_days
     )
 
-    if df is None or df.empty:
-        return []
-
-    return df.to_dict(orient="records")
+    return query_response(df, request, query, columnar=columnar, headers=headers)
 
 
 # =================================================
-# FINAL FC ALLOCATION EXPORT API (CSV)
+# FINAL FC ALLOCATION EXPORT API (CSV / XLSX PACK)
 # =================================================
 @router.get("/fc-final-allocation/export")
 def export_fc_final_allocation(
     replenish_weeks: int = 8,
     channel: str = "All",
-    account: str = "Nexlev"
+    account: str = "Nexlev",
+    round_to_carton: bool = False,
+    format: str = "csv",
+    accounts: str = "Nexlev,Viomi",
+    split_by: str = "account",
+    window_days: int = Query(default=90, ge=1, le=365),
 ):
     """
-    Final FC Allocation Export API (CSV)
+    Final FC Allocation Export API (CSV, or xlsx / arrow / parquet)
+
+    format=xlsx builds an allocation pack:
+      split_by=account -> one sheet per account in `accounts`
+      split_by=fc      -> one sheet per fulfillment center of `account`
     """
 
     print("🚨 EXPORT ACCOUNT FROM API:", account)
 
+    if format == "xlsx":
+        if split_by not in ("account", "fc"):
+            raise HTTPException(
+                status_code=400,
+                detail="split_by must be 'account' or 'fc'",
+            )
+
+        if split_by == "account":
+            names = [a.strip() for a in accounts.split(",") if a.strip()]
+
+            # Generator: one account frame in memory at a time
+            sheets = (
+                (name, calculate_final_allocation(
+                    replenish_weeks=replenish_weeks,
+                    channel=channel,
+                    account=name,
+                    round_to_carton=round_to_carton,
+                    window_days=window_days
+                ))
+                for name in names
+            )
+
+            return xlsx_response(sheets, "fc_allocation_pack")
+
+        df = calculate_final_allocation(
+            replenish_weeks=replenish_weeks,
+            channel=channel,
+            account=account,
+            round_to_carton=round_to_carton,
+            window_days=window_days
+        )
+
+        if df is None or df.empty:
+            sheets = []
+        else:
+            sheets = (
+                (fc, group)
+                for fc, group in df.groupby("fulfillment_center", sort=True)
+            )
+
+        return xlsx_response(sheets, f"fc_allocation_{account.lower()}_by_fc")
+
     df = calculate_final_allocation(
         replenish_weeks=replenish_weeks,
         channel=channel,
-        account=account
+        account=account,
+        round_to_carton=round_to_carton,
+        window_days=window_days
     )
 
-    if df is None or df.empty:
+    if format == "csv" and (df is None or df.empty):
         return []
 
-    stream = io.StringIO()
-    df.to_csv(stream, index=False)
-    stream.seek(0)
-
-    return StreamingResponse(
-        stream,
-        media_type="text/csv",
-        headers={
-            "Content-Disposition": "attachment; filename=fc_allocation.csv"
-        }
-    )
\ No newline at end of file
+    return export_response(df, "fc_allocation", format)
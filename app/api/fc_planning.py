@@ -1,6 +1,10 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Depends, Query, Request
 from typing import Optional
-from app.services.fc_planning import calculate_fc_plan
+
+from app.api.params import int_list, week_range
+from app.api.responses import etag_headers, frame_response, not_modified
+from app.api.table_query import TableQuery, query_response, table_query
+from app.services.fc_planning import calculate_fc_plan, calculate_fc_plan_sweep
 
 router = APIRouter(
     prefix="/fc-planning",
@@ -12,25 +16,45 @@ router = APIRouter(
 # =================================================
 @router.get("")
 def get_fc_planning(
+    request: Request,
     replenish_weeks: int = Query(default=8, ge=1),
+    channel: str = Query(default="All"),
+    account: str = Query(default="Nexlev"),
+    window_days: int = Query(default=90, ge=1, le=365),
     sku: Optional[str] = None,
     fc: Optional[str] = None,
+    columnar: bool = Query(default=False),
+    query: TableQuery = Depends(table_query),
 ):
-    df = calculate_fc_plan(replenish_weeks)
+    headers = etag_headers(request)
+    cached = not_modified(request, headers)
+    if cached:
+        return cached
+
+    df = calculate_fc_plan(
+        replenish_weeks=replenish_weeks,
+        channel=channel,
+        account=account,
+        window_days=window_days
+    )
 
     # -----------------------------
-    # OPTIONAL FILTERS
+    # OPTIONAL FILTERS (shortcuts)
     # -----------------------------
+    filters = []
+
     if sku:
-        df = df[df["Merchant SKU"] == sku]
+        filters.append(("sku", "eq", sku.strip().upper()))
 
     if fc:
-        df = df[df["FC"] == fc]
+        filters.append(("fulfillment_center", "eq", fc.strip().upper()))
 
     # -----------------------------
-    # RETURN JSON (FAST)
+    # FILTER / SORT / PAGE + JSON
     # -----------------------------
-    return df.to_dict(orient="records")
+    return query_response(
+        df, request, query, columnar=columnar, headers=headers, filters=filters
+    )
 
 
 # =================================================
@@ -39,11 +63,19 @@ def get_fc_planning(
 @router.get("/summary")
 def get_fc_summary(
     replenish_weeks: int = Query(default=8, ge=1),
+    channel: str = Query(default="All"),
+    account: str = Query(default="Nexlev"),
+    window_days: int = Query(default=90, ge=1, le=365),
 ):
-    df = calculate_fc_plan(replenish_weeks)
+    df = calculate_fc_plan(
+        replenish_weeks=replenish_weeks,
+        channel=channel,
+        account=account,
+        window_days=window_days
+    )
 
     summary = (
-        df.groupby("Merchant SKU", as_index=False)
+        df.groupby("sku", as_index=False)
         .agg(
             total_required=("required_units", "sum"),
             total_inventory=("fc_inventory", "sum"),
@@ -51,4 +83,40 @@ def get_fc_summary(
         )
     )
 
-    return summary.to_dict(orient="records")
\ No newline at end of file
+    return summary.to_dict(orient="records")
+
+
+# =================================================
+# REPLENISH-WEEKS SENSITIVITY SWEEP
+# =================================================
+@router.get("/sweep")
+def get_fc_planning_sweep(
+    request: Request,
+    weeks_from: int = Query(default=1, ge=1, le=52),
+    weeks_to: int = Query(default=16, ge=1, le=52),
+    window_days: str = Query(default="90", description="e.g. 30,60,90"),
+    channel: str = Query(default="All"),
+    account: str = Query(default="Nexlev"),
+    columnar: bool = Query(default=True),
+):
+    """
+    FC required_units / fc_shortfall for each cover week in
+    weeks_from..weeks_to and each shipment window, in one response.
+    """
+
+    weeks = week_range(weeks_from, weeks_to)
+    windows = int_list(window_days, "window_days", high=365)
+
+    headers = etag_headers(request, policy="sweep")
+    cached = not_modified(request, headers)
+    if cached:
+        return cached
+
+    df = calculate_fc_plan_sweep(
+        replenish_weeks=weeks,
+        channel=channel,
+        account=account,
+        window_days=windows,
+    )
+
+    return frame_response(df, request, columnar=columnar, headers=headers)
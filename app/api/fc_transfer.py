@@ -1,4 +1,7 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Depends, Query, Request
+
+from app.api.responses import etag_headers, not_modified
+from app.api.table_query import TableQuery, query_response, table_query
 from app.services.fc_transfer import calculate_fc_transfers
 
 router = APIRouter(
@@ -8,9 +11,24 @@ router = APIRouter(
 
 @router.get("/fc-transfer")
 def get_fc_transfers(
-    replenish_weeks: int = Query(default=8, ge=1)
+    request: Request,
+    replenish_weeks: int = Query(default=8, ge=1),
+    channel: str = Query(default="All"),
+    account: str = Query(default="Nexlev"),
+    window_days: int = Query(default=90, ge=1, le=365),
+    columnar: bool = Query(default=False),
+    query: TableQuery = Depends(table_query),
 ):
+    headers = etag_headers(request)
+    cached = not_modified(request, headers)
+    if cached:
+        return cached
 
-    df = calculate_fc_transfers(replenish_weeks)
+    df = calculate_fc_transfers(
+        replenish_weeks=replenish_weeks,
+        channel=channel,
+        account=account,
+        window_days=window_days
+    )
 
-    return df.to_dict(orient="records")
\ No newline at end of file
+    return query_response(df, request, query, columnar=columnar, headers=headers)
\ No newline at end of file
@@ -1,14 +1,23 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+
+from app.api.responses import frame_response
 from app.services.fossil_replenishment_service import load_fossil_replenishment
 
 router = APIRouter(prefix="/api")
 
 @router.get("/fossil-replenishment")
-def get_fossil_replenishment(weeks: int = 8):
+def get_fossil_replenishment(
+    request: Request,
+    weeks: int = 8,
+    columnar: bool = False,
+):
 
     df = load_fossil_replenishment(weeks)
 
-    return {
-        "data": df.to_dict(orient="records"),
-        "total_skus": len(df)
-    }
\ No newline at end of file
+    return frame_response(
+        df,
+        request,
+        columnar=columnar,
+        data_key="data",
+        extra={"total_skus": len(df)},
+    )
\ No newline at end of file
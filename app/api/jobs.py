@@ -0,0 +1,282 @@
+import asyncio
+import json
+from typing import List, Optional
+
+from fastapi import APIRouter, Body, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+from app.api.replenishment import replenishment_rows
+from app.api.responses import frame_response, frames_response
+from app.services.fc_final_allocation import calculate_final_allocation
+from app.services.fc_planning import calculate_fc_plan, calculate_fc_plan_sweep
+from app.services.fc_transfer import calculate_fc_transfers
+from app.services.jobs import (
+    DONE,
+    FAILED,
+    JobError,
+    get_job,
+    job_kinds,
+    job_stats,
+    register_job,
+    submit_job,
+)
+from app.services.region_sales import calculate_region_sales
+from app.services.replenishment import (
+    REPLENISHMENT_ACCOUNTS,
+    SWEEP_MAX_WEEKS,
+    calculate_replenishment,
+    calculate_replenishment_all,
+    calculate_replenishment_sweep,
+)
+
+
+# =================================================
+# ROUTER SETUP
+# =================================================
+router = APIRouter(
+    prefix="/jobs",
+    tags=["jobs"],
+)
+
+# Seconds between two status events of /jobs/{id}/events
+EVENT_POLL_SECONDS = 0.5
+
+
+# =================================================
+# JOB PARAMETERS (SAME BOUNDS AS THE SYNC ENDPOINTS)
+# =================================================
+def _int_list(value, low: int = 1, high: Optional[int] = None) -> List[int]:
+    """
+    [4, 8] / "4,8" -> sorted, de-duplicated ints in low..high
+    (the int_list rules of the sweep endpoints).
+    """
+
+    if isinstance(value, str):
+        value = [v.strip() for v in value.split(",") if v.strip()]
+
+    if not isinstance(value, (list, tuple)):
+        raise ValueError("expected a list of integers or a comma-separated string")
+
+    values = set()
+    for v in value:
+        if isinstance(v, bool) or not isinstance(v, (int, str)):
+            raise ValueError(f"invalid integer {v!r}")
+        values.add(int(v))
+
+    if not values:
+        raise ValueError("list is empty")
+
+    values = sorted(values)
+    if values[0] < low or (high is not None and values[-1] > high):
+        bound = f"{low}-{high}" if high is not None else f">= {low}"
+        raise ValueError(f"values must be {bound}")
+
+    return values
+
+
+class _JobParams(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+
+class _PlanParams(_JobParams):
+    replenish_weeks: int = Field(default=8, ge=1)
+    channel: str = "All"
+    account: str = "Nexlev"
+    window_days: int = Field(default=90, ge=1, le=365)
+
+
+class ReplenishmentJob(_JobParams):
+    sales_window: int = Field(default=4, ge=1)
+    replenish_weeks: int = Field(default=8, ge=1)
+    account: str = "NEXLEV"
+    round_to_carton: bool = False
+
+
+class ReplenishmentAllJob(_JobParams):
+    sales_window: int = Field(default=4, ge=1)
+    replenish_weeks: int = Field(default=8, ge=1)
+    accounts: List[str] = Field(default=list(REPLENISHMENT_ACCOUNTS), min_length=1)
+    round_to_carton: bool = False
+
+    @field_validator("accounts", mode="before")
+    @classmethod
+    def _split(cls, v):
+        if isinstance(v, str):
+            return [a.strip() for a in v.split(",") if a.strip()]
+        return v
+
+
+class ReplenishmentSweepJob(_JobParams):
+    sales_windows: List[int] = [4]
+    replenish_weeks: List[int] = list(range(1, 17))
+    account: str = "NEXLEV"
+    round_to_carton: bool = False
+
+    @field_validator("sales_windows", mode="before")
+    @classmethod
+    def _windows(cls, v):
+        return _int_list(v)
+
+    @field_validator("replenish_weeks", mode="before")
+    @classmethod
+    def _weeks(cls, v):
+        return _int_list(v, 1, SWEEP_MAX_WEEKS)
+
+
+class FcPlanJob(_PlanParams):
+    pass
+
+
+class FcPlanSweepJob(_JobParams):
+    replenish_weeks: List[int] = list(range(1, 17))
+    channel: str = "All"
+    account: str = "Nexlev"
+    window_days: List[int] = [90]
+
+    @field_validator("replenish_weeks", mode="before")
+    @classmethod
+    def _weeks(cls, v):
+        return _int_list(v, 1, SWEEP_MAX_WEEKS)
+
+    @field_validator("window_days", mode="before")
+    @classmethod
+    def _windows(cls, v):
+        return _int_list(v, 1, 365)
+
+
+class FcTransfersJob(_PlanParams):
+    pass
+
+
+class FinalAllocationJob(_PlanParams):
+    round_to_carton: bool = False
+
+
+class RegionSalesJob(_JobParams):
+    account: str = "NEXLEV"
+    window_days: int = Field(default=30, ge=1, le=365)
+
+    @field_validator("account")
+    @classmethod
+    def _upper(cls, v):
+        return v.upper()
+
+
+def _validator(model):
+    return lambda params: model.model_validate(params).model_dump()
+
+
+# =================================================
+# JOB KINDS (ENGINE + RESPONSE SHAPING)
+# =================================================
+register_job("replenishment", calculate_replenishment, _validator(ReplenishmentJob))
+register_job("replenishment_all", calculate_replenishment_all, _validator(ReplenishmentAllJob))
+register_job("replenishment_sweep", calculate_replenishment_sweep, _validator(ReplenishmentSweepJob))
+register_job("fc_plan", calculate_fc_plan, _validator(FcPlanJob))
+register_job("fc_plan_sweep", calculate_fc_plan_sweep, _validator(FcPlanSweepJob))
+register_job("fc_transfers", calculate_fc_transfers, _validator(FcTransfersJob))
+register_job("final_allocation", calculate_final_allocation, _validator(FinalAllocationJob))
+register_job("region_sales", calculate_region_sales, _validator(RegionSalesJob))
+
+# Same row shape as the synchronous endpoints
+_SHAPERS = {
+    "replenishment": replenishment_rows,
+    "replenishment_all": lambda frames: {
+        account: replenishment_rows(df) for account, df in frames.items()
+    },
+}
+
+
+def _job_or_404(job_id: str):
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired job: {job_id}")
+    return job
+
+
+# =================================================
+# ENDPOINTS
+# =================================================
+@router.get("")
+def list_job_kinds():
+    return {"kinds": job_kinds(), **job_stats()}
+
+
+@router.post("/{kind}", status_code=202)
+def submit(kind: str, params: dict = Body(default={})):
+    """
+    Queues a computation, e.g.
+        POST /jobs/final_allocation  {"replenish_weeks": 8, "account": "Nexlev"}
+    Returns the job (an identical queued / running job is reused).
+    """
+
+    try:
+        job = submit_job(kind, params)
+    except JobError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return job.info()
+
+
+@router.get("/{job_id}")
+def status(job_id: str):
+    return _job_or_404(job_id).info()
+
+
+@router.get("/{job_id}/result")
+def result(
+    job_id: str,
+    request: Request,
+    columnar: bool = Query(default=False),
+):
+    """
+    The job's result in the same shape as the synchronous endpoint;
+    202 + job status while it is still queued / running.
+    """
+
+    job = _job_or_404(job_id)
+
+    if job.status == FAILED:
+        raise HTTPException(status_code=500, detail=job.error)
+
+    if job.status != DONE:
+        return JSONResponse(status_code=202, content=job.info())
+
+    data = _SHAPERS.get(job.kind, lambda r: r)(job.result)
+
+    if isinstance(data, dict):
+        return frames_response(data, request, columnar=columnar)
+
+    return frame_response(data, request, columnar=columnar)
+
+
+@router.get("/{job_id}/events")
+async def events(job_id: str):
+    """
+    Server-sent events: one "status" event per change, the stream
+    ends once the job is done / failed.
+    """
+
+    job = _job_or_404(job_id)
+
+    async def stream():
+        last = None
+
+        while True:
+            info = job.info()
+
+            if info["status"] != last:
+                last = info["status"]
+                yield f"event: status\ndata: {json.dumps(info, default=str)}\n\n"
+
+            if job.status in (DONE, FAILED):
+                break
+
+            await asyncio.sleep(EVENT_POLL_SECONDS)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
@@ -1,8 +1,16 @@
 from dotenv import load_dotenv
 load_dotenv()
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.services.pipeline import (
+    request_scope,
+    server_timing_header,
+    stage_stats,
+)
+from app.services.input_cache import input_cache_stats
+from app.services.result_cache import result_cache_stats
+
 
 # =====================================================
 # IMPORT ROUTERS
@@ -19,6 +27,9 @@ from app.api.china_reorder_working import router as china_reorder_working_router
 from app.api.cb_replenishment import router as cb_replenishment_router
 from app.api.fossil_replenishment import router as fossil_router
 from app.api.master_carton import router as master_carton_router
+from app.api.exports import router as exports_router
+from app.api.jobs import router as jobs_router
+from app.api.sku import router as sku_router
 
 
 
@@ -29,7 +40,7 @@ app = FastAPI(
     title="AM Inventory Replenishment API",
     version="1.0.0"
 )
-from app.db import engine
+from app.db import engine, pool_stats
 from app.core.models.base import Base
 
 @app.on_event("startup")
@@ -49,8 +60,45 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Server-Timing"],
 )
 
+# =====================================================
+# PIPELINE REQUEST SCOPE + STAGE TIMINGS
+# =====================================================
+@app.middleware("http")
+async def pipeline_scope(request: Request, call_next):
+    with request_scope() as scope:
+        response = await call_next(request)
+
+    if scope["timings"]:
+        response.headers["Server-Timing"] = server_timing_header(
+            scope["timings"]
+        )
+
+    return response
+
+
+@app.get("/diagnostics/stages")
+def diagnostics_stages():
+    return stage_stats()
+
+
+@app.get("/diagnostics/input-cache")
+def diagnostics_input_cache():
+    return input_cache_stats()
+
+
+@app.get("/diagnostics/result-cache")
+def diagnostics_result_cache():
+    return result_cache_stats()
+
+
+@app.get("/diagnostics/db-pool")
+def diagnostics_db_pool():
+    return pool_stats()
+
+
 # =====================================================
 # HEALTH CHECK
 # =====================================================
@@ -74,6 +122,9 @@ app.include_router(china_reorder_working_router)
 app.include_router(cb_replenishment_router, prefix="/api")
 app.include_router(fossil_router)
 app.include_router(master_carton_router)
+app.include_router(exports_router)
+app.include_router(jobs_router)
+app.include_router(sku_router)
 
 # =====================================================
 # ROOT
@@ -1,6 +1,8 @@
 from fastapi import APIRouter
 from sqlalchemy import text
+from app.core.ingestion.ingest_batches import bump_data_version
 from app.db import engine
+from app.services.master_carton import set_carton
 
 # =====================================================
 # ROUTER SETUP
@@ -22,7 +24,7 @@ def save_master_carton(data: dict):
     if not model:
         return {"status": "error", "message": "model missing"}
 
-    with engine.connect() as conn:
+    with engine.begin() as conn:
         conn.execute(
             text("""
                 INSERT INTO master_cartons (model, master_carton)
@@ -35,7 +37,12 @@ def save_master_carton(data: dict):
                 "master_carton": master_carton
             }
         )
-        conn.commit()
+
+        # Cached round_to_carton results of every worker are stale now
+        bump_data_version(conn)
+
+    # Keep the in-memory carton map used by the planning engines current
+    set_carton(model, master_carton)
 
     return {
         "status": "saved",
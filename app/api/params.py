@@ -0,0 +1,43 @@
+from typing import List
+
+from fastapi import HTTPException
+
+
+# =================================================
+# QUERY PARAMETER PARSING
+# =================================================
+def int_list(value: str, name: str, low: int = 1, high: int = None) -> List[int]:
+    """
+    "4,8,12" -> [4, 8, 12] (sorted, de-duplicated).
+    Raises 400 on non-integers or values outside low..high.
+    """
+
+    try:
+        values = sorted({int(v) for v in value.split(",") if v.strip()})
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{name} must be a comma-separated list of integers",
+        )
+
+    if not values:
+        raise HTTPException(status_code=400, detail=f"{name} is empty")
+
+    if values[0] < low or (high is not None and values[-1] > high):
+        bound = f"{low}-{high}" if high is not None else f">= {low}"
+        raise HTTPException(
+            status_code=400,
+            detail=f"{name} values must be {bound}",
+        )
+
+    return values
+
+
+def week_range(weeks_from: int, weeks_to: int) -> List[int]:
+    if weeks_to < weeks_from:
+        raise HTTPException(
+            status_code=400,
+            detail="weeks_to must be >= weeks_from",
+        )
+
+    return list(range(weeks_from, weeks_to + 1))
@@ -1,4 +1,7 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+
+from app.api.responses import etag_headers, not_modified
+from app.api.table_query import TableQuery, query_response, table_query
 from app.services.region_sales import calculate_region_sales
 
 # =================================================
@@ -14,23 +17,35 @@ router = APIRouter(
 # =================================================
 @router.get("")
 def get_region_sales(
-    account: str = Query(default="NEXLEV")
+    request: Request,
+    account: str = Query(default="NEXLEV"),
+    window_days: int = Query(default=30, ge=1, le=365),
+    columnar: bool = Query(default=False),
+    query: TableQuery = Depends(table_query),
 ):
     """
-    Returns region-wise sales (last 30 days)
+    Returns region-wise sales (last window_days days, default 30)
     Includes:
     - total_units_30d
     - weekly_velocity
     - revenue_30d
     """
 
+    headers = etag_headers(request, policy="region_sales")
+    cached = not_modified(request, headers)
+    if cached:
+        return cached
+
     try:
-        df = calculate_region_sales(account=account.upper())
+        df = calculate_region_sales(
+            account=account.upper(),
+            window_days=window_days
+        )
 
-        if df.empty:
-            return []
+        return query_response(df, request, query, columnar=columnar, headers=headers)
 
-        return df.to_dict(orient="records")
+    except HTTPException:
+        raise
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -1,7 +1,25 @@
-from fastapi import APIRouter, Query
-from app.services.replenishment import calculate_replenishment
+import numpy as np
+import pandas as pd
+from fastapi import APIRouter, Depends, Query, Request
+
+from app.api.params import int_list, week_range
+from app.api.table_query import TableQuery, query_response, table_query
+from app.api.responses import (
+    etag_headers,
+    frames_response,
+    not_modified,
+)
+from app.services.replenishment import (
+    REPLENISHMENT_ACCOUNTS,
+    SWEEP_MAX_WEEKS,
+    calculate_replenishment,
+    calculate_replenishment_all,
+    calculate_replenishment_sweep,
+)
 from app.services.fc_final_allocation import calculate_final_allocation
-from app.services.fc_planning import calculate_fc_plan, load_fc_data
+from app.services.fc_planning import calculate_fc_plan
+from app.services.master_carton import carton_version
+from app.services.pipeline import run_stage
 from app.services.validation_engine import run_full_validation
 
 
@@ -14,47 +32,163 @@ router = APIRouter(
 )
 
 
+# =================================================
+# RESPONSE SHAPING
+# =================================================
+def _carton_token(round_to_carton: bool) -> tuple:
+    # Carton-rounded results also change with the carton map
+    return (carton_version(),) if round_to_carton else ()
+
+
+def replenishment_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    calculate_replenishment output -> API row shape
+    (frontend depends on these exact keys).
+    """
+
+    if df is None or df.empty:
+        return None
+
+    # IXD Logic
+    if "Hazmat/non-Hazmat" in df.columns:
+        haz = df["Hazmat/non-Hazmat"].astype(str).str.strip()
+    else:
+        haz = pd.Series("", index=df.index)
+
+    int_cols = [
+        "sales_velocity",
+        "total_units_sold",
+        "amazon_inventory",
+        "inbound_inventory",
+        "ampm_inventory",
+        "required_units",
+        "replenishment_qty",
+        "warehouse_shortfall",
+    ]
+
+    out = pd.DataFrame({
+        "model": df["model"],
+        "asin": df["ASIN"].where(df["ASIN"].notna(), "").astype(str),
+        "sku": df["SKU"].where(df["SKU"].notna(), "").astype(str),
+    })
+
+    for col in int_cols:
+        out[col] = df[col].astype("int64")
+
+    out["is_risky"] = df["is_risky"].astype(bool)
+    out["is_overstock"] = df["is_overstock"].astype(bool)
+    out["ixd_type"] = np.where(haz == "Non-IXD Non Hazmat", "Non-IXD", "IXD")
+
+    return out
+
+
 # =================================================
 # REPLENISHMENT ENDPOINT
 # =================================================
 @router.get("/replenishment")
 def get_replenishment(
+    request: Request,
     sales_window: int = Query(default=4, ge=1),
     replenish_weeks: int = Query(default=8, ge=1),
     account: str = Query(default="NEXLEV"),
+    round_to_carton: bool = Query(default=False),
+    columnar: bool = Query(default=False),
+    query: TableQuery = Depends(table_query),
 ):
+    headers = etag_headers(request, extra=_carton_token(round_to_carton))
+    cached = not_modified(request, headers)
+    if cached:
+        return cached
+
     df = calculate_replenishment(
         sales_window=sales_window,
         replenish_weeks=replenish_weeks,
-        account=account
+        account=account,
+        round_to_carton=round_to_carton
     )
 
-    response = []
+    return query_response(
+        replenishment_rows(df), request, query, columnar=columnar, headers=headers
+    )
 
-    for _, row in df.iterrows():
 
-        # IXD Logic
-        haz = str(row.get("Hazmat/non-Hazmat", "")).strip()
-        ixd_type = "Non-IXD" if haz == "Non-IXD Non Hazmat" else "IXD"
+# =================================================
+# MULTI-ACCOUNT REPLENISHMENT ENDPOINT
+# =================================================
+@router.get("/replenishment/all")
+def get_replenishment_all(
+    request: Request,
+    sales_window: int = Query(default=4, ge=1),
+    replenish_weeks: int = Query(default=8, ge=1),
+    accounts: str = Query(default=",".join(REPLENISHMENT_ACCOUNTS)),
+    round_to_carton: bool = Query(default=False),
+    columnar: bool = Query(default=False),
+):
+    """
+    Every account's replenishment from one pass over the shared inputs.
+    Response: {account: <same rows as /replenishment>}
+    """
+
+    headers = etag_headers(request, extra=_carton_token(round_to_carton))
+    cached = not_modified(request, headers)
+    if cached:
+        return cached
+
+    names = [a.strip() for a in accounts.split(",") if a.strip()]
+
+    frames = calculate_replenishment_all(
+        sales_window=sales_window,
+        replenish_weeks=replenish_weeks,
+        accounts=names,
+        round_to_carton=round_to_carton
+    )
+
+    return frames_response(
+        {account: replenishment_rows(df) for account, df in frames.items()},
+        request,
+        columnar=columnar,
+        headers=headers,
+    )
+
 
-        response.append({
-            "model": row["model"],
-            "asin": str(row["ASIN"]) if row["ASIN"] == row["ASIN"] else "",
-            "sku": str(row["SKU"]) if row["SKU"] == row["SKU"] else "",
-            "sales_velocity": int(row["sales_velocity"]),
-            "total_units_sold": int(row["total_units_sold"]),
-            "amazon_inventory": int(row["amazon_inventory"]),
-            "inbound_inventory": int(row["inbound_inventory"]),   # ADD THIS
-            "ampm_inventory": int(row["ampm_inventory"]),
-            "required_units": int(row["required_units"]),
-            "replenishment_qty": int(row["replenishment_qty"]),
-            "warehouse_shortfall": int(row["warehouse_shortfall"]),
-            "is_risky": bool(row["is_risky"]),
-            "is_overstock": bool(row["is_overstock"]),
-            "ixd_type": ixd_type
-        })
+# =================================================
+# REPLENISH-WEEKS SENSITIVITY SWEEP
+# =================================================
+@router.get("/replenishment/sweep")
+def get_replenishment_sweep(
+    request: Request,
+    weeks_from: int = Query(default=1, ge=1, le=SWEEP_MAX_WEEKS),
+    weeks_to: int = Query(default=16, ge=1, le=SWEEP_MAX_WEEKS),
+    sales_windows: str = Query(default="4", description="e.g. 4,8,12"),
+    account: str = Query(default="NEXLEV"),
+    round_to_carton: bool = Query(default=False),
+    columnar: bool = Query(default=True),
+    query: TableQuery = Depends(table_query),
+):
+    """
+    Requirement / replenishment / shortfall of every model for each
+    cover week in weeks_from..weeks_to and each sales window, in one
+    response (the UI scrubs the grid client-side).
+    """
+
+    windows = int_list(sales_windows, "sales_windows")
+    weeks = week_range(weeks_from, weeks_to)
 
-    return response
+    headers = etag_headers(
+        request, policy="sweep", extra=_carton_token(round_to_carton)
+    )
+    cached = not_modified(request, headers)
+    if cached:
+        return cached
+
+    df = calculate_replenishment_sweep(
+        sales_windows=windows,
+        replenish_weeks=weeks,
+        account=account,
+        round_to_carton=round_to_carton
+    )
+
+    return query_response(df, request, query, columnar=columnar, headers=headers)
 
 
 # =================================================
@@ -62,17 +196,29 @@ def get_replenishment(
 # =================================================
 @router.get("/fc-final-allocation")
 def get_fc_final(
+    request: Request,
     replenish_weeks: int = Query(default=8, ge=1),
     channel: str = Query(default="All"),
     account: str = Query(default="NEXLEV"),
+    round_to_carton: bool = Query(default=False),
+    window_days: int = Query(default=90, ge=1, le=365),
+    columnar: bool = Query(default=False),
+    query: TableQuery = Depends(table_query),
 ):
+    headers = etag_headers(request, extra=_carton_token(round_to_carton))
+    cached = not_modified(request, headers)
+    if cached:
+        return cached
+
     df = calculate_final_allocation(
         replenish_weeks=replenish_weeks,
         channel=channel,
-        account=account
+        account=account,
+        round_to_carton=round_to_carton,
+        window_days=window_days
     )
 
-    return df.to_dict(orient="records")
+    return query_response(df, request, query, columnar=columnar, headers=headers)
 
 
 # =================================================
@@ -83,21 +229,25 @@ def fc_validation(
     replenish_weeks: int = Query(default=12, ge=1),
     channel: str = Query(default="All"),
     account: str = Query(default="NEXLEV"),
+    window_days: int = Query(default=90, ge=1, le=365),
 ):
-    # Load raw data
-    shipments, ledger = load_fc_data(account)
+    # Aggregated inputs (shared with the planning stage below)
+    fc_data = run_stage(
+        "fc_data", account=account, channel=channel, window_days=window_days
+    )
 
     # Run planning logic
     fc_plan_df = calculate_fc_plan(
         replenish_weeks=replenish_weeks,
         channel=channel,
-        account=account
+        account=account,
+        window_days=window_days
     )
 
     # Run validation engine
     validation_report = run_full_validation(
-        shipments,
-        ledger,
+        fc_data["shipments"],
+        fc_data["ledger"],
         fc_plan_df
     )
 
@@ -0,0 +1,231 @@
+import gzip
+import hashlib
+import json
+from typing import Iterable, Optional
+
+import pandas as pd
+from fastapi import Request, Response
+
+from app.services.result_cache import input_version
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+
+# =================================================
+# CONFIG
+# =================================================
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_BYTES = 1024
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+# Cache-Control per endpoint family. "no-cache" = the browser keeps the
+# body but revalidates every time (answered by a 304 while the inputs
+# are unchanged); max-age lets it skip the request for that long.
+CACHE_CONTROL = {
+    "plan": "private, no-cache",
+    "sweep": "private, max-age=60",
+    "region_sales": "private, max-age=300",
+}
+
+
+# =================================================
+# ENCODING
+# =================================================
+def frame_json(df: pd.DataFrame, columnar: bool = False) -> str:
+    """
+    DataFrame -> JSON text through pandas' C encoder.
+
+    columnar=False : [{"col": v, ...}, ...]   (same shape as to_dict("records"))
+    columnar=True  : {"columns": [...], "data": [[...], ...]}
+
+    NaN / NaT become null, timestamps ISO 8601.
+    """
+
+    if df is None or df.empty:
+        if columnar:
+            cols = [] if df is None else [str(c) for c in df.columns]
+            return json.dumps({"columns": cols, "data": []})
+        return "[]"
+
+    if columnar:
+        return df.to_json(orient="split", index=False, date_format="iso")
+
+    return df.to_json(orient="records", date_format="iso")
+
+
+def _accepted_encodings(request: Optional[Request]) -> set:
+    if request is None:
+        return set()
+
+    header = request.headers.get("accept-encoding", "")
+    accepted = set()
+
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0"):
+            continue
+        accepted.add(token.strip().lower())
+
+    return accepted
+
+
+def _negotiate(request: Optional[Request]) -> Optional[str]:
+    accepted = _accepted_encodings(request)
+
+    if HAS_BROTLI and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def _encode(
+    body: str,
+    request: Optional[Request],
+    headers: Optional[dict] = None,
+) -> Response:
+    payload = body.encode("utf-8")
+    headers = {"Vary": "Accept-Encoding", **(headers or {})}
+
+    if len(payload) >= MIN_COMPRESS_BYTES:
+        encoding = _negotiate(request)
+
+        if encoding == "br":
+            payload = brotli.compress(payload, quality=BROTLI_QUALITY)
+            headers["Content-Encoding"] = "br"
+
+        elif encoding == "gzip":
+            payload = gzip.compress(payload, compresslevel=GZIP_LEVEL)
+            headers["Content-Encoding"] = "gzip"
+
+    return Response(
+        content=payload,
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+# =================================================
+# CONDITIONAL REQUESTS (ETAG / 304)
+# =================================================
+def etag_headers(
+    request: Request,
+    policy: str = "plan",
+    extra: Iterable = (),
+) -> dict:
+    """
+    Strong ETag + Cache-Control of a response.
+
+    The ETag hashes the input version (DB data version + input files
+    fingerprint), the path, the query parameters, the negotiated
+    content encoding and `extra` (anything else the result depends on).
+    """
+
+    params = sorted(request.query_params.multi_items())
+
+    token = repr((
+        input_version(),
+        request.url.path,
+        params,
+        _negotiate(request),
+        tuple(extra),
+    ))
+
+    digest = hashlib.sha1(token.encode("utf-8")).hexdigest()
+
+    return {
+        "ETag": f'"{digest}"',
+        "Cache-Control": CACHE_CONTROL[policy],
+    }
+
+
+def not_modified(request: Request, headers: dict) -> Optional[Response]:
+    """
+    304 response when If-None-Match matches the ETag, else None.
+    Call before computing anything.
+    """
+
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+
+    tags = {t.strip().removeprefix("W/") for t in header.split(",")}
+
+    if headers["ETag"] in tags or "*" in tags:
+        return Response(
+            status_code=304,
+            headers={"Vary": "Accept-Encoding", **headers},
+        )
+
+    return None
+
+
+# =================================================
+# RESPONSE
+# =================================================
+def frame_response(
+    df: pd.DataFrame,
+    request: Optional[Request] = None,
+    columnar: bool = False,
+    data_key: Optional[str] = None,
+    extra: Optional[dict] = None,
+    headers: Optional[dict] = None,
+) -> Response:
+    """
+    JSON response for a DataFrame, bypassing the per-row dict build and
+    FastAPI's stdlib encoder.
+
+    data_key / extra wrap the frame in an envelope, e.g.
+        data_key="data", extra={"total_skus": n}
+        -> {"data": [...], "total_skus": n}
+
+    The body is brotli / gzip compressed when the client accepts it;
+    headers (e.g. from etag_headers) are added to the response.
+    """
+
+    body = frame_json(df, columnar=columnar)
+
+    if data_key is not None:
+        envelope = json.dumps(extra or {}, default=str)
+        rest = envelope[1:-1]
+        body = (
+            "{" + json.dumps(data_key) + ":" + body
+            + ("," + rest if rest else "") + "}"
+        )
+
+    return _encode(body, request, headers)
+
+
+def frames_response(
+    frames: dict,
+    request: Optional[Request] = None,
+    columnar: bool = False,
+    headers: Optional[dict] = None,
+    data_key: Optional[str] = None,
+    extra: Optional[dict] = None,
+) -> Response:
+    """
+    {key: frame} -> {"key": <frame JSON>, ...} in one response.
+
+    data_key / extra wrap it like frame_response:
+        {"<data_key>": {"key": <frame JSON>, ...}, **extra}
+    """
+
+    body = "{" + ",".join(
+        json.dumps(str(key)) + ":" + frame_json(df, columnar=columnar)
+        for key, df in frames.items()
+    ) + "}"
+
+    if data_key is not None:
+        rest = json.dumps(extra or {}, default=str)[1:-1]
+        body = (
+            "{" + json.dumps(data_key) + ":" + body
+            + ("," + rest if rest else "") + "}"
+        )
+
+    return _encode(body, request, headers)
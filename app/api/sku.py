@@ -0,0 +1,78 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from app.api.responses import etag_headers, frames_response, not_modified
+from app.services.sku_index import SKU_ENGINES, sku_360
+
+
+# =================================================
+# ROUTER SETUP
+# =================================================
+router = APIRouter(
+    prefix="/sku",
+    tags=["sku"],
+)
+
+
+# =================================================
+# SKU 360 (DRILL-DOWN)
+# =================================================
+@router.get("/{identifier}")
+def get_sku_360(
+    identifier: str,
+    request: Request,
+    account: str = Query(default="Nexlev"),
+    sales_window: int = Query(default=4, ge=1),
+    replenish_weeks: int = Query(default=8, ge=1),
+    channel: str = Query(default="All"),
+    window_days: int = Query(default=90, ge=1, le=365),
+    region_window_days: int = Query(default=30, ge=1, le=365),
+    engines: str = Query(default=",".join(SKU_ENGINES)),
+    columnar: bool = Query(default=False),
+):
+    """
+    One SKU (or model / ASIN) across replenishment, FC planning,
+    FC transfers, final allocation and region sales.
+
+    Served from per-engine hash indexes over the cached results
+    (built once per data version), not by recomputing the plans.
+    """
+
+    names = [e.strip() for e in engines.split(",") if e.strip()]
+    unknown = [e for e in names if e not in SKU_ENGINES]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown engine(s): {', '.join(unknown)}, expected {list(SKU_ENGINES)}",
+        )
+
+    headers = etag_headers(request)
+    cached = not_modified(request, headers)
+    if cached:
+        return cached
+
+    result = sku_360(
+        identifier,
+        params={
+            "account": account,
+            "sales_window": sales_window,
+            "replenish_weeks": replenish_weeks,
+            "channel": channel,
+            "window_days": window_days,
+            "region_window_days": region_window_days,
+        },
+        engines=names,
+    )
+
+    return frames_response(
+        result["frames"],
+        request,
+        columnar=columnar,
+        headers=headers,
+        data_key="engines",
+        extra={
+            "query": identifier,
+            "resolved": result["resolved"],
+            "errors": result["errors"],
+            "timings_ms": result["timings_ms"],
+        },
+    )
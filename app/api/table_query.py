@@ -0,0 +1,118 @@
+from typing import List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query, Request
+
+from app.api.responses import frame_response
+from app.services.frame_query import (
+    MAX_PAGE_ROWS,
+    QueryError,
+    parse_filter,
+    parse_sort,
+    run_query,
+)
+
+
+# =================================================
+# TABLE QUERY PARAMETERS
+# =================================================
+class TableQuery:
+    """
+    Parsed filter / sort / fields / paging parameters of a plan table.
+    """
+
+    def __init__(self, filters, sort_keys, fields, offset, limit, cursor):
+        self.filters = filters
+        self.sort_keys = sort_keys
+        self.fields = fields
+        self.offset = offset
+        self.limit = limit
+        self.cursor = cursor
+
+    @property
+    def active(self) -> bool:
+        return bool(
+            self.filters or self.sort_keys or self.fields
+            or self.offset or self.limit or self.cursor
+        )
+
+
+def table_query(
+    filters: List[str] = Query(
+        default=[],
+        alias="filter",
+        description="column:op:value (op: eq ne lt le gt ge in contains startswith), repeatable",
+    ),
+    sort: Optional[str] = Query(default=None, description="e.g. -send_qty,sku"),
+    fields: Optional[str] = Query(default=None, description="e.g. sku,fulfillment_center,send_qty"),
+    offset: int = Query(default=0, ge=0),
+    limit: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_ROWS),
+    cursor: Optional[str] = Query(default=None),
+) -> TableQuery:
+    """
+    FastAPI dependency shared by the plan table endpoints.
+    """
+
+    try:
+        parsed = [parse_filter(f) for f in filters]
+    except QueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return TableQuery(
+        filters=parsed,
+        sort_keys=parse_sort(sort),
+        fields=[f.strip() for f in fields.split(",") if f.strip()] if fields else None,
+        offset=offset,
+        limit=limit,
+        cursor=cursor,
+    )
+
+
+def query_response(
+    df,
+    request: Request,
+    query: TableQuery,
+    columnar: bool = False,
+    headers: Optional[dict] = None,
+    filters: Sequence[Tuple[str, str, str]] = (),
+):
+    """
+    Without table parameters: the full frame, as before.
+    With them: {"data": <page>, "total", "filtered", "offset", "limit",
+    "returned", "next_cursor"}.
+
+    filters: endpoint shortcut filters (e.g. ?sku=), applied with the
+    table filters; on their own they keep the plain frame response.
+    """
+
+    filters = list(filters)
+
+    if not query.active:
+        if filters:
+            try:
+                df, _ = run_query(df, filters=filters)
+            except QueryError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+        return frame_response(df, request, columnar=columnar, headers=headers)
+
+    try:
+        page, meta = run_query(
+            df,
+            filters=filters + query.filters,
+            sort_keys=query.sort_keys,
+            fields=query.fields,
+            offset=query.offset,
+            limit=query.limit,
+            cursor=query.cursor,
+        )
+    except QueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return frame_response(
+        page,
+        request,
+        columnar=columnar,
+        data_key="data",
+        extra=meta,
+        headers=headers,
+    )
@@ -1,5 +1,5 @@
 import pandas as pd
-from app.config import SALES_LOOKBACK_WEEKS, DEFAULT_TARGET_WEEKS
+from app.core.config import SALES_LOOKBACK_WEEKS, DEFAULT_TARGET_WEEKS
 
 
 class DemandCalculationError(Exception):
@@ -1,5 +1,5 @@
 import pandas as pd
-from app.config import B2B_MAX_AGE_DAYS, B2B_WEIGHT_FACTOR
+from app.core.config import B2B_MAX_AGE_DAYS, B2B_WEIGHT_FACTOR
 
 
 class NetInventoryError(Exception):
@@ -1,5 +1,6 @@
+import numpy as np
 import pandas as pd
-from app.config import (
+from app.core.config import (
     ROUND_TO_MASTER_CARTON,
     MAX_REPLENISHMENT_MULTIPLIER,
 )
@@ -13,14 +14,20 @@ class ReplenishmentError(Exception):
 # -------------------------------------------------
 # MASTER CARTON ROUNDING
 # -------------------------------------------------
-def round_to_master_carton(qty: int, carton_size: int) -> int:
-    if carton_size <= 0:
-        return qty
+def ceil_to_carton(qty, carton) -> np.ndarray:
+    """
+    Column-wise master carton rounding:
+    qty is truncated to int, rounded up to a multiple of carton;
+    carton <= 0 leaves qty as is, qty <= 0 becomes 0.
+    """
+
+    q = np.trunc(np.nan_to_num(np.asarray(qty, dtype=float))).astype(np.int64)
+    c = np.nan_to_num(np.asarray(carton, dtype=float)).astype(np.int64)
 
-    if qty <= 0:
-        return 0
+    size = np.where(c > 0, c, 1)
+    rounded = -(-q // size) * size
 
-    return int(((qty + carton_size - 1) // carton_size) * carton_size)
+    return np.where(c <= 0, q, np.where(q <= 0, 0, rounded))
 
 
 # -------------------------------------------------
@@ -93,12 +100,9 @@ def compute_replenishment(
             how="left",
         ).fillna({"master_carton": 0})
 
-        df["replenishment"] = df.apply(
-            lambda r: round_to_master_carton(
-                int(r["replenishment_capped"]),
-                int(r["master_carton"]),
-            ),
-            axis=1,
+        df["replenishment"] = ceil_to_carton(
+            df["replenishment_capped"],
+            df["master_carton"],
         )
     else:
         df["replenishment"] = df["replenishment_capped"]
@@ -48,6 +48,25 @@ ROUND_TO_MASTER_CARTON = True
 # Replenishment safety caps
 MAX_REPLENISHMENT_MULTIPLIER = 2.5  # vs avg weekly sales
 
+# -------------------------------------------------
+# FC ALLOCATION GOVERNANCE (IST)
+# -------------------------------------------------
+# Share of send_qty released per replenishment-master ixd_flag.
+# Rules are matched in order (case-insensitive substring), first wins;
+# anything unmatched (Hazmat + Non-Hazmat IXD) gets the default.
+IST_GOVERNANCE_RULES = [
+    {"flag_contains": "non-ixd", "send_pct": 1.0},
+]
+IST_DEFAULT_SEND_PCT = 0.35
+
+# velocity_flag by governance fill ratio (send_qty / required),
+# evaluated in order, first match wins
+VELOCITY_FLAG_RULES = [
+    {"flag": "NO_REQUIREMENT", "required_units_eq": 0},
+    {"flag": "SHORT_30%+", "fill_ratio_lte": 0.70},
+]
+VELOCITY_FLAG_DEFAULT = "OK"
+
 # -------------------------------------------------
 # AMAZON FC MASTER LIST (LOCKED)
 # -------------------------------------------------
@@ -0,0 +1,288 @@
+import io
+import time
+from typing import Iterable, Optional, Sequence
+
+import pandas as pd
+from sqlalchemy import text
+
+
+# -------------------------------------------------
+# HELPERS
+# -------------------------------------------------
+def quote_ident(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+class CsvChunkStream(io.RawIOBase):
+    """
+    Read-only file object over an iterable of CSV text chunks.
+    Lets psycopg2's copy_expert pull data as it is produced,
+    so the full CSV is never materialized.
+    """
+
+    def __init__(self, chunks: Iterable[str]):
+        self._chunks = iter(chunks)
+        self._buffer = b""
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        parts = []
+        wanted = size
+
+        while wanted < 0 or wanted > 0:
+            if self._pos >= len(self._buffer):
+                try:
+                    self._buffer = next(self._chunks).encode("utf-8")
+                    self._pos = 0
+                except StopIteration:
+                    break
+
+            end = len(self._buffer) if wanted < 0 else self._pos + wanted
+            part = self._buffer[self._pos:end]
+            self._pos += len(part)
+            parts.append(part)
+
+            if wanted > 0:
+                wanted -= len(part)
+
+        return b"".join(parts)
+
+
+def iter_csv_chunks(frames: Iterable[pd.DataFrame], columns: Sequence[str], chunk_rows: int):
+    for frame in frames:
+        frame = frame.reindex(columns=list(columns))
+        for start in range(0, len(frame), chunk_rows):
+            yield frame.iloc[start:start + chunk_rows].to_csv(
+                header=False, index=False
+            )
+
+
+# -------------------------------------------------
+# COPY FROM STDIN
+# -------------------------------------------------
+def copy_frames(
+    conn,
+    table: str,
+    columns: Sequence[str],
+    frames: Iterable[pd.DataFrame],
+    chunk_rows: int = 50_000,
+) -> int:
+    """
+    Streams DataFrames into `table` with a single COPY ... FROM STDIN.
+    `conn` is a SQLAlchemy connection inside an open transaction.
+    Returns the number of rows copied.
+    """
+
+    rows = [0]
+
+    def counted(fs):
+        for f in fs:
+            rows[0] += len(f)
+            yield f
+
+    stream = CsvChunkStream(iter_csv_chunks(counted(frames), columns, chunk_rows))
+    column_sql = ", ".join(quote_ident(c) for c in columns)
+
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {quote_ident(table)} ({column_sql}) FROM STDIN WITH (FORMAT csv)",
+            stream,
+        )
+    finally:
+        cursor.close()
+
+    return rows[0]
+
+
+# -------------------------------------------------
+# STAGING TABLE + ATOMIC SWAP
+# -------------------------------------------------
+def _table_column_types(conn, table: str) -> dict:
+    result = conn.execute(
+        text("""
+            SELECT column_name, data_type
+            FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = :table
+            ORDER BY ordinal_position
+        """),
+        {"table": table},
+    )
+    return {r[0]: r[1] for r in result}
+
+
+def _table_columns(conn, table: str) -> list:
+    return list(_table_column_types(conn, table))
+
+
+def _index_spec(i: int, table: str, index) -> tuple:
+    # "template" or ("name", "template")
+    if isinstance(index, str):
+        return f"ix_{table}_{i}", index
+    return index[0], index[1]
+
+
+def ensure_indexes(conn, table: str, indexes: Sequence):
+    """
+    Creates missing `indexes` (same specs as replace_table) on a live table.
+    """
+
+    for i, index in enumerate(indexes):
+        name, template = _index_spec(i, table, index)
+        conn.execute(text(template.format(
+            name=f"IF NOT EXISTS {quote_ident(name)}",
+            table=quote_ident(table),
+        )))
+
+
+def replace_table(
+    engine,
+    table: str,
+    schema: pd.DataFrame,
+    frames: Iterable[pd.DataFrame],
+    indexes: Sequence[str] = (),
+    keep_live_rows_where: Optional[str] = None,
+    chunk_rows: int = 50_000,
+) -> dict:
+    """
+    Reloads `table` without blocking readers for the duration of the load:
+
+      1. CREATE <table>__staging from `schema` (an empty, typed frame)
+      2. COPY all frames into staging
+      3. optionally carry rows over from the live table
+         (`keep_live_rows_where`, e.g. accounts not part of this load)
+      4. build `indexes` on staging
+      5. RENAME live -> __old, staging -> live, DROP __old
+
+    Everything runs in one transaction, so readers see either the old or
+    the new table; the exclusive lock is only held for the renames.
+
+    `indexes` are CREATE INDEX templates with {name} / {table} placeholders,
+    optionally paired with a fixed index name: ("ix_name", template).
+    """
+
+    staging = f"{table}__staging"
+    old = f"{table}__old"
+    columns = list(schema.columns)
+
+    start = time.perf_counter()
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {quote_ident(staging)}"))
+        schema.head(0).to_sql(staging, conn, index=False)
+
+        rows = copy_frames(conn, staging, columns, frames, chunk_rows=chunk_rows)
+        copied_at = time.perf_counter()
+
+        live_columns = _table_columns(conn, table)
+        carried = 0
+
+        if keep_live_rows_where and live_columns:
+            # Cast to the staging types, the column types may have changed
+            staging_types = _table_column_types(conn, staging)
+            shared = [c for c in columns if c in live_columns]
+            shared_sql = ", ".join(quote_ident(c) for c in shared)
+            select_sql = ", ".join(
+                f"CAST({quote_ident(c)} AS {staging_types[c]})" for c in shared
+            )
+            carried = conn.execute(
+                text(
+                    f"INSERT INTO {quote_ident(staging)} ({shared_sql}) "
+                    f"SELECT {select_sql} FROM {quote_ident(table)} "
+                    f"WHERE {keep_live_rows_where}"
+                )
+            ).rowcount
+
+        index_names = []
+        for i, index in enumerate(indexes):
+            name, template = _index_spec(i, table, index)
+            conn.execute(text(template.format(
+                name=quote_ident(f"{name}__staging"),
+                table=quote_ident(staging),
+            )))
+            index_names.append(name)
+
+        if live_columns:
+            conn.execute(text(
+                f"ALTER TABLE {quote_ident(table)} RENAME TO {quote_ident(old)}"
+            ))
+        conn.execute(text(
+            f"ALTER TABLE {quote_ident(staging)} RENAME TO {quote_ident(table)}"
+        ))
+        conn.execute(text(f"DROP TABLE IF EXISTS {quote_ident(old)}"))
+
+        for name in index_names:
+            conn.execute(text(
+                f"ALTER INDEX {quote_ident(name + '__staging')} "
+                f"RENAME TO {quote_ident(name)}"
+            ))
+
+    elapsed = time.perf_counter() - start
+    copy_elapsed = copied_at - start
+
+    stats = {
+        "table": table,
+        "rows": rows,
+        "carried_over": carried,
+        "seconds": round(elapsed, 2),
+        "rows_per_sec": int(rows / copy_elapsed) if copy_elapsed > 0 else rows,
+    }
+
+    print(
+        f"✅ {table}: {rows} rows copied"
+        f" (+{carried} kept) in {stats['seconds']}s"
+        f" | {stats['rows_per_sec']} rows/sec"
+    )
+
+    return stats
+
+
+# -------------------------------------------------
+# INCREMENTAL APPEND (DEDUPED)
+# -------------------------------------------------
+def append_new_rows(
+    conn,
+    table: str,
+    frame: pd.DataFrame,
+    conflict_columns: Sequence[str],
+    chunk_rows: int = 50_000,
+) -> int:
+    """
+    Appends rows of `frame` to the live `table`, skipping rows whose
+    `conflict_columns` already exist (needs a unique index on them).
+
+    Rows are COPYed into a scratch <table>__delta table typed from the
+    frame, then moved with one INSERT ... SELECT ... ON CONFLICT DO NOTHING,
+    casting to the live column types. Runs on the caller's transaction.
+    Returns the number of rows actually inserted.
+    """
+
+    if frame.empty:
+        return 0
+
+    delta = f"{table}__delta"
+    live_types = _table_column_types(conn, table)
+    columns = [c for c in frame.columns if c in live_types]
+
+    conn.execute(text(f"DROP TABLE IF EXISTS {quote_ident(delta)}"))
+    frame[columns].head(0).to_sql(delta, conn, index=False)
+    copy_frames(conn, delta, columns, [frame], chunk_rows=chunk_rows)
+
+    insert_sql = ", ".join(quote_ident(c) for c in columns)
+    select_sql = ", ".join(
+        f"CAST({quote_ident(c)} AS {live_types[c]})" for c in columns
+    )
+    conflict_sql = ", ".join(quote_ident(c) for c in conflict_columns)
+
+    inserted = conn.execute(text(
+        f"INSERT INTO {quote_ident(table)} ({insert_sql}) "
+        f"SELECT {select_sql} FROM {quote_ident(delta)} "
+        f"ON CONFLICT ({conflict_sql}) DO NOTHING"
+    )).rowcount
+
+    conn.execute(text(f"DROP TABLE {quote_ident(delta)}"))
+
+    return inserted
@@ -0,0 +1,141 @@
+from typing import Optional
+
+import pandas as pd
+from sqlalchemy import text
+
+
+# -------------------------------------------------
+# INGEST BATCH LOG
+# -------------------------------------------------
+# One row per (table, account) load. Incremental loads read their
+# high-water mark from here; every load records what it read / inserted.
+CREATE_INGEST_BATCHES = """
+CREATE TABLE IF NOT EXISTS ingest_batches (
+    id                 BIGSERIAL PRIMARY KEY,
+    table_name         TEXT NOT NULL,
+    account            TEXT NOT NULL,
+    mode               TEXT NOT NULL,
+    source_file        TEXT,
+    source_fingerprint TEXT,
+    rows_read          BIGINT NOT NULL DEFAULT 0,
+    rows_inserted      BIGINT NOT NULL DEFAULT 0,
+    rows_skipped       BIGINT NOT NULL DEFAULT 0,
+    high_water_mark    TIMESTAMPTZ,
+    started_at         TIMESTAMPTZ NOT NULL,
+    finished_at        TIMESTAMPTZ NOT NULL DEFAULT now()
+)
+"""
+
+
+# Single-row counter bumped by every load (upload_data.py and the
+# ingestion modules); the API result cache keys on it.
+CREATE_DATA_VERSION = """
+CREATE TABLE IF NOT EXISTS data_version (
+    id         SMALLINT PRIMARY KEY DEFAULT 1,
+    version    BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+)
+"""
+
+
+def ensure_ingest_batches(conn):
+    conn.execute(text(CREATE_INGEST_BATCHES))
+    conn.execute(text(CREATE_DATA_VERSION))
+
+
+def bump_data_version(conn) -> int:
+    """
+    Marks loaded data as changed (call inside the load's transaction).
+    """
+
+    conn.execute(text(CREATE_DATA_VERSION))
+
+    return conn.execute(
+        text("""
+            INSERT INTO data_version (id, version) VALUES (1, 1)
+            ON CONFLICT (id) DO UPDATE
+            SET version = data_version.version + 1, updated_at = now()
+            RETURNING version
+        """)
+    ).scalar()
+
+
+def data_version(conn) -> Optional[int]:
+    """
+    Current data version (None if nothing was loaded since it was added).
+    """
+
+    return conn.execute(
+        text("SELECT version FROM data_version WHERE id = 1")
+    ).scalar()
+
+
+def last_batch(conn, table: str, account: str) -> Optional[dict]:
+    """
+    Latest recorded batch of `table` for `account` (None if never loaded).
+    """
+
+    row = conn.execute(
+        text("""
+            SELECT id, mode, source_fingerprint, high_water_mark, finished_at
+            FROM ingest_batches
+            WHERE table_name = :table AND account = :account
+            ORDER BY id DESC
+            LIMIT 1
+        """),
+        {"table": table, "account": account.lower()},
+    ).mappings().first()
+
+    return dict(row) if row else None
+
+
+def record_batch(
+    conn,
+    table: str,
+    account: str,
+    mode: str,
+    started_at,
+    rows_read: int,
+    rows_inserted: int,
+    high_water_mark=None,
+    source_file: Optional[str] = None,
+    source_fingerprint: Optional[str] = None,
+) -> int:
+    if high_water_mark is not None and pd.isna(high_water_mark):
+        high_water_mark = None
+
+    batch_id = conn.execute(
+        text("""
+            INSERT INTO ingest_batches (
+                table_name, account, mode, source_file, source_fingerprint,
+                rows_read, rows_inserted, rows_skipped,
+                high_water_mark, started_at
+            )
+            VALUES (
+                :table, :account, :mode, :source_file, :source_fingerprint,
+                :rows_read, :rows_inserted, :rows_skipped,
+                :high_water_mark, :started_at
+            )
+            RETURNING id
+        """),
+        {
+            "table": table,
+            "account": account.lower(),
+            "mode": mode,
+            "source_file": source_file,
+            "source_fingerprint": source_fingerprint,
+            "rows_read": int(rows_read),
+            "rows_inserted": int(rows_inserted),
+            "rows_skipped": int(rows_read - rows_inserted),
+            "high_water_mark": (
+                high_water_mark.to_pydatetime()
+                if isinstance(high_water_mark, pd.Timestamp)
+                else high_water_mark
+            ),
+            "started_at": started_at,
+        },
+    ).scalar()
+
+    bump_data_version(conn)
+
+    return batch_id
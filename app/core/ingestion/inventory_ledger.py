@@ -1,7 +1,8 @@
 import pandas as pd
 from sqlalchemy import text
-from app.persistence.writers import get_engine
-from app.utils.week import to_week
+from app.db import get_engine
+from app.core.ingestion.ingest_batches import bump_data_version
+from app.core.utils.week import to_week
 
 
 def load_inventory_ledger(excel_path: str, snapshot_date: str):
@@ -34,6 +35,7 @@ def load_inventory_ledger(excel_path: str, snapshot_date: str):
             index=False,
             method="multi"
         )
+        bump_data_version(conn)
 
     print(f"✅ Inventory ledger loaded: {len(df)} rows | week {df['week'].iloc[0]}")
 
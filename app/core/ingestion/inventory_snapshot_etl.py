@@ -1,6 +1,7 @@
 import pandas as pd
 from sqlalchemy import text
-from app.persistence.writers import get_engine
+from app.db import get_engine
+from app.core.ingestion.ingest_batches import bump_data_version
 
 
 def build_inventory_snapshot():
@@ -37,6 +38,7 @@ FROM inventory_ledger
             index=False,
             method="multi"
         )
+        bump_data_version(conn)
 
     print(f"✅ inventory_snapshot loaded: {len(snapshot)} rows")
 
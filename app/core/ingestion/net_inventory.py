@@ -1,6 +1,7 @@
 import pandas as pd
 from sqlalchemy import text
-from app.persistence.writers import get_engine
+from app.db import get_engine
+from app.core.ingestion.ingest_batches import bump_data_version
 
 
 def build_net_inventory():
@@ -30,6 +31,7 @@ def build_net_inventory():
             index=False,
             method="multi"
         )
+        bump_data_version(conn)
 
     print(f"✅ net_inventory loaded: {len(df)} rows")
 
@@ -1,9 +1,21 @@
 import pandas as pd
 from sqlalchemy import text
-from app.persistence.writers import get_engine
-from app.utils.week import to_week
+from app.db import get_engine
+from app.core.ingestion.ingest_batches import bump_data_version
+from app.core.utils.week import to_week_series
+from app.core.ingestion.bulk_load import copy_frames
 
-def load_outward_shipments(excel_path: str):
+COLUMNS = [
+    "invoice_no",
+    "sku",
+    "fc",
+    "qty_sent",
+    "ship_date",
+    "week"
+]
+
+
+def load_outward_shipments(excel_path: str) -> dict:
     df = pd.read_excel(excel_path)
 
     df = df.rename(columns={
@@ -15,28 +27,38 @@ def load_outward_shipments(excel_path: str):
 
     df["qty_sent"] = 1  # 🔴 change later if qty column exists
     df["ship_date"] = pd.to_datetime(df["ship_date"])
-    df["week"] = df["ship_date"].apply(to_week)
+    df["week"] = to_week_series(df["ship_date"])
+    df["ship_date"] = df["ship_date"].dt.date
 
-    df = df[[
-        "invoice_no",
-        "sku",
-        "fc",
-        "qty_sent",
-        "ship_date",
-        "week"
-    ]]
+    df = df[COLUMNS]
 
+    # One COPY into a temp table + one set-based merge
+    # (ON CONFLICT needs the unique index from scripts/init_db.py)
     engine = get_engine()
     with engine.begin() as conn:
-        for _, row in df.iterrows():
-            conn.execute(
-                text("""
-                INSERT INTO outward_shipments
-                (invoice_no, sku, fc, qty_sent, ship_date, week)
-                VALUES (:invoice_no, :sku, :fc, :qty_sent, :ship_date, :week)
-                ON CONFLICT (invoice_no, sku, fc) DO NOTHING
-                """),
-                row.to_dict()
-            )
-
-    print(f"✅ Loaded {len(df)} outward shipment rows")
+        conn.execute(text("""
+            CREATE TEMP TABLE outward_shipments_load
+            (LIKE outward_shipments INCLUDING DEFAULTS)
+            ON COMMIT DROP
+        """))
+
+        copy_frames(conn, "outward_shipments_load", COLUMNS, [df])
+
+        inserted = conn.execute(text("""
+            INSERT INTO outward_shipments
+            (invoice_no, sku, fc, qty_sent, ship_date, week)
+            SELECT invoice_no, sku, fc, qty_sent, ship_date, week
+            FROM outward_shipments_load
+            ON CONFLICT (invoice_no, sku, fc) DO NOTHING
+        """)).rowcount
+
+        bump_data_version(conn)
+
+    duplicates = len(df) - inserted
+
+    print(
+        f"✅ Loaded {inserted} new outward shipment rows"
+        f" ({duplicates} duplicates skipped)"
+    )
+
+    return {"rows": len(df), "inserted": inserted, "duplicates": duplicates}
@@ -1,6 +1,7 @@
 import pandas as pd
 from sqlalchemy import text
-from app.persistence.writers import get_engine
+from app.db import get_engine
+from app.core.ingestion.ingest_batches import bump_data_version
 
 TARGET_WEEKS_OF_COVER = 4
 AVG_WEEKLY_SALES = 10   # placeholder (replace later)
@@ -30,6 +31,7 @@ def build_replenishment_plan():
             index=False,
             method="multi"
         )
+        bump_data_version(conn)
 
     print(f"✅ replenishment_plan generated: {len(df)} rows")
 
@@ -1,25 +1,10 @@
-from sqlalchemy import create_engine, text
-from sqlalchemy.engine import Engine
+from sqlalchemy import text
 import pandas as pd
-from app.config import DATABASE_URL
-
 
 # -------------------------------------------------
-# DATABASE ENGINE (SINGLE SOURCE)
+# DATABASE ENGINE (SINGLE SOURCE: app.db)
 # -------------------------------------------------
-_engine: Engine | None = None
-
-
-def get_engine() -> Engine:
-    global _engine
-    if _engine is None:
-        _engine = create_engine(
-            DATABASE_URL,
-            pool_pre_ping=True,
-            pool_size=5,
-            max_overflow=10
-        )
-    return _engine
+from app.db import get_engine
 
 
 # -------------------------------------------------
@@ -47,14 +32,14 @@ def load_inventory_ledger(week: str) -> pd.DataFrame:
     query = """
         SELECT sku, fc, sellable_qty, damaged_qty, recall_qty
         FROM inventory_ledger
-        WHERE snapshot_week = :week
+        WHERE week = :week
     """
     return read_sql(query, {"week": week})
 
 
 def load_sales_velocity(weeks: list[str]) -> pd.DataFrame:
     query = """
-        SELECT asin, sku, fc, week, units_sold
+        SELECT sku, fc, week, units_sold
         FROM sales_velocity
         WHERE week = ANY(:weeks)
     """
@@ -65,7 +50,7 @@ def load_b2b_inventory(week: str) -> pd.DataFrame:
     query = """
         SELECT sku, qty, aging_days
         FROM b2b_inventory
-        WHERE snapshot_week = :week
+        WHERE week = :week
     """
     return read_sql(query, {"week": week})
 
@@ -1,8 +1,8 @@
 from sqlalchemy import text
 from sqlalchemy.exc import IntegrityError
 import pandas as pd
-from app.persistence.readers import get_engine
-from app.config import RUN_STATUS
+from app.db import get_engine
+from app.core.config import RUN_STATUS
 
 
 # -------------------------------------------------
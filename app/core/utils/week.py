@@ -1,3 +1,17 @@
+import pandas as pd
+
+
 def to_week(dt):
     year, week, _ = dt.isocalendar()
     return f"{year}-{week:02d}"
+
+
+def to_week_series(dates: pd.Series) -> pd.Series:
+    """
+    Column-wise to_week: datetime Series -> "YYYY-WW" (ISO year / week).
+    NaT stays missing.
+    """
+
+    iso = dates.dt.isocalendar()
+    weeks = iso["year"].astype("string") + "-" + iso["week"].astype("string").str.zfill(2)
+    return weeks.astype(object).where(dates.notna(), None)
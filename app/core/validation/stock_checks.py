@@ -1,5 +1,5 @@
 import pandas as pd
-from app.config import AMAZON_FCS, VALIDATION_LIMITS
+from app.core.config import AMAZON_FCS, VALIDATION_LIMITS
 
 
 class StockValidationError(Exception):
@@ -1,8 +1,14 @@
 import pandas as pd
 from pathlib import Path
 
+from app.services.concurrent_load import load_concurrently
+from app.services.input_cache import read_input
+from app.services.sales_cube import sales_cube
+from app.services.result_cache import cached_result
+
 DATA_PATH = Path("data/input")
 
+@cached_result("cb_replenishment")
 def load_cb_replenishment():
 
     try:
@@ -11,23 +17,33 @@ def load_cb_replenishment():
         # LOAD FILES
         # =========================
 
-        master_df = pd.read_excel(DATA_PATH / "CB Replenishment_Master.xlsx")
-
-        sales_df = pd.read_csv(
-            DATA_PATH / "weekly_sales_snapshot - CB Replenishment.csv"
-        )
-
-        inv_audio_df = pd.read_excel(
-            DATA_PATH / "Inventory_snapshot_audio_array.xlsx"
-        )
-
-        inv_tonor_df = pd.read_excel(
-            DATA_PATH / "Inventory_snapshot_tonor.xlsx"
-        )
-
-        po_df = pd.read_excel(
-            DATA_PATH / "In_Transit_PO data.xlsx"
-        )
+        # Independent inputs: Excel parsed on the process pool,
+        # the sales cube on a thread
+        loaded = load_concurrently({
+            "master": lambda: read_input(
+                DATA_PATH / "CB Replenishment_Master.xlsx"
+            ),
+            # Trailing 12 weeks per (brand, model, channel), sales cube
+            "sales": lambda: sales_cube(
+                DATA_PATH / "weekly_sales_snapshot - CB Replenishment.csv",
+                keys=("brand", "model", "channel"),
+            ).window_total(12),
+            "inv_audio": lambda: read_input(
+                DATA_PATH / "Inventory_snapshot_audio_array.xlsx"
+            ),
+            "inv_tonor": lambda: read_input(
+                DATA_PATH / "Inventory_snapshot_tonor.xlsx"
+            ),
+            "po": lambda: read_input(
+                DATA_PATH / "In_Transit_PO data.xlsx"
+            ),
+        })
+
+        master_df = loaded["master"]
+        sales_df = loaded["sales"]
+        inv_audio_df = loaded["inv_audio"]
+        inv_tonor_df = loaded["inv_tonor"]
+        po_df = loaded["po"]
 
         inventory_df = pd.concat(
             [inv_audio_df, inv_tonor_df],
@@ -39,7 +55,6 @@ def load_cb_replenishment():
         # =========================
 
         master_df.columns = master_df.columns.str.lower().str.strip()
-        sales_df.columns = sales_df.columns.str.lower().str.strip()
         inventory_df.columns = inventory_df.columns.str.lower().str.strip()
         po_df.columns = po_df.columns.str.lower().str.strip()
 
@@ -1,7 +1,12 @@
 import os
 import pandas as pd
 
+from app.services.input_cache import read_input
+from app.services.sales_cube import sales_cube
+from app.services.result_cache import cached_result
 
+
+@cached_result("china_reorder")
 def china_reorder_logic(
     brand: str = "Nexlev",
     months: int = 3,
@@ -66,19 +71,12 @@ def china_reorder_logic(
     # LOAD FILES
     # ============================================================
 
-    sales_df = pd.read_csv(sales_path)
-    inv_df = pd.read_excel(inv_path, engine="openpyxl")
+    inv_df = read_input(inv_path, engine="openpyxl")
 
     # ============================================================
     # CLEAN COLUMN NAMES
     # ============================================================
 
-    sales_df.columns = (
-        sales_df.columns
-        .str.strip()
-        .str.lower()
-    )
-
     inv_df.columns = (
         inv_df.columns
         .str.strip()
@@ -89,19 +87,6 @@ def china_reorder_logic(
     # CLEAN IMPORTANT FIELDS
     # ============================================================
 
-    sales_df["brand"] = (
-        sales_df["brand"]
-        .astype(str)
-        .str.strip()
-        .str.lower()
-    )
-
-    sales_df["model"] = (
-        sales_df["model"]
-        .astype(str)
-        .str.strip()
-    )
-
     inv_df["model"] = (
         inv_df["model"]
         .astype(str)
@@ -116,30 +101,32 @@ def china_reorder_logic(
     )
 
     # ============================================================
-    # BRAND FILTER
+    # SALES AGGREGATION (LAST 12 WEEKS, SALES CUBE)
     # ============================================================
+    # Trailing 12 weeks of the snapshot per (brand, model), read from
+    # the cube that is built once per snapshot version.
 
-    sales_df = sales_df[
-        sales_df["brand"] == brand_clean
-    ]
-
-    # ============================================================
-    # SALES AGGREGATION (LAST 12 WEEKS)
-    # ============================================================
+    sales_agg = sales_cube(sales_path).window_total(12)
 
-    sales_df = sales_df.sort_values(
-        "week",
-        ascending=False
+    sales_agg["brand"] = (
+        sales_agg["brand"]
+        .astype(str)
+        .str.strip()
+        .str.lower()
     )
 
-    last_12 = (
-        sales_df
-        .groupby("model")
-        .head(12)
+    sales_agg["model"] = (
+        sales_agg["model"]
+        .astype(str)
+        .str.strip()
     )
 
+    # ============================================================
+    # BRAND FILTER
+    # ============================================================
+
     sales_agg = (
-        last_12
+        sales_agg[sales_agg["brand"] == brand_clean]
         .groupby("model", as_index=False)
         .agg(
             last_12w_sales=("units_sold", "sum")
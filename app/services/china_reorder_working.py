@@ -1,7 +1,12 @@
 import os
 import pandas as pd
 
+from app.services.input_cache import read_input
+from app.services.sales_cube import sales_cube
+from app.services.result_cache import cached_result
 
+
+@cached_result("china_reorder_working")
 def get_china_reorder_working_data(
     brand: str = None,
     channel: str = None,
@@ -43,14 +48,19 @@ def get_china_reorder_working_data(
     # LOAD DATA
     # ============================================================
 
-    sales_df = pd.read_csv(sales_path)
-    inv_df = pd.read_csv(inv_path)
+    # Snapshot totals per (brand, model, channel), sales cube
+    sales_df = sales_cube(
+        sales_path,
+        keys=("brand", "model", "channel"),
+        values=("units_sold", "gross_sales", "nlc"),
+    ).snapshot_total()
+
+    inv_df = read_input(inv_path)
 
     # ============================================================
     # CLEAN COLUMN NAMES
     # ============================================================
 
-    sales_df.columns = sales_df.columns.str.strip().str.lower()
     inv_df.columns = inv_df.columns.str.strip().str.lower()
 
     # ============================================================
@@ -0,0 +1,121 @@
+import contextvars
+import multiprocessing
+import os
+import threading
+from concurrent.futures import (
+    FIRST_EXCEPTION,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict
+
+import pandas as pd
+
+# =================================================
+# CONFIG
+# =================================================
+# Independent reads (CSV / DB / cache lookups) run at once per load
+LOAD_THREADS = int(os.getenv("LOAD_THREADS", 8))
+
+# Excel parses (CPU bound in openpyxl) run in worker processes;
+# 0 parses in the calling thread instead
+EXCEL_PROCESSES = int(os.getenv("EXCEL_PROCESSES", min(4, os.cpu_count() or 1)))
+
+# Workers are spawned, not forked: the API process holds threads,
+# locks and pooled DB connections a forked child must not inherit
+EXCEL_START_METHOD = os.getenv("EXCEL_START_METHOD", "spawn")
+
+
+# =================================================
+# EXCEL PROCESS POOL
+# =================================================
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _excel_pool():
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=EXCEL_PROCESSES,
+                mp_context=multiprocessing.get_context(EXCEL_START_METHOD),
+            )
+        return _pool
+
+
+def _reset_excel_pool():
+    global _pool
+
+    with _pool_lock:
+        pool, _pool = _pool, None
+
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def parse_excel(path, **read_kwargs) -> pd.DataFrame:
+    """
+    pd.read_excel on a worker process (blocks the calling thread only).
+    Falls back to an in-thread parse when process workers are disabled
+    or the pool cannot be used.
+    """
+
+    if EXCEL_PROCESSES <= 0:
+        return pd.read_excel(path, **read_kwargs)
+
+    try:
+        return _excel_pool().submit(pd.read_excel, path, **read_kwargs).result()
+
+    except BrokenProcessPool as e:
+        # A worker died (OOM kill etc.): next parse starts a fresh pool
+        print("⚠️ EXCEL PROCESS POOL BROKEN, PARSING IN-THREAD:", e)
+        _reset_excel_pool()
+
+    except (OSError, RuntimeError) as e:
+        # Cannot start processes here (sandbox / interpreter shutdown)
+        print("⚠️ EXCEL PROCESS POOL UNAVAILABLE, PARSING IN-THREAD:", e)
+
+    return pd.read_excel(path, **read_kwargs)
+
+
+# =================================================
+# FAN-OUT
+# =================================================
+def load_concurrently(tasks: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+    """
+    Runs independent zero-argument loaders at once and returns
+    {name: result}.
+
+    Each loader runs on its own thread with a copy of the caller's
+    context (pipeline request scope); Excel inputs read through
+    read_input are parsed on the process pool. The first failure is
+    re-raised as is, and loaders not yet started are cancelled.
+    """
+
+    if len(tasks) <= 1:
+        return {name: fn() for name, fn in tasks.items()}
+
+    # Own executor per call: loaders may fan out again without
+    # starving a shared pool
+    with ThreadPoolExecutor(
+        max_workers=min(len(tasks), LOAD_THREADS),
+        thread_name_prefix="load",
+    ) as executor:
+        futures = {
+            name: executor.submit(contextvars.copy_context().run, fn)
+            for name, fn in tasks.items()
+        }
+
+        done, pending = wait(futures.values(), return_when=FIRST_EXCEPTION)
+
+        for future in futures.values():
+            if future in done and future.exception() is not None:
+                for other in pending:
+                    other.cancel()
+                raise future.exception()
+
+    return {name: future.result() for name, future in futures.items()}
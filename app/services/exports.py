@@ -0,0 +1,329 @@
+import re
+import tempfile
+from typing import Iterable, Iterator, Tuple
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+try:
+    from openpyxl import Workbook
+    HAS_OPENPYXL = True
+except ImportError:
+    HAS_OPENPYXL = False
+
+
+# =================================================
+# CONFIG
+# =================================================
+# Rows per Arrow record batch / Parquet row group
+EXPORT_BATCH_ROWS = 50_000
+
+# Rows per CSV text chunk / XLSX append batch
+CSV_CHUNK_ROWS = 5_000
+
+# Finished XLSX files are streamed from disk in blocks of this size
+XLSX_READ_BYTES = 1 << 20
+
+# Identifier columns written dictionary-encoded (low cardinality, repeated)
+DICTIONARY_COLUMNS = (
+    "sku",
+    "SKU",
+    "Merchant SKU",
+    "model",
+    "Model",
+    "fulfillment_center",
+    "FC",
+    "from_fc",
+    "to_fc",
+)
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+XLSX_MEDIA_TYPE = (
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+)
+
+
+class ExportError(Exception):
+    """Raised when an export format cannot be produced."""
+    pass
+
+
+# =================================================
+# DRAINABLE SINK
+# =================================================
+class _ChunkSink:
+    """
+    Write-only file object handed to pyarrow writers.
+
+    Bytes are buffered until drain(); tell() keeps counting from the
+    start of the stream so Parquet footer offsets stay correct.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._pos = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def drain(self) -> bytes:
+        out = b"".join(self._chunks)
+        self._chunks.clear()
+        return out
+
+
+# =================================================
+# TYPING
+# =================================================
+def _arrow_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Shallow copy with:
+      - identifier columns as categoricals (-> Arrow dictionary arrays
+        sharing one dictionary across all batches)
+      - mixed-type object columns coerced to strings
+    """
+
+    out = df.copy(deep=False)
+
+    for col in out.columns:
+        series = out[col]
+
+        if col in DICTIONARY_COLUMNS:
+            out[col] = series.astype("string").astype("category")
+            continue
+
+        if series.dtype != object:
+            continue
+
+        try:
+            pa.array(series, from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            out[col] = series.astype("string")
+
+    out.columns = [str(c) for c in out.columns]
+    return out
+
+
+def _batches(df: pd.DataFrame, schema, batch_rows: int):
+    for start in range(0, len(df), batch_rows):
+        yield pa.RecordBatch.from_pandas(
+            df.iloc[start:start + batch_rows],
+            schema=schema,
+            preserve_index=False,
+        )
+
+
+def _prepare(df: pd.DataFrame):
+    if not HAS_PYARROW:
+        raise ExportError("pyarrow is required for Arrow / Parquet exports")
+
+    if df is None:
+        df = pd.DataFrame()
+
+    frame = _arrow_frame(df)
+    schema = pa.Schema.from_pandas(frame, preserve_index=False)
+
+    return frame, schema
+
+
+def _drain_writer(writer, sink: _ChunkSink, frame, schema, batch_rows, write):
+    try:
+        for batch in _batches(frame, schema, batch_rows):
+            write(writer, batch)
+            yield sink.drain()
+    finally:
+        writer.close()
+
+    yield sink.drain()
+
+
+# =================================================
+# ARROW IPC STREAM
+# =================================================
+def arrow_ipc_chunks(
+    df: pd.DataFrame,
+    batch_rows: int = EXPORT_BATCH_ROWS,
+) -> Iterator[bytes]:
+    """
+    Arrow IPC stream, yielded one record batch at a time.
+    """
+
+    frame, schema = _prepare(df)
+
+    sink = _ChunkSink()
+    writer = pa.ipc.new_stream(pa.PythonFile(sink, mode="w"), schema)
+
+    return _drain_writer(
+        writer, sink, frame, schema, batch_rows,
+        lambda w, batch: w.write_batch(batch),
+    )
+
+
+# =================================================
+# PARQUET
+# =================================================
+def parquet_chunks(
+    df: pd.DataFrame,
+    batch_rows: int = EXPORT_BATCH_ROWS,
+) -> Iterator[bytes]:
+    """
+    Parquet file, yielded one row group at a time (footer last).
+    """
+
+    frame, schema = _prepare(df)
+
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(
+        pa.PythonFile(sink, mode="w"),
+        schema,
+        compression="snappy",
+    )
+
+    return _drain_writer(
+        writer, sink, frame, schema, batch_rows,
+        lambda w, batch: w.write_table(pa.Table.from_batches([batch])),
+    )
+
+
+# =================================================
+# CSV
+# =================================================
+def csv_chunks(
+    df: pd.DataFrame,
+    batch_rows: int = CSV_CHUNK_ROWS,
+) -> Iterator[bytes]:
+    """
+    CSV text, yielded header first and then batch_rows rows at a time.
+    """
+
+    if df is None:
+        df = pd.DataFrame()
+
+    yield df.head(0).to_csv(index=False).encode("utf-8")
+
+    for start in range(0, len(df), batch_rows):
+        yield (
+            df.iloc[start:start + batch_rows]
+            .to_csv(index=False, header=False)
+            .encode("utf-8")
+        )
+
+
+# =================================================
+# XLSX (WRITE-ONLY MODE)
+# =================================================
+def _sheet_title(name, used: set) -> str:
+    title = re.sub(r"[\[\]:*?/\\]", "_", str(name)).strip() or "Sheet"
+    title = title[:31]
+
+    base, n = title, 2
+    while title.lower() in used:
+        suffix = f" ({n})"
+        title = base[:31 - len(suffix)] + suffix
+        n += 1
+
+    used.add(title.lower())
+    return title
+
+
+def xlsx_chunks(
+    sheets: Iterable[Tuple[str, pd.DataFrame]],
+    batch_rows: int = CSV_CHUNK_ROWS,
+) -> Iterator[bytes]:
+    """
+    XLSX workbook with one sheet per (name, frame).
+
+    openpyxl's write-only mode spools each sheet's rows to disk, and
+    the finished file is read back in blocks, so neither the workbook
+    nor the file is held in memory. sheets may be a generator - frames
+    are then built one at a time.
+    """
+
+    if not HAS_OPENPYXL:
+        raise ExportError("openpyxl is required for XLSX exports")
+
+    def produce():
+        wb = Workbook(write_only=True)
+        used = set()
+
+        for name, df in sheets:
+            ws = wb.create_sheet(title=_sheet_title(name, used))
+
+            if df is None:
+                continue
+
+            ws.append([str(c) for c in df.columns])
+
+            for start in range(0, len(df), batch_rows):
+                chunk = df.iloc[start:start + batch_rows].astype(object)
+                chunk = chunk.where(chunk.notna(), None)
+
+                for row in chunk.itertuples(index=False, name=None):
+                    ws.append(row)
+
+        if not used:
+            wb.create_sheet(title="Sheet")
+
+        with tempfile.TemporaryFile() as tmp:
+            wb.save(tmp)
+            tmp.seek(0)
+
+            while True:
+                block = tmp.read(XLSX_READ_BYTES)
+                if not block:
+                    break
+                yield block
+
+    return produce()
+
+
+_PRODUCERS = {
+    "csv": csv_chunks,
+    "arrow": arrow_ipc_chunks,
+    "parquet": parquet_chunks,
+}
+
+
+def export_chunks(df: pd.DataFrame, fmt: str) -> Iterator[bytes]:
+    """
+    Byte chunks of df in the given export format.
+    """
+
+    producer = _PRODUCERS.get(fmt)
+
+    if producer is None:
+        raise ExportError(
+            f"Unknown export format '{fmt}', expected one of {sorted(_PRODUCERS)}"
+        )
+
+    return producer(df)
@@ -1,9 +1,152 @@
 print("########## NEW FC FINAL VERSION LOADED ##########")
 print("RUNNING FILE:", __file__)
 
+import numpy as np
 import pandas as pd
-from app.services.fc_planning import calculate_fc_plan
-from app.services.fc_transfer import calculate_fc_transfers
+from app.core.config import (
+    IST_DEFAULT_SEND_PCT,
+    IST_GOVERNANCE_RULES,
+    VELOCITY_FLAG_DEFAULT,
+    VELOCITY_FLAG_RULES,
+)
+from app.services.input_cache import read_input, file_fingerprint
+from app.services.master_carton import round_to_cartons
+from app.services.pipeline import stage, run_stage
+
+# Registers the "fc_data" / "fc_plan" / "fc_transfers" stages
+import app.services.fc_transfer  # noqa: F401
+
+
+# ===============================================================
+# REPLENISHMENT MASTER (HAZMAT / IXD FLAGS)
+# ===============================================================
+
+def _repl_master_source(account: str):
+    if account.lower() == "nexlev":
+        return "data/input/replenishment_master_nexlev.xlsx", "Nexlev"
+    return "data/input/replenishment_master_viomi.xlsx", "Viomi"
+
+
+def _repl_master_version(account: str):
+    repl_path, _ = _repl_master_source(account)
+    try:
+        return file_fingerprint(repl_path)
+    except OSError:
+        return None
+
+
+@stage("repl_master", params=("account",), version=_repl_master_version)
+def load_repl_master(account: str) -> pd.DataFrame:
+
+    repl_path, sheet_to_load = _repl_master_source(account)
+
+    try:
+        repl_master = read_input(
+            repl_path,
+            sheet_name=sheet_to_load
+        )
+
+        repl_master.columns = repl_master.columns.str.strip()
+
+        repl_master = repl_master.rename(columns={
+            "SKU": "sku",
+            "Hazmat/non-Hazmat": "ixd_flag",
+            "Model": "model"
+        })
+
+        repl_master = repl_master[
+            ["sku", "model", "ixd_flag"]
+        ]
+
+        repl_master["sku"] = (
+            repl_master["sku"]
+            .astype(str)
+            .str.strip()
+            .str.upper()
+        )
+
+    except Exception as e:
+        print("⚠️ Excel load failed:", e)
+
+        repl_master = pd.DataFrame(
+            columns=["sku", "model", "ixd_flag"]
+        )
+
+    return repl_master
+
+
+# ===============================================================
+# GOVERNANCE RULES (VECTORIZED)
+# ===============================================================
+
+def ist_send_pct(ixd_flag: pd.Series) -> np.ndarray:
+    """
+    Per-row share of send_qty released, from IST_GOVERNANCE_RULES.
+    The flag text is normalized once; each rule is one column operation.
+    """
+
+    flags = ixd_flag.astype(str).str.strip().str.lower()
+    pct = np.full(len(flags), IST_DEFAULT_SEND_PCT, dtype=float)
+
+    # Reverse so the first matching rule wins
+    for rule in reversed(IST_GOVERNANCE_RULES):
+        match = flags.str.contains(rule["flag_contains"], regex=False, na=False)
+        pct = np.where(match.to_numpy(bool), rule["send_pct"], pct)
+
+    return pct
+
+
+def velocity_flags(required_units: pd.Series, fill_ratio: pd.Series) -> np.ndarray:
+    """
+    velocity_flag per row from VELOCITY_FLAG_RULES (first match wins).
+    """
+
+    conditions = []
+
+    for rule in VELOCITY_FLAG_RULES:
+        if "required_units_eq" in rule:
+            conditions.append((required_units == rule["required_units_eq"]).to_numpy())
+        else:
+            conditions.append((fill_ratio <= rule["fill_ratio_lte"]).to_numpy())
+
+    return np.select(
+        conditions,
+        [rule["flag"] for rule in VELOCITY_FLAG_RULES],
+        default=VELOCITY_FLAG_DEFAULT,
+    ).astype(object)
+
+
+# ===============================================================
+# PIPELINE STAGE
+# ===============================================================
+# Transfers are always planned on the "All" channel view (as before),
+# so for the default channel the FC plan is shared with the transfer stage.
+
+@stage(
+    "final_allocation",
+    inputs=(
+        "fc_plan",
+        ("fc_transfers", {"channel": "All"}),
+        "repl_master",
+    ),
+    params=("replenish_weeks", "channel", "account", "window_days"),
+)
+def _final_allocation_stage(
+    fc_plan,
+    fc_transfers,
+    repl_master,
+    replenish_weeks: int,
+    channel: str,
+    account: str,
+    window_days: int,
+):
+    return build_final_allocation(
+        fc_plan.copy(),
+        fc_transfers.copy(),
+        repl_master,
+        replenish_weeks=replenish_weeks,
+        account=account,
+    )
 
 
 # ===============================================================
@@ -13,7 +156,40 @@ from app.services.fc_transfer import calculate_fc_transfers
 def calculate_final_allocation(
     replenish_weeks: int = 8,
     channel: str = "All",
-    account: str = "Nexlev"
+    account: str = "Nexlev",
+    round_to_carton: bool = False,
+    window_days: int = 90
+) -> pd.DataFrame:
+    """
+    Final FC Allocation (memoized via the "final_allocation" stage).
+    Returns a private copy, callers may mutate it.
+
+    round_to_carton rounds send_qty up to the model's master carton
+    (applied on the copy, the memoized plan stays unrounded).
+
+    window_days: shipment window of the FC velocity (default 90 days).
+    """
+
+    df = run_stage(
+        "final_allocation",
+        replenish_weeks=replenish_weeks,
+        channel=channel,
+        account=account,
+        window_days=window_days,
+    ).copy()
+
+    if round_to_carton and not df.empty:
+        df = round_to_cartons(df, "send_qty", model_col="model")
+
+    return df
+
+
+def build_final_allocation(
+    df_plan: pd.DataFrame,
+    df_transfer: pd.DataFrame,
+    repl_master: pd.DataFrame,
+    replenish_weeks: int,
+    account: str,
 ) -> pd.DataFrame:
 
 
@@ -21,15 +197,9 @@ def calculate_final_allocation(
     print("🚀 VELOCITY FLAG VERSION ACTIVE 🚀")
 
     # ==========================================================
-    # STEP 1 — LOAD FC PLANNING DATA
+    # STEP 1 — FC PLANNING DATA
     # ==========================================================
 
-    df_plan = calculate_fc_plan(
-        replenish_weeks=replenish_weeks,
-        channel=channel,
-        account=account
-    )
-
     if df_plan is None or df_plan.empty:
         return pd.DataFrame()
 
@@ -70,14 +240,9 @@ def calculate_final_allocation(
     print("PLAN ROWS:", len(df_plan))
     print("PLAN TOTAL REQUIRED:", df_plan["required_units"].sum())
     # ==========================================================
-    # STEP 2 — LOAD TRANSFER DATA
+    # STEP 2 — TRANSFER DATA
     # ==========================================================
 
-    df_transfer = calculate_fc_transfers(
-        replenish_weeks=replenish_weeks,
-        account=account
-    )
-
     if df_transfer is None or df_transfer.empty:
         df_plan["transfer_in"] = 0
     else:
@@ -162,45 +327,6 @@ def calculate_final_allocation(
     # STEP 5B — HAZMAT GOVERNANCE (35%)
     # ==========================================================
 
-    if account.lower() == "nexlev":
-        repl_path = "data/input/replenishment_master_nexlev.xlsx"
-        sheet_to_load = "Nexlev"
-    else:
-        repl_path = "data/input/replenishment_master_viomi.xlsx"
-        sheet_to_load = "Viomi"
-
-    try:
-        repl_master = pd.read_excel(
-            repl_path,
-            sheet_name=sheet_to_load
-        )
-
-        repl_master.columns = repl_master.columns.str.strip()
-
-        repl_master = repl_master.rename(columns={
-            "SKU": "sku",
-            "Hazmat/non-Hazmat": "ixd_flag",
-            "Model": "model"
-        })
-
-        repl_master = repl_master[
-            ["sku", "model", "ixd_flag"]
-        ]
-
-        repl_master["sku"] = (
-            repl_master["sku"]
-            .astype(str)
-            .str.strip()
-            .str.upper()
-        )
-
-    except Exception as e:
-        print("⚠️ Excel load failed:", e)
-
-        repl_master = pd.DataFrame(
-            columns=["sku", "model", "ixd_flag"]
-        )
-
     df_plan = df_plan.merge(
         repl_master,
         on="sku",
@@ -209,20 +335,10 @@ def calculate_final_allocation(
 
     df_plan["model"] = df_plan["model"].fillna("-")
 
-    IST_PERCENTAGE = 0.35
-
-    def apply_ist(row):
-        flag = str(row.get("ixd_flag", "")).strip().lower()
-
-     # If it contains "non-ixd" → NOT governed
-        if "non-ixd" in flag:
-          return row["send_qty"]
-
-    # Everything else (Hazmat + Non-Hazmat) → governed
-        return row["send_qty"] * IST_PERCENTAGE
-
-    # APPLY GOVERNANCE
-    df_plan["send_qty"] = df_plan.apply(apply_ist, axis=1)
+    # APPLY GOVERNANCE (rules in app/core/config.py)
+    df_plan["send_qty"] = df_plan["send_qty"] * ist_send_pct(
+        df_plan.get("ixd_flag", pd.Series("", index=df_plan.index))
+    )
 
     # ==========================================================
 # STEP 5C — GOVERNANCE SHORTFALL FLAG
@@ -246,18 +362,10 @@ def calculate_final_allocation(
         df_plan["governance_fill_ratio"] * 100
         ).round(1)
     
-    def governance_flag_logic(row):
-        if row["original_required_units"] == 0:
-            return "NO_REQUIREMENT"
-        elif row["governance_fill_ratio"] <= 0.70:
-            return "SHORT_30%+"
-        else:
-            return "OK"
-
-    df_plan["velocity_flag"] = df_plan.apply(
-        governance_flag_logic,
-        axis=1
-        )
+    df_plan["velocity_flag"] = velocity_flags(
+        df_plan["original_required_units"],
+        df_plan["governance_fill_ratio"],
+    )
 
     # ==========================================================
     # STEP 6 — EXPLAINABILITY
@@ -1,9 +1,14 @@
 from app.services.validation_engine import run_full_validation
-import os
-from sqlalchemy import create_engine
+from app.services.pipeline import stage, run_stage, SOURCE_TTL_SECONDS
+from app.services.shipment_tensor import fc_tensor
+from app.services.result_cache import cached_result, db_version
+from app.services.concurrent_load import load_concurrently
+from app.db import get_engine
+from sqlalchemy import text
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from typing import Tuple
+from typing import Iterable, Tuple
 
 # =================================================
 # CONFIGURATION
@@ -17,157 +22,206 @@ DATA_DIR = BASE_DIR / "data" / "input"
 # =================================================
 # DATA LOADERS
 # =================================================
-def load_fc_data(account: str):
+# Velocity comes from the daily sku x FC x channel shipment tensor
+# (two slice reads per window); the SELLABLE filter and the ledger
+# aggregation run in PostgreSQL. Normalization mirrors the former
+# pandas logic (strip + upper SKU, FC grouped as stored, NaN -> "NAN").
+SHIPMENT_WINDOW_DAYS = 90
+
+FC_INVENTORY_SQL = text("""
+    SELECT
+        COALESCE(UPPER(TRIM(CAST("MSKU" AS text))), 'NAN') AS "MSKU",
+        COALESCE(UPPER(TRIM(CAST("Location" AS text))), 'NAN') AS "Location",
+        SUM(COALESCE(CAST("Ending Warehouse Balance" AS double precision), 0))
+            AS fc_inventory,
+        COUNT(*) AS line_count,
+        SUM(CASE WHEN CAST("Ending Warehouse Balance" AS double precision) < 0 THEN 1 ELSE 0 END)
+            AS negative_lines
+    FROM inventory_ledger
+    WHERE LOWER(account) = :account
+      AND "Disposition" = 'SELLABLE'
+    GROUP BY 1, 2
+""")
+
+
+def load_fc_inventory(account: str) -> pd.DataFrame:
+    """
+    SELLABLE ending balance per MSKU x Location (+ line stats).
+    """
 
-    engine = create_engine(os.getenv("DATABASE_URL"))
+    with get_engine().connect() as conn:
+        return pd.read_sql(
+            FC_INVENTORY_SQL, conn, params={"account": account.lower()}
+        )
 
-    shipments = pd.read_sql(
-        "SELECT * FROM shipments WHERE LOWER(account) = %s",
-    engine,
-    params=(account.lower(),)
-)
 
-    ledger = pd.read_sql(
-    "SELECT * FROM inventory_ledger WHERE LOWER(account) = %s",
-    engine,
-    params=(account.lower(),)
-)
+def load_fc_data(
+    account: str,
+    channel: str = "All",
+    window_days: int = SHIPMENT_WINDOW_DAYS
+) -> dict:
+    """
+    Returns the aggregated planning inputs of one account + channel:
 
-    shipments.columns = shipments.columns.str.strip()
-    ledger.columns = ledger.columns.str.strip()
+      velocity  : sku x FC units of the last window_days days (+ line stats)
+      inventory : MSKU x Location SELLABLE ending balance
+      shipments : summary of the windowed shipment lines (validation)
+      ledger    : summary of the SELLABLE ledger lines (validation)
+    """
 
-    return shipments, ledger
+    # Shipments tensor (stage / DB) and ledger query are independent:
+    # run them on two pooled connections at once
+    loaded = load_concurrently({
+        "tensor": lambda: fc_tensor(account),
+        "inventory": lambda: load_fc_inventory(account),
+    })
 
+    tensor = loaded["tensor"]
+    inventory = loaded["inventory"]
 
-# =================================================
-# FC PLANNING ENGINE
-# =================================================
+    if tensor.last_day is None:
+        raise ValueError("Shipment Date column contains no valid dates.")
 
-def calculate_fc_plan(
-    replenish_weeks: int,
-    channel: str,
-    account: str
-) -> pd.DataFrame:
-    """
-    FC-Level Planning Engine
+    window = tensor.window_total(window_days)
 
-    Core Logic:
-    -------------------------------------------------
-    1. Load shipments (last 90 days)
-    2. Calculate FC velocity
-    3. Load ledger ending balance
-    4. Merge velocity + inventory
-    5. Calculate required units
-    6. Calculate shortfall
-    7. Calculate coverage metrics
-    8. Return structured output for UI transparency
-    -------------------------------------------------
-    """
+    channel_key = channel.strip().lower()
+    if channel_key != "all":
+        window = window[window["channel"] == channel_key]
+
+    velocity = (
+        window[window["lines"] > 0]
+        .groupby(["sku", "FC"], as_index=False, dropna=False, sort=True)
+        .agg(
+            total_units_90d=("units", "sum"),
+            line_count=("lines", "sum"),
+            negative_lines=("negative_lines", "sum"),
+        )
+    )
 
-    shipments, ledger = load_fc_data(account)
+    first_day, last_day = tensor.window_bounds(window_days)
+
+    shipment_summary = {
+        "row_count": int(velocity["line_count"].sum()),
+        "total_units": velocity["total_units_90d"].sum(),
+        "unique_skus": velocity["sku"].nunique(),
+        "min_date": first_day,
+        "max_date": last_day,
+        "negative_rows": int(velocity["negative_lines"].sum()),
+    }
+
+    ledger_summary = {
+        "row_count": int(inventory["line_count"].sum()),
+        "total_inventory": inventory["fc_inventory"].sum(),
+        "unique_skus": inventory["MSKU"].nunique(),
+        "negative_rows": int(inventory["negative_lines"].sum()),
+    }
+
+    # GROUP BY output order is arbitrary (parallel / hash aggregates);
+    # sort like the former pandas groupby so row order stays stable.
+    # NULL FC lines only count towards the validation summary.
+    velocity = velocity[velocity["FC"].notna()].reset_index(drop=True)
+    inventory = inventory.sort_values(["MSKU", "Location"], kind="stable", ignore_index=True)
+
+    return {
+        "last_date": tensor.last_day,
+        "window_days": window_days,
+        "velocity": velocity[["sku", "FC", "total_units_90d"]],
+        "inventory": inventory[["MSKU", "Location", "fc_inventory"]],
+        "shipments": shipment_summary,
+        "ledger": ledger_summary,
+    }
 
-    print("ACCOUNT IN PLANNING:", account)
-    print("SHIPMENTS TOTAL:", shipments["Shipped Quantity"].sum())
-    print("LEDGER TOTAL:", ledger["Ending Warehouse Balance"].sum())
-
-    print("ACCOUNT RECEIVED:", account)
-    print("UNIQUE SHIPMENT ACCOUNTS:", shipments["account"].unique())
-    print("UNIQUE LEDGER ACCOUNTS:", ledger["account"].unique())
-    print("TOTAL SHIPMENT UNITS:", shipments["Shipped Quantity"].sum())
-    
-    print("ACCOUNT:", account)
-    print("SHIPMENTS ROWS:", len(shipments))
-    print("LEDGER ROWS:", len(ledger))
-    print("SHIPMENT SKUS SAMPLE:",
-      shipments["Merchant SKU"].astype(str).str.upper().unique()[:5])
-    
-    print("ACCOUNT IN PLANNING:", account)
-    print("SHIPMENT SUM:", shipments["Shipped Quantity"].sum())
-    print("UNIQUE ACCOUNTS IN SHIPMENTS:", shipments["account"].unique())
 
-    # =================================================
-    # VALIDATE SHIPMENTS STRUCTURE
-    # =================================================
+# =================================================
+# PIPELINE STAGES
+# =================================================
+# "fc_data" is shared by every FC engine of a request (and across
+# requests until the TTL expires), so the DB round-trips happen once.
+
+def _fc_data_version(account: str, channel: str, window_days: int):
+    # Shipments / inventory ledger live in the DB: reload on a new load
+    return db_version()
 
-    required_ship_cols = [
-        "Merchant SKU",
-        "Shipped Quantity",
-        "Shipment Date",
-        "FC",
-        "Sales Channel",
-    ]
 
-    for col in required_ship_cols:
-        if col not in shipments.columns:
-            raise ValueError(f"Missing column in shipments file: {col}")
-        # Normalize SKU column (internal standard)
-    shipments = shipments.rename(columns={"Merchant SKU": "sku"})
-    shipments["Sales Channel"] = (
-    shipments["Sales Channel"]
-    .astype(str)
-    .str.strip()
-    .str.lower()
+@stage(
+    "fc_data",
+    params=("account", "channel", "window_days"),
+    ttl=SOURCE_TTL_SECONDS,
+    version=_fc_data_version,
 )
-    shipments["sku"] = shipments["sku"].astype(str).str.strip().str.upper()
+def _fc_data_stage(account: str, channel: str, window_days: int):
+    return load_fc_data(account, channel, window_days)
 
-    shipments["Shipment Date"] = pd.to_datetime(
-        shipments["Shipment Date"], errors="coerce"
+
+@stage(
+    "fc_plan",
+    inputs=("fc_data",),
+    params=("replenish_weeks", "channel", "account", "window_days"),
+)
+def _fc_plan_stage(
+    fc_data,
+    replenish_weeks: int,
+    channel: str,
+    account: str,
+    window_days: int,
+):
+    return build_fc_plan(
+        fc_data,
+        replenish_weeks=replenish_weeks,
+        channel=channel,
+        account=account,
     )
 
-    shipments["Shipped Quantity"] = pd.to_numeric(
-        shipments["Shipped Quantity"], errors="coerce"
-    ).fillna(0)
 
-    # =================================================
-    # FILTER LAST 90 DAYS
-    # =================================================
+# =================================================
+# FC PLANNING ENGINE
+# =================================================
 
-    last_date = shipments["Shipment Date"].max()
+def calculate_fc_plan(
+    replenish_weeks: int,
+    channel: str,
+    account: str,
+    window_days: int = SHIPMENT_WINDOW_DAYS
+) -> pd.DataFrame:
+    """
+    FC-Level Planning Engine (memoized via the "fc_plan" stage).
+    Returns a private copy, callers may mutate it.
 
-    if pd.isna(last_date):
-        raise ValueError("Shipment Date column contains no valid dates.")
+    window_days: shipment window the FC velocity is measured over
+    (total_units_90d then holds the units of that window).
+    """
 
-    cutoff_date = last_date - pd.Timedelta(days=90)
+    return run_stage(
+        "fc_plan",
+        replenish_weeks=replenish_weeks,
+        channel=channel,
+        account=account,
+        window_days=window_days,
+    ).copy()
 
-    shipments_90 = shipments[
-        shipments["Shipment Date"] >= cutoff_date
-    ].copy()
-    
-    print("SHIPMENTS LAST 90 DAYS:", len(shipments_90))
-    print("MAX DATE IN FILE:", last_date)
-    # =================================================
-    # SALES CHANNEL FILTER
-    # =================================================
 
-    if channel.lower() != "all":
-     shipments_90 = shipments_90[
-        shipments_90["Sales Channel"] == channel.strip().lower()
-    ].copy()
-    
-    print("AFTER CHANNEL FILTER:", len(shipments_90))
-    print("CHANNEL SELECTED:", channel)
-    print("UNIQUE CHANNELS:", shipments_90["Sales Channel"].unique())
+def fc_velocity_inventory(fc_data: dict) -> pd.DataFrame:
+    """
+    sku x FC weekly velocity merged with the SELLABLE FC inventory
+    (independent of the cover weeks).
+    """
 
-    shipments_90["sku"] = shipments_90["sku"].astype(str).str.strip().str.upper()
+    window_days = fc_data["window_days"]
 
     # =================================================
     # FC VELOCITY CALCULATION
     # =================================================
 
-    fc_velocity = (
-        shipments_90
-        .groupby(["sku", "FC"], as_index=False)
-        .agg(total_units_90d=("Shipped Quantity", "sum"))
-    )
-    
+    fc_velocity = fc_data["velocity"].copy()
+
     print("FC VELOCITY ROWS:", len(fc_velocity))
     print("SAMPLE VELOCITY:", fc_velocity.head())
 
     fc_velocity["FC"] = fc_velocity["FC"].astype(str).str.strip().str.upper()
 
-    # Convert 90-day to weekly velocity
+    # Convert the window total to weekly velocity (90 days = 12.857 weeks)
     fc_velocity["weekly_velocity"] = (
-        fc_velocity["total_units_90d"] / 12.857
+        fc_velocity["total_units_90d"] / (window_days / 7)
     )
 
     fc_velocity["weekly_velocity"] = fc_velocity[
@@ -175,36 +229,11 @@ def calculate_fc_plan(
     ].round(2)
 
     # =================================================
-    # VALIDATE LEDGER STRUCTURE
+    # SELLABLE INVENTORY BY SKU + FC
     # =================================================
 
-    required_ledger_cols = [
-        "MSKU",
-        "Location",
-        "Ending Warehouse Balance", 
-    ]
-
-    for col in required_ledger_cols:
-        if col not in ledger.columns:
-            raise ValueError(f"Missing column in ledger file: {col}")
-
-    ledger["Ending Warehouse Balance"] = pd.to_numeric(
-        ledger["Ending Warehouse Balance"], errors="coerce"
-    ).fillna(0)
+    fc_inventory = fc_data["inventory"]
 
-    # Filter only SELLABLE inventory
-    ledger = ledger[ledger["Disposition"] == "SELLABLE"].copy() 
-    # =================================================
-    # AGGREGATE LEDGER BY SKU + FC
-    # =================================================
-    ledger["MSKU"] = ledger["MSKU"].astype(str).str.strip().str.upper()
-    ledger["Location"] = ledger["Location"].astype(str).str.strip().str.upper()
-    fc_inventory = (
-        ledger
-        .groupby(["MSKU", "Location"], as_index=False)
-        .agg(fc_inventory=("Ending Warehouse Balance", "sum"))
-    )
-    
     print("LEDGER ROWS:", len(fc_inventory))
     print("SAMPLE LEDGER:", fc_inventory.head())
 
@@ -228,6 +257,45 @@ def calculate_fc_plan(
 
     df["fc_inventory"] = df["fc_inventory"].fillna(0)
 
+    return df
+
+
+def build_fc_plan(
+    fc_data: dict,
+    replenish_weeks: int,
+    channel: str,
+    account: str
+) -> pd.DataFrame:
+    """
+    FC-Level Planning Engine
+
+    Core Logic:
+    -------------------------------------------------
+    1. Shipments of the last window_days days (shipment tensor)
+    2. Calculate FC velocity
+    3. Ledger SELLABLE ending balance, aggregated (SQL)
+    4. Merge velocity + inventory
+    5. Calculate required units
+    6. Calculate shortfall
+    7. Calculate coverage metrics
+    8. Return structured output for UI transparency
+    -------------------------------------------------
+    """
+
+    shipment_summary = fc_data["shipments"]
+    ledger_summary = fc_data["ledger"]
+
+    print("ACCOUNT IN PLANNING:", account)
+    print("CHANNEL SELECTED:", channel)
+    print("MAX DATE IN DB:", fc_data["last_date"])
+    window_days = fc_data["window_days"]
+
+    print(f"SHIPMENTS LAST {window_days} DAYS:", shipment_summary["row_count"])
+    print(f"SHIPMENT UNITS LAST {window_days} DAYS:", shipment_summary["total_units"])
+    print("LEDGER TOTAL:", ledger_summary["total_inventory"])
+
+    df = fc_velocity_inventory(fc_data)
+
     # =================================================
     # REQUIRED UNITS (TARGET COVER)
     # =================================================
@@ -295,11 +363,70 @@ def calculate_fc_plan(
 
 
     validation_report = run_full_validation(
-    shipments_90,
-    ledger,
+    shipment_summary,
+    ledger_summary,
     final_df
 )
 
     print("VALIDATION REPORT:", validation_report)
 
-    return final_df
\ No newline at end of file
+    return final_df
+
+
+# =================================================
+# SENSITIVITY SWEEP (WEEKS x SHIPMENT WINDOWS)
+# =================================================
+@cached_result("fc_plan_sweep")
+def calculate_fc_plan_sweep(
+    replenish_weeks: Iterable[int],
+    channel: str,
+    account: str,
+    window_days: Iterable[int] = (SHIPMENT_WINDOW_DAYS,)
+) -> pd.DataFrame:
+    """
+    FC plan requirement / shortfall for every (window_days,
+    replenish_weeks) pair in one call.
+
+    Velocity + inventory are merged once per window (from the shared
+    "fc_data" stage); required_units and fc_shortfall are broadcast
+    over an sku x FC x weeks grid with the same rounding as the plan.
+
+    Returns one row per (sku, fulfillment_center, window_days,
+    replenish_weeks).
+    """
+
+    weeks = np.array(sorted(set(int(w) for w in replenish_weeks)), dtype=float)
+    windows = sorted(set(int(d) for d in window_days))
+
+    if len(weeks) == 0 or not windows:
+        raise ValueError("Sweep needs at least one window and one cover week")
+
+    frames = []
+
+    for days in windows:
+        fc_data = run_stage(
+            "fc_data", account=account, channel=channel, window_days=days
+        )
+        base = fc_velocity_inventory(fc_data)
+
+        velocity = pd.to_numeric(base["weekly_velocity"], errors="coerce").fillna(0).to_numpy(float)
+        inventory = pd.to_numeric(base["fc_inventory"], errors="coerce").fillna(0).to_numpy(float)
+
+        # sku x FC x weeks
+        required = np.round(velocity[:, None] * weeks[None, :], 2)
+        shortfall = np.round(np.clip(required - inventory[:, None], 0, None), 2)
+
+        n_rows, n_weeks = len(base), len(weeks)
+
+        frames.append(pd.DataFrame({
+            "sku": np.repeat(base["sku"].to_numpy(), n_weeks),
+            "fulfillment_center": np.repeat(base["FC"].to_numpy(), n_weeks),
+            "window_days": days,
+            "replenish_weeks": np.tile(weeks.astype(np.int64), n_rows),
+            "weekly_velocity": np.repeat(velocity, n_weeks),
+            "fc_inventory": np.repeat(inventory, n_weeks),
+            "required_units": required.ravel(),
+            "fc_shortfall": shortfall.ravel(),
+        }))
+
+    return pd.concat(frames, ignore_index=True)
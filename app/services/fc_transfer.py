@@ -1,12 +1,47 @@
+import numpy as np
 import pandas as pd
-from app.services.fc_planning import calculate_fc_plan
+from app.services.pipeline import stage, run_stage
+
+# Registers the "fc_data" / "fc_plan" stages this engine builds on
+import app.services.fc_planning  # noqa: F401
+
+
+@stage(
+    "fc_transfers",
+    inputs=("fc_plan",),
+    params=("replenish_weeks", "channel", "account", "window_days"),
+)
+def _fc_transfers_stage(
+    fc_plan,
+    replenish_weeks: int,
+    channel: str,
+    account: str,
+    window_days: int,
+):
+    return build_fc_transfers(fc_plan.copy())
 
 
 def calculate_fc_transfers(
     replenish_weeks: int = 8,
     channel: str = "All",
-    account: str = "Nexlev"
+    account: str = "Nexlev",
+    window_days: int = 90
 ) -> pd.DataFrame:
+    """
+    FC Transfer Engine (memoized via the "fc_transfers" stage).
+    Returns a private copy, callers may mutate it.
+    """
+
+    return run_stage(
+        "fc_transfers",
+        replenish_weeks=replenish_weeks,
+        channel=channel,
+        account=account,
+        window_days=window_days,
+    ).copy()
+
+
+def build_fc_transfers(df: pd.DataFrame) -> pd.DataFrame:
     """
     FC Transfer Engine
 
@@ -15,72 +50,98 @@ def calculate_fc_transfers(
     2. Identify excess inventory FCs
     3. Identify shortage FCs
     4. Transfer excess to shortage within same SKU
-    """
-
-    df = calculate_fc_plan(
-    replenish_weeks=replenish_weeks,
-    channel=channel,
-    account=account
-)
 
-    transfers = []
+    Greedy per SKU: shortage FCs (highest shortfall first) draw from
+    excess FCs (highest excess first), in that order. Done for all SKUs
+    at once: shortages and excesses are laid out as back-to-back
+    intervals on one cumulative axis per SKU, so the units shortage i
+    takes from excess j is the overlap of their intervals. Quantities
+    are handled in integer hundredths (plan values carry 2 decimals).
+    """
 
     # -------------------------------------------------
     # Calculate excess inventory
     # -------------------------------------------------
     df["excess"] = (df["fc_inventory"] - df["required_units"]).clip(lower=0)
 
+    sku_codes, _ = pd.factorize(df["sku"])
+    fcs = df["fulfillment_center"].to_numpy()
+    skus = df["sku"].to_numpy()
+    position = np.arange(len(df))
+
+    shortage_values = pd.to_numeric(df["fc_shortfall"], errors="coerce").to_numpy(float)
+    excess_values = df["excess"].to_numpy(float)
+
+    shortage = _to_cents(shortage_values)
+    excess = _to_cents(excess_values)
+
     # -------------------------------------------------
-    # Process SKU wise
+    # Sort once: by SKU, largest first
     # -------------------------------------------------
-    for sku in df["sku"].unique():
+    s_rows = _sorted_rows(shortage_values, sku_codes, position)
+    e_rows = _sorted_rows(excess_values, sku_codes, position)
 
-        sku_df = df[df["sku"] == sku].copy()
+    if len(s_rows) == 0 or len(e_rows) == 0:
+        return pd.DataFrame()
 
-        # Sort highest shortage first
-        shortage_fcs = (
-            sku_df[sku_df["fc_shortfall"] > 0]
-            .sort_values("fc_shortfall", ascending=False)
-        )
+    n_skus = sku_codes.max() + 1
+    s_total = np.bincount(sku_codes[s_rows], weights=shortage[s_rows], minlength=n_skus).astype(np.int64)
+    e_total = np.bincount(sku_codes[e_rows], weights=excess[e_rows], minlength=n_skus).astype(np.int64)
 
-        # Sort highest excess first
-        excess_fcs = (
-            sku_df[sku_df["excess"] > 0]
-            .sort_values("excess", ascending=False)
-        )
+    # Movable units per SKU, and a disjoint range of the axis per SKU
+    movable = np.minimum(s_total, e_total)
+    span = np.maximum(s_total, e_total)
+    base = np.cumsum(span) - span
 
-        for s_idx, short_row in shortage_fcs.iterrows():
+    s_ends = _interval_ends(shortage, sku_codes, s_rows, base)
+    e_ends = _interval_ends(excess, sku_codes, e_rows, base)
 
-            remaining_shortage = short_row["fc_shortfall"]
+    # -------------------------------------------------
+    # Segments between consecutive interval ends
+    # -------------------------------------------------
+    has_moves = movable > 0
+    limit = base + movable
 
-            for e_idx, excess_row in excess_fcs.iterrows():
+    points = np.unique(np.concatenate([
+        np.minimum(s_ends, limit[sku_codes[s_rows]]),
+        np.minimum(e_ends, limit[sku_codes[e_rows]]),
+        base[has_moves],
+        limit[has_moves],
+    ]))
 
-                if remaining_shortage <= 0:
-                    break
+    seg_start = points[:-1]
+    seg_end = points[1:]
 
-                available_excess = df.loc[e_idx, "excess"]
+    seg_sku = np.searchsorted(base, seg_start, side="right") - 1
+    valid = (seg_end > seg_start) & (seg_end <= limit[seg_sku])
 
-                transfer_qty = min(available_excess, remaining_shortage)
+    seg_start = seg_start[valid]
+    seg_end = seg_end[valid]
 
-                if transfer_qty > 0:
-                    transfers.append(
-                        {
-                            "sku": sku,
-                            "from_fc": excess_row["fulfillment_center"],
-                            "to_fc": short_row["fulfillment_center"],
-                            "transfer_qty": int(round(transfer_qty, 0)),
-                        }
-                    )
+    # Interval containing each segment = first interval ending at/after it
+    to_rows = s_rows[np.searchsorted(s_ends, seg_end, side="left")]
+    from_rows = e_rows[np.searchsorted(e_ends, seg_end, side="left")]
 
-                    # Reduce excess and shortage dynamically
-                    df.loc[e_idx, "excess"] -= transfer_qty
-                    remaining_shortage -= transfer_qty
+    # Each (shortage, excess) pair overlaps in one contiguous piece
+    lines = pd.DataFrame({
+        "to_row": to_rows,
+        "from_row": from_rows,
+        "cents": seg_end - seg_start,
+    }).groupby(["to_row", "from_row"], sort=False, as_index=False)["cents"].sum()
 
     # -------------------------------------------------
-    # Aggregate transfers
+    # Transfer lines (rounded per line, as before)
     # -------------------------------------------------
-    df_transfer = pd.DataFrame(transfers)
+    df_transfer = pd.DataFrame({
+        "sku": skus[lines["to_row"].to_numpy()],
+        "from_fc": fcs[lines["from_row"].to_numpy()],
+        "to_fc": fcs[lines["to_row"].to_numpy()],
+        "transfer_qty": np.round(lines["cents"].to_numpy() / 100).astype(np.int64),
+    })
 
+    # -------------------------------------------------
+    # Aggregate transfers
+    # -------------------------------------------------
     if not df_transfer.empty:
         df_transfer = (
             df_transfer
@@ -88,4 +149,49 @@ def calculate_fc_transfers(
             .agg(transfer_qty=("transfer_qty", "sum"))
         )
 
-    return df_transfer
\ No newline at end of file
+    return df_transfer
+
+
+# -------------------------------------------------
+# Helpers
+# -------------------------------------------------
+def _to_cents(values: np.ndarray) -> np.ndarray:
+    cents = np.round(np.nan_to_num(values) * 100)
+    return np.clip(cents, 0, None).astype(np.int64)
+
+
+def _sorted_rows(values: np.ndarray, sku_codes: np.ndarray, position: np.ndarray) -> np.ndarray:
+    rows = np.flatnonzero(values > 0)
+    rows = rows[np.lexsort((position[rows], -values[rows], sku_codes[rows]))]
+
+    # Equal values inside a SKU: keep the order the per-SKU
+    # sort_values(ascending=False) gave, so the lines stay identical.
+    codes = sku_codes[rows]
+    tied = (codes[1:] == codes[:-1]) & (values[rows][1:] == values[rows][:-1])
+
+    if tied.any():
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        ends = np.r_[starts[1:], len(rows)]
+        tied_groups = np.unique(np.searchsorted(starts, np.flatnonzero(tied), side="right") - 1)
+
+        for g in tied_groups:
+            group = np.sort(rows[starts[g]:ends[g]])
+            rows[starts[g]:ends[g]] = group[_descending_order(values[group])]
+
+    return rows
+
+
+def _descending_order(values: np.ndarray) -> np.ndarray:
+    # Same permutation as pandas nargsort(ascending=False, kind="quicksort")
+    reverse = np.arange(len(values))[::-1]
+    return reverse[values[::-1].argsort(kind="quicksort")][::-1]
+
+
+def _interval_ends(cents, sku_codes, rows, base) -> np.ndarray:
+    # Cumulative end of each interval inside its SKU, shifted to the SKU range
+    values = cents[rows]
+    codes = sku_codes[rows]
+    running = np.cumsum(values)
+    sku_start = np.r_[0, running[:-1]][np.r_[True, codes[1:] != codes[:-1]]]
+    group_index = np.cumsum(np.r_[True, codes[1:] != codes[:-1]]) - 1
+    return running - sku_start[group_index] + base[codes]
@@ -1,8 +1,14 @@
 import pandas as pd
 from pathlib import Path
 
+from app.services.concurrent_load import load_concurrently
+from app.services.input_cache import read_input
+from app.services.result_cache import cached_result
+from app.services.shipments_reader import read_shipments
+
 DATA_PATH = Path("data/input/Fossil Replenishment")
 
+@cached_result("fossil_replenishment")
 def load_fossil_replenishment(replenish_weeks=8):
 
     # FILES
@@ -11,9 +17,17 @@ def load_fossil_replenishment(replenish_weeks=8):
     sales_file = DATA_PATH / "fba_shipments_fossil.csv"
 
     # LOAD DATA
-    master_df = pd.read_excel(master_file)
-    cambium_df = pd.read_excel(cambium_file)
-    sales_df = pd.read_csv(sales_file)
+    loaded = load_concurrently({
+        "master": lambda: read_input(master_file),
+        "cambium": lambda: read_input(cambium_file),
+        "sales": lambda: read_shipments(
+            sales_file, columns=["Merchant SKU", "Shipped Quantity"]
+        ),
+    })
+
+    master_df = loaded["master"]
+    cambium_df = loaded["cambium"]
+    sales_df = loaded["sales"]
 
     # =====================
     # CAMBIUM SOH LOOKUP
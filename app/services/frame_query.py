@@ -0,0 +1,259 @@
+import base64
+import hashlib
+import json
+import operator
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# =================================================
+# CONFIG
+# =================================================
+# Largest page a client may request
+MAX_PAGE_ROWS = 5_000
+
+# filter=<column>:<op>:<value>
+FILTER_OPS = ("eq", "ne", "lt", "le", "gt", "ge", "in", "contains", "startswith")
+
+# Separator of the values of an "in" filter
+IN_SEPARATOR = "|"
+
+_COMPARE = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "lt": operator.lt,
+    "le": operator.le,
+    "gt": operator.gt,
+    "ge": operator.ge,
+}
+
+
+class QueryError(ValueError):
+    """Raised for malformed filter / sort / field / cursor parameters."""
+    pass
+
+
+# =================================================
+# PARSING
+# =================================================
+def parse_filter(expr: str) -> Tuple[str, str, str]:
+    """
+    "send_qty:gt:0" -> ("send_qty", "gt", "0")
+    "sku:B0ABC"     -> ("sku", "eq", "B0ABC")
+    """
+
+    parts = expr.split(":", 2)
+
+    if len(parts) == 2:
+        parts = [parts[0], "eq", parts[1]]
+
+    if len(parts) != 3 or not parts[0]:
+        raise QueryError(f"Invalid filter '{expr}', expected column:op:value")
+
+    column, op, value = parts
+    if op not in FILTER_OPS:
+        raise QueryError(
+            f"Invalid filter op '{op}', expected one of {list(FILTER_OPS)}"
+        )
+
+    return column, op, value
+
+
+def parse_sort(expr: Optional[str]) -> List[Tuple[str, bool]]:
+    """
+    "-fc_shortfall,sku" -> [("fc_shortfall", False), ("sku", True)]
+    """
+
+    if not expr:
+        return []
+
+    keys = []
+    for part in expr.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if part.startswith("-"):
+            keys.append((part[1:], False))
+        else:
+            keys.append((part.lstrip("+"), True))
+
+    return keys
+
+
+def _require_columns(df: pd.DataFrame, columns: Sequence[str], what: str):
+    missing = [c for c in columns if c not in df.columns]
+    if missing:
+        raise QueryError(
+            f"Unknown {what} column(s): {', '.join(missing)}"
+        )
+
+
+# =================================================
+# FILTER / SORT / FIELDS
+# =================================================
+def _typed(series: pd.Series, value: str):
+    """
+    Query string value -> the column's type (numbers, booleans).
+    """
+
+    if pd.api.types.is_bool_dtype(series):
+        lowered = value.strip().lower()
+        if lowered not in ("true", "false", "1", "0"):
+            raise QueryError(f"Invalid boolean '{value}' for {series.name}")
+        return lowered in ("true", "1")
+
+    if pd.api.types.is_numeric_dtype(series):
+        try:
+            return float(value)
+        except ValueError:
+            raise QueryError(f"Invalid number '{value}' for {series.name}")
+
+    return value
+
+
+def _mask(series: pd.Series, op: str, value: str) -> np.ndarray:
+    if op in ("contains", "startswith"):
+        text = series.astype(str).str.upper()
+        needle = value.upper()
+        hit = text.str.contains(needle, regex=False) if op == "contains" else text.str.startswith(needle)
+        return hit.fillna(False).to_numpy(bool)
+
+    if op == "in":
+        values = [_typed(series, v) for v in value.split(IN_SEPARATOR)]
+        if not pd.api.types.is_numeric_dtype(series):
+            return series.astype(str).isin([str(v) for v in values]).to_numpy(bool)
+        return series.isin(values).to_numpy(bool)
+
+    target = _typed(series, value)
+
+    if not (pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series)):
+        series = series.astype(str)
+
+    return _COMPARE[op](series, target).fillna(False).to_numpy(bool)
+
+
+def filter_frame(df: pd.DataFrame, filters: Sequence[Tuple[str, str, str]]) -> pd.DataFrame:
+    if not filters:
+        return df
+
+    _require_columns(df, [f[0] for f in filters], "filter")
+
+    mask = np.ones(len(df), dtype=bool)
+    for column, op, value in filters:
+        mask &= _mask(df[column], op, value)
+
+    return df[mask]
+
+
+def sort_frame(df: pd.DataFrame, keys: Sequence[Tuple[str, bool]]) -> pd.DataFrame:
+    if not keys:
+        return df
+
+    _require_columns(df, [k[0] for k in keys], "sort")
+
+    return df.sort_values(
+        [k[0] for k in keys],
+        ascending=[k[1] for k in keys],
+        kind="mergesort",
+        na_position="last",
+    )
+
+
+def select_fields(df: pd.DataFrame, fields: Optional[Sequence[str]]) -> pd.DataFrame:
+    if not fields:
+        return df
+
+    _require_columns(df, fields, "field")
+    return df[list(fields)]
+
+
+# =================================================
+# CURSORS
+# =================================================
+# Opaque token = next offset + a hash of the filters / sort it belongs to
+
+def query_hash(filters, sort_keys) -> str:
+    token = repr((sorted(filters), list(sort_keys)))
+    return hashlib.sha1(token.encode("utf-8")).hexdigest()[:12]
+
+
+def encode_cursor(offset: int, qhash: str) -> str:
+    raw = json.dumps({"o": offset, "q": qhash}).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, qhash: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        offset = int(data["o"])
+    except Exception:
+        raise QueryError("Invalid cursor")
+
+    if data.get("q") != qhash or offset < 0:
+        raise QueryError("Cursor does not match the current filters / sort")
+
+    return offset
+
+
+# =================================================
+# QUERY
+# =================================================
+def run_query(
+    df: pd.DataFrame,
+    filters: Sequence[Tuple[str, str, str]] = (),
+    sort_keys: Sequence[Tuple[str, bool]] = (),
+    fields: Optional[Sequence[str]] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Tuple[pd.DataFrame, dict]:
+    """
+    Filters, sorts, projects and pages a computed plan frame.
+
+    Returns (page, meta) where meta holds total / filtered row counts,
+    the page bounds and next_cursor (None on the last page).
+    The input frame is not modified.
+    """
+
+    if df is None:
+        df = pd.DataFrame()
+
+    if len(df.columns) == 0:
+        # Engines return a bare DataFrame() when there is nothing to plan
+        filters, sort_keys, fields = (), (), None
+
+    if limit is not None and not 1 <= limit <= MAX_PAGE_ROWS:
+        raise QueryError(f"limit must be 1-{MAX_PAGE_ROWS}")
+
+    qhash = query_hash(filters, sort_keys)
+
+    if cursor:
+        offset = decode_cursor(cursor, qhash)
+
+    total = len(df)
+
+    out = filter_frame(df, filters)
+    out = sort_frame(out, sort_keys)
+
+    filtered = len(out)
+
+    if limit is not None:
+        out = out.iloc[offset:offset + limit]
+    elif offset:
+        out = out.iloc[offset:]
+
+    out = select_fields(out, fields).reset_index(drop=True)
+
+    end = offset + len(out)
+    more = limit is not None and end < filtered
+
+    return out, {
+        "total": total,
+        "filtered": filtered,
+        "offset": offset,
+        "limit": limit,
+        "returned": len(out),
+        "next_cursor": encode_cursor(end, qhash) if more else None,
+    }
@@ -0,0 +1,318 @@
+import contextvars
+import glob
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+
+from app.services.concurrent_load import parse_excel
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+# =================================================
+# CONFIG
+# =================================================
+# Sidecars live in a hidden folder next to the source file:
+#   data/input/.cache/<file name>.<variant>.<fingerprint>.parquet
+# Frames Parquet cannot represent (mixed-type Excel columns) fall back
+# to a pickle sidecar with the same stem.
+SIDECAR_DIR_NAME = ".cache"
+SIDECAR_SUFFIXES = (".parquet", ".pkl")
+
+# In-memory LRU bounds (whichever is hit first); evicted frames are
+# reloaded from their sidecar
+INPUT_CACHE_MAX_ENTRIES = int(os.getenv("INPUT_CACHE_MAX_ENTRIES", 64))
+INPUT_CACHE_MAX_BYTES = int(os.getenv("INPUT_CACHE_MAX_MB", 512)) * 1024 * 1024
+
+_lock = threading.Lock()
+_frames: "OrderedDict[tuple, tuple]" = OrderedDict()
+_bytes = [0]
+
+_stats = {
+    "hits": 0,
+    "sidecar_hits": 0,
+    "misses": 0,
+    "sidecar_writes": 0,
+    "sidecar_errors": 0,
+    "evictions": 0,
+}
+
+
+# =================================================
+# FINGERPRINT
+# =================================================
+def _stat_fingerprint(st: os.stat_result) -> str:
+    return f"{st.st_mtime_ns:x}-{st.st_size:x}"
+
+
+def file_fingerprint(path) -> str:
+    """
+    Cheap identity of a file on disk: mtime (ns) + size.
+    Changes whenever the file is replaced or edited.
+    Recorded in the active track_reads() log, if any.
+    """
+
+    fingerprint = _stat_fingerprint(Path(path).stat())
+
+    reads = _reads.get()
+    if reads is not None:
+        reads[os.path.abspath(path)] = fingerprint
+
+    return fingerprint
+
+
+# =================================================
+# READ TRACKING
+# =================================================
+# Every input read (read_input / cached_frame) and stage version check
+# goes through file_fingerprint, so the log of a computation is the set
+# of files its result depends on. Worker threads of load_concurrently
+# run on a copy of the context and share the same log dict.
+_reads: contextvars.ContextVar = contextvars.ContextVar("input_reads", default=None)
+
+
+@contextmanager
+def track_reads():
+    """
+    Collects {absolute path: fingerprint} of the input files read
+    inside the block.
+    """
+
+    reads: Dict[str, str] = {}
+    token = _reads.set(reads)
+    try:
+        yield reads
+    finally:
+        _reads.reset(token)
+
+
+def record_reads(reads: Dict[str, str]):
+    """
+    Adds files read earlier (e.g. by a cached result) to the active log.
+    """
+
+    log = _reads.get()
+    if log is not None:
+        log.update(reads)
+
+
+def reads_unchanged(reads: Dict[str, str]) -> bool:
+    """
+    True while every file of a read log still has its fingerprint.
+    """
+
+    for path, fingerprint in reads.items():
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        if _stat_fingerprint(st) != fingerprint:
+            return False
+
+    return True
+
+
+def _variant_tag(variant: str) -> str:
+    return hashlib.sha1(variant.encode("utf-8")).hexdigest()[:12]
+
+
+def _sidecar_stem(path: Path, variant: str) -> Path:
+    return path.parent / SIDECAR_DIR_NAME / f"{path.name}.{_variant_tag(variant)}"
+
+
+def _count(counter: str):
+    with _lock:
+        _stats[counter] += 1
+
+
+# =================================================
+# SIDECAR PERSISTENCE
+# =================================================
+def _read_sidecar(stem: Path, fingerprint: str) -> Optional[pd.DataFrame]:
+    for suffix in SIDECAR_SUFFIXES:
+        sidecar = stem.with_name(f"{stem.name}.{fingerprint}{suffix}")
+
+        if not sidecar.exists():
+            continue
+
+        try:
+            if suffix == ".parquet":
+                if not HAS_PYARROW:
+                    continue
+                return pd.read_parquet(sidecar)
+            return pd.read_pickle(sidecar)
+
+        except Exception as e:
+            print("⚠️ INPUT CACHE SIDECAR READ FAILED:", sidecar, e)
+            _count("sidecar_errors")
+
+    return None
+
+
+def _write_sidecar(stem: Path, fingerprint: str, df: pd.DataFrame):
+    try:
+        stem.parent.mkdir(parents=True, exist_ok=True)
+
+        # Drop sidecars of older versions of the same file + variant
+        for old in stem.parent.glob(f"{glob.escape(stem.name)}.*"):
+            old.unlink(missing_ok=True)
+
+        target = stem.with_name(f"{stem.name}.{fingerprint}")
+        tmp = target.with_name(target.name + ".tmp")
+
+        try:
+            if not HAS_PYARROW:
+                raise ImportError("pyarrow not installed")
+            df.to_parquet(tmp, index=False)
+            tmp.replace(target.with_name(target.name + ".parquet"))
+
+        except Exception:
+            # Mixed-type object columns are not Parquet friendly
+            df.to_pickle(tmp)
+            tmp.replace(target.with_name(target.name + ".pkl"))
+
+        _count("sidecar_writes")
+
+    except Exception as e:
+        # Read-only disks etc. - the in-memory layer still works.
+        print("⚠️ INPUT CACHE SIDECAR WRITE FAILED:", stem, e)
+        _count("sidecar_errors")
+
+
+# =================================================
+# CORE CACHE
+# =================================================
+def cached_frame(
+    path,
+    variant: str,
+    build: Callable[[Path], pd.DataFrame],
+) -> pd.DataFrame:
+    """
+    Returns the DataFrame produced by build(path), cached on
+    (path, variant, mtime, size).
+
+    Lookup order:
+      1. in-memory frame
+      2. Parquet / pickle sidecar next to the file (warm restart)
+      3. build(path) -> stored in memory + sidecar
+
+    A copy is returned so callers can mutate freely.
+    """
+
+    path = Path(path).resolve()
+    fingerprint = file_fingerprint(path)
+    key = (str(path), variant)
+
+    with _lock:
+        entry = _frames.get(key)
+        if entry is not None and entry[0] == fingerprint:
+            _frames.move_to_end(key)
+            _stats["hits"] += 1
+            return entry[1].copy()
+
+    stem = _sidecar_stem(path, variant)
+    df = _read_sidecar(stem, fingerprint)
+
+    if df is not None:
+        counter = "sidecar_hits"
+    else:
+        counter = "misses"
+        df = build(path)
+        _write_sidecar(stem, fingerprint, df)
+
+    size = int(df.memory_usage(index=True, deep=True).sum())
+
+    with _lock:
+        _stats[counter] += 1
+
+        old = _frames.pop(key, None)
+        if old is not None:
+            _bytes[0] -= old[2]
+
+        if size <= INPUT_CACHE_MAX_BYTES:
+            _frames[key] = (fingerprint, df, size)
+            _bytes[0] += size
+            _evict()
+
+    return df.copy()
+
+
+def _evict():
+    # Caller holds _lock
+    while _frames and (
+        len(_frames) > INPUT_CACHE_MAX_ENTRIES
+        or _bytes[0] > INPUT_CACHE_MAX_BYTES
+    ):
+        _, entry = _frames.popitem(last=False)
+        _bytes[0] -= entry[2]
+        _stats["evictions"] += 1
+
+
+# =================================================
+# PUBLIC LOADER
+# =================================================
+def read_input(path, sheet_name=None, **read_kwargs) -> pd.DataFrame:
+    """
+    Drop-in replacement for pd.read_excel / pd.read_csv on data/input files.
+
+    Excel (.xlsx/.xls) -> pd.read_excel(path, sheet_name=sheet_name or 0),
+                          parsed on the Excel process pool
+    Anything else      -> pd.read_csv(path)
+    """
+
+    path = Path(path)
+    is_excel = path.suffix.lower() in (".xlsx", ".xlsm", ".xls")
+
+    if is_excel:
+        sheet = 0 if sheet_name is None else sheet_name
+        read_kwargs["sheet_name"] = sheet
+
+    variant = repr(sorted(read_kwargs.items()))
+
+    def build(p: Path) -> pd.DataFrame:
+        if is_excel:
+            return parse_excel(p, **read_kwargs)
+        return pd.read_csv(p, **read_kwargs)
+
+    return cached_frame(path, variant, build)
+
+
+# =================================================
+# DIAGNOSTICS
+# =================================================
+def input_cache_stats() -> dict:
+    with _lock:
+        stats = dict(_stats)
+        entries = len(_frames)
+        size = _bytes[0]
+
+    lookups = stats["hits"] + stats["sidecar_hits"] + stats["misses"]
+
+    return {
+        **stats,
+        "entries": entries,
+        "bytes": size,
+        "max_entries": INPUT_CACHE_MAX_ENTRIES,
+        "max_bytes": INPUT_CACHE_MAX_BYTES,
+        "hit_ratio": (
+            round((stats["hits"] + stats["sidecar_hits"]) / lookups, 4)
+            if lookups else 0.0
+        ),
+        "parquet_sidecars": HAS_PYARROW,
+    }
+
+
+def clear_input_cache():
+    with _lock:
+        _frames.clear()
+        _bytes[0] = 0
@@ -0,0 +1,240 @@
+import inspect
+import os
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from app.services.pipeline import request_scope
+
+
+# =================================================
+# CONFIG
+# =================================================
+# Heavy computations running at once (the rest wait in the queue)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+
+# Finished jobs (and their results) are kept this long
+JOB_RESULT_TTL_SECONDS = int(os.getenv("JOB_RESULT_TTL_SECONDS", 900))
+
+# ... and at most this many (oldest finished jobs are dropped first)
+JOB_MAX_RETAINED = int(os.getenv("JOB_MAX_RETAINED", 50))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobError(Exception):
+    """Raised for unknown job kinds / invalid job parameters."""
+    pass
+
+
+# =================================================
+# JOB KINDS
+# =================================================
+_kinds: Dict[str, Callable] = {}
+_validators: Dict[str, Callable[[dict], dict]] = {}
+
+
+def register_job(
+    kind: str,
+    fn: Callable,
+    validate: Optional[Callable[[dict], dict]] = None,
+):
+    """
+    Makes fn(**params) submittable as a background job of this kind.
+    validate(params) -> params checks / coerces the submitted
+    parameters (raises ValueError / TypeError when invalid).
+    """
+
+    _kinds[kind] = fn
+    if validate is not None:
+        _validators[kind] = validate
+
+
+def job_kinds() -> dict:
+    return {
+        kind: [
+            p.name for p in inspect.signature(fn).parameters.values()
+        ]
+        for kind, fn in sorted(_kinds.items())
+    }
+
+
+def _bind(kind: str, params: dict) -> dict:
+    fn = _kinds.get(kind)
+    if fn is None:
+        raise JobError(f"Unknown job kind '{kind}', expected one of {sorted(_kinds)}")
+
+    validate = _validators.get(kind)
+    if validate is not None:
+        try:
+            params = validate(params)
+        except (ValueError, TypeError) as e:
+            raise JobError(f"Invalid parameters for {kind}: {e}")
+
+    try:
+        bound = inspect.signature(fn).bind(**params)
+    except TypeError as e:
+        raise JobError(f"Invalid parameters for {kind}: {e}")
+
+    bound.apply_defaults()
+    return dict(bound.arguments)
+
+
+def _freeze(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+# =================================================
+# JOB
+# =================================================
+class Job:
+    def __init__(self, kind: str, params: dict, key: tuple):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.key = key
+        self.status = QUEUED
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.timings = []
+        self.done = threading.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    def info(self) -> dict:
+        now = time.time()
+        end = self.finished_at or now
+
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "queued_ms": round(((self.started_at or now) - self.submitted_at) * 1000, 1),
+            "run_ms": round((end - self.started_at) * 1000, 1) if self.started_at else None,
+            "error": self.error,
+            "stages": self.timings,
+        }
+
+
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="job")
+_lock = threading.Lock()
+_jobs: Dict[str, Job] = {}
+_in_flight: Dict[tuple, str] = {}
+
+
+def _run(job: Job):
+    with _lock:
+        job.status = RUNNING
+        job.started_at = time.time()
+
+    try:
+        # Same stage memo as the API; own scope for per-stage timings
+        with request_scope() as scope:
+            result = _kinds[job.kind](**job.params)
+
+        with _lock:
+            job.result = result
+            job.timings = scope["timings"]
+            job.status = DONE
+
+    except Exception as e:
+        print(f"⚠️ JOB {job.kind} {job.id} FAILED:", e)
+        traceback.print_exc()
+
+        with _lock:
+            job.error = str(e)
+            job.status = FAILED
+
+    finally:
+        with _lock:
+            job.finished_at = time.time()
+            if _in_flight.get(job.key) == job.id:
+                del _in_flight[job.key]
+
+        job.done.set()
+
+
+def _purge_expired():
+    cutoff = time.time() - JOB_RESULT_TTL_SECONDS
+
+    with _lock:
+        finished = sorted(
+            (job for job in _jobs.values() if job.finished),
+            key=lambda job: job.finished_at,
+        )
+
+        # Past the TTL, or the oldest beyond the retention cap
+        # (queued / running jobs are never dropped)
+        excess = max(len(_jobs) - JOB_MAX_RETAINED, 0)
+
+        for i, job in enumerate(finished):
+            if job.finished_at < cutoff or i < excess:
+                del _jobs[job.id]
+
+
+# =================================================
+# PUBLIC API
+# =================================================
+def submit_job(kind: str, params: Optional[dict] = None) -> Job:
+    """
+    Queues kind(**params) on the worker pool and returns its Job.
+    An identical job still queued / running is returned instead of
+    starting a second one.
+    """
+
+    params = _bind(kind, params or {})
+    key = (kind, _freeze(params))
+
+    _purge_expired()
+
+    with _lock:
+        job_id = _in_flight.get(key)
+        if job_id is not None:
+            return _jobs[job_id]
+
+        job = Job(kind, params, key)
+        _jobs[job.id] = job
+        _in_flight[key] = job.id
+
+    _executor.submit(_run, job)
+    return job
+
+
+def get_job(job_id: str) -> Optional[Job]:
+    _purge_expired()
+
+    with _lock:
+        return _jobs.get(job_id)
+
+
+def job_stats() -> dict:
+    _purge_expired()
+
+    with _lock:
+        counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        for job in _jobs.values():
+            counts[job.status] += 1
+
+    return {
+        "workers": JOB_WORKERS,
+        "result_ttl_seconds": JOB_RESULT_TTL_SECONDS,
+        "max_retained": JOB_MAX_RETAINED,
+        "jobs": counts,
+    }
@@ -0,0 +1,135 @@
+import hashlib
+import os
+import threading
+import time
+from typing import Dict, Iterable
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from app.core.calculations.replenishment import ceil_to_carton
+from app.db import engine
+from app.services.result_cache import db_version, invalidate_results
+
+# =================================================
+# CONFIG
+# =================================================
+# Upper bound on the age of the carton map. /save-master-carton also
+# bumps the DB data version, which makes every worker reload it.
+CARTON_CACHE_TTL_SECONDS = int(os.getenv("MASTER_CARTON_TTL_SECONDS", 300))
+
+# Cached engine results that depend on the carton map
+CARTON_ROUNDED_RESULTS = (
+    "replenishment",
+    "replenishment_all",
+    "replenishment_sweep",
+)
+
+_lock = threading.Lock()
+_cartons: Dict[str, int] = {}
+_loaded_at = [0.0]
+_loaded_version = [None]
+
+
+def _key(model) -> str:
+    return str(model).strip().upper()
+
+
+# =================================================
+# CARTON MAP (model -> master carton)
+# =================================================
+def refresh_cartons(version=None) -> Dict[str, int]:
+    """
+    Reloads the model -> carton map from the master_cartons table.
+    version: DB data version the reload belongs to.
+    """
+
+    try:
+        with engine.connect() as conn:
+            rows = conn.execute(
+                text("SELECT model, master_carton FROM master_cartons")
+            ).fetchall()
+
+        cartons = {
+            _key(model): int(carton)
+            for model, carton in rows
+            if model is not None and carton is not None
+        }
+
+    except Exception as e:
+        print("⚠️ MASTER CARTON LOAD FAILED:", e)
+        cartons = {}
+
+    with _lock:
+        _cartons.clear()
+        _cartons.update(cartons)
+        _loaded_at[0] = time.time()
+        _loaded_version[0] = version
+
+    return dict(cartons)
+
+
+def carton_map() -> Dict[str, int]:
+    version = db_version()
+
+    with _lock:
+        fresh = (
+            time.time() - _loaded_at[0] <= CARTON_CACHE_TTL_SECONDS
+            and _loaded_version[0] == version
+        )
+        if fresh:
+            return dict(_cartons)
+
+    return refresh_cartons(version)
+
+
+def carton_version() -> str:
+    """
+    Token that changes whenever the carton map does (ETag input).
+    Stable across processes (no salted str hash).
+    """
+
+    token = repr(sorted(carton_map().items())).encode("utf-8")
+    return hashlib.sha1(token).hexdigest()[:16]
+
+
+def set_carton(model: str, master_carton):
+    """
+    Write-through update after /save-master-carton (this process;
+    other workers follow the data version bumped by the save).
+    """
+
+    with _lock:
+        if master_carton is None:
+            _cartons.pop(_key(model), None)
+        else:
+            _cartons[_key(model)] = int(master_carton)
+
+    # round_to_carton results were computed with the old carton
+    for name in CARTON_ROUNDED_RESULTS:
+        invalidate_results(name)
+
+
+def cartons_for(models: Iterable) -> np.ndarray:
+    """
+    Carton size per model (0 = no carton defined).
+    """
+
+    cartons = carton_map()
+    keys = pd.Series(models).astype(str).str.strip().str.upper()
+    return keys.map(cartons).fillna(0).astype(np.int64).to_numpy()
+
+
+# =================================================
+# ROUNDING
+# =================================================
+def round_to_cartons(df: pd.DataFrame, qty_col: str, model_col: str = "model") -> pd.DataFrame:
+    """
+    Rounds df[qty_col] up to each model's master carton in place and
+    adds a "master_carton" column.
+    """
+
+    df["master_carton"] = cartons_for(df[model_col])
+    df[qty_col] = ceil_to_carton(df[qty_col], df["master_carton"])
+    return df
@@ -0,0 +1,296 @@
+import contextvars
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional, Tuple
+
+from app.services.input_cache import record_reads, track_reads
+
+
+# =================================================
+# CONFIG
+# =================================================
+# Source stages (DB / file reads) are considered fresh for this long
+# unless invalidated explicitly.
+SOURCE_TTL_SECONDS = int(os.getenv("PIPELINE_SOURCE_TTL_SECONDS", 300))
+
+# Cross-request memo size per stage (distinct parameter sets)
+MAX_ENTRIES_PER_STAGE = int(os.getenv("PIPELINE_MAX_ENTRIES_PER_STAGE", 32))
+
+# Logs every stage run / cache hit with its timing
+PIPELINE_DEBUG = os.getenv("PIPELINE_DEBUG", "0") not in ("0", "false", "False")
+
+
+# =================================================
+# STAGE REGISTRY
+# =================================================
+class Stage:
+    """
+    One node of the computation graph.
+
+    name    : unique stage name
+    fn      : fn(*input_results, **params)
+    inputs  : upstream stages, either "name" or ("name", {param overrides})
+    params  : parameter names this stage depends on
+    ttl     : seconds a result stays fresh (source stages only)
+    version : fn(**params) -> token; result is stale once the token
+              changes (e.g. a file fingerprint, source stages only)
+    """
+
+    def __init__(self, name, fn, inputs=(), params=(), ttl=None, version=None):
+        self.name = name
+        self.fn = fn
+        self.inputs = [
+            (i, {}) if isinstance(i, str) else (i[0], dict(i[1]))
+            for i in inputs
+        ]
+        self.params = tuple(params)
+        self.ttl = ttl
+        self.version = version
+
+
+_stages: Dict[str, Stage] = {}
+
+
+def stage(
+    name: str,
+    inputs=(),
+    params=(),
+    ttl: Optional[int] = None,
+    version: Optional[Callable] = None,
+):
+    """
+    Decorator registering a function as a pipeline stage.
+    """
+
+    def register(fn: Callable):
+        _stages[name] = Stage(
+            name, fn, inputs=inputs, params=params, ttl=ttl, version=version
+        )
+        return fn
+
+    return register
+
+
+# =================================================
+# MEMO STORE (CROSS REQUEST)
+# =================================================
+class _Entry:
+    __slots__ = ("version", "upstream", "source_token", "result", "computed_at")
+
+    def __init__(self, version, upstream, source_token, result):
+        self.version = version
+        self.upstream = upstream
+        self.source_token = source_token
+        self.result = result
+        self.computed_at = time.time()
+
+
+_memo: Dict[str, "OrderedDict[tuple, _Entry]"] = {}
+_memo_lock = threading.Lock()
+# One lock per memoized (or in-flight) key, dropped with its entry
+_key_locks: Dict[Tuple[str, tuple], threading.Lock] = {}
+_version_counter = [0]
+
+_stats: Dict[str, dict] = {}
+
+
+def _next_version() -> int:
+    with _memo_lock:
+        _version_counter[0] += 1
+        return _version_counter[0]
+
+
+def _key_lock(name: str, key: tuple) -> threading.Lock:
+    with _memo_lock:
+        return _key_locks.setdefault((name, key), threading.Lock())
+
+
+def _drop_key_locks(name: str, keys):
+    # Caller holds _memo_lock. A thread still waiting on a dropped
+    # lock at worst recomputes the entry once.
+    for key in keys:
+        _key_locks.pop((name, key), None)
+
+
+def _record(name: str, ms: float, hit: bool):
+    with _memo_lock:
+        s = _stats.setdefault(
+            name,
+            {"runs": 0, "hits": 0, "total_ms": 0.0, "last_ms": 0.0},
+        )
+        if hit:
+            s["hits"] += 1
+        else:
+            s["runs"] += 1
+            s["total_ms"] += ms
+            s["last_ms"] = ms
+
+
+# =================================================
+# REQUEST SCOPE
+# =================================================
+_scope: contextvars.ContextVar = contextvars.ContextVar(
+    "pipeline_scope", default=None
+)
+
+
+@contextmanager
+def request_scope():
+    """
+    Groups all stage runs of one request: a stage is evaluated at most
+    once per scope, and per-stage timings are collected for reporting.
+    """
+
+    scope = {"results": {}, "timings": []}
+    token = _scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _scope.reset(token)
+
+
+def scope_timings() -> list:
+    scope = _scope.get()
+    return list(scope["timings"]) if scope else []
+
+
+def server_timing_header(timings: list) -> str:
+    return ", ".join(
+        f"{t['stage']};dur={t['ms']:.1f}"
+        + (';desc="cached"' if t["cached"] else "")
+        for t in timings
+    )
+
+
+# =================================================
+# EXECUTION
+# =================================================
+def _param_key(st: Stage, params: dict) -> tuple:
+    missing = [p for p in st.params if p not in params]
+    if missing:
+        raise ValueError(f"Stage {st.name} missing params: {missing}")
+    return tuple((p, params[p]) for p in st.params)
+
+
+def _is_fresh(st: Stage, entry: _Entry, upstream: tuple, token) -> bool:
+    if st.ttl is not None and time.time() - entry.computed_at > st.ttl:
+        return False
+    return entry.upstream == upstream and entry.source_token == token
+
+
+def _evaluate(name: str, params: dict) -> Tuple[int, object]:
+    st = _stages.get(name)
+    if st is None:
+        raise KeyError(f"Unknown pipeline stage: {name}")
+
+    key = _param_key(st, params)
+    scope = _scope.get()
+
+    if scope is not None and (name, key) in scope["results"]:
+        version, result, reads = scope["results"][(name, key)]
+        record_reads(reads)
+        return version, result
+
+    # Files read by this stage (inputs included), replayed into the
+    # caller's read log on request scope hits
+    with track_reads() as reads:
+        # Resolve inputs first (they are memoized themselves)
+        upstream_versions = []
+        upstream_results = []
+
+        for input_name, overrides in st.inputs:
+            version, result = _evaluate(input_name, {**params, **overrides})
+            upstream_versions.append(version)
+            upstream_results.append(result)
+
+        upstream = tuple(upstream_versions)
+        token = st.version(**dict(key)) if st.version else None
+
+        with _key_lock(name, key):
+            start = time.perf_counter()
+
+            with _memo_lock:
+                entry = _memo.get(name, {}).get(key)
+
+            hit = entry is not None and _is_fresh(st, entry, upstream, token)
+
+            if not hit:
+                try:
+                    result = st.fn(*upstream_results, **dict(key))
+                except BaseException:
+                    with _memo_lock:
+                        if key not in _memo.get(name, {}):
+                            _drop_key_locks(name, [key])
+                    raise
+
+                entry = _Entry(_next_version(), upstream, token, result)
+
+                with _memo_lock:
+                    store = _memo.setdefault(name, OrderedDict())
+                    store[key] = entry
+                    store.move_to_end(key)
+                    while len(store) > MAX_ENTRIES_PER_STAGE:
+                        evicted, _ = store.popitem(last=False)
+                        _drop_key_locks(name, [evicted])
+            else:
+                with _memo_lock:
+                    _memo[name].move_to_end(key)
+
+            ms = (time.perf_counter() - start) * 1000
+
+    record_reads(reads)
+
+    _record(name, ms, hit)
+
+    if PIPELINE_DEBUG:
+        print(f"⏱ STAGE {name} {'CACHED' if hit else 'RAN'} {ms:.1f} ms {dict(key)}")
+
+    if scope is not None:
+        scope["timings"].append({"stage": name, "ms": round(ms, 2), "cached": hit})
+        scope["results"][(name, key)] = (entry.version, entry.result, reads)
+
+    return entry.version, entry.result
+
+
+def run_stage(name: str, **params):
+    """
+    Returns the (shared, do-not-mutate) result of a stage,
+    computing it and its inputs only when needed.
+    """
+
+    return _evaluate(name, params)[1]
+
+
+def invalidate(name: Optional[str] = None):
+    """
+    Drops memoized results of one stage (or all stages).
+    Downstream stages recompute automatically because their
+    input versions change.
+    """
+
+    with _memo_lock:
+        if name is None:
+            _memo.clear()
+            _key_locks.clear()
+        else:
+            _drop_key_locks(name, list(_memo.pop(name, {})))
+
+
+# =================================================
+# DIAGNOSTICS
+# =================================================
+def stage_stats() -> dict:
+    with _memo_lock:
+        return {
+            name: {
+                **s,
+                "total_ms": round(s["total_ms"], 2),
+                "last_ms": round(s["last_ms"], 2),
+                "avg_ms": round(s["total_ms"] / s["runs"], 2) if s["runs"] else 0.0,
+                "entries": len(_memo.get(name, {})),
+            }
+            for name, s in _stats.items()
+        }
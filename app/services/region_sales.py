@@ -1,112 +1,71 @@
 import pandas as pd
-from pathlib import Path
+
+from app.services.shipment_tensor import state_tensor
+from app.services.result_cache import cached_result
 
 # =================================================
 # CONFIG
 # =================================================
-BASE_DIR = Path(__file__).resolve().parents[2]
-DATA_DIR = BASE_DIR / "data" / "input"
+REGION_WINDOW_DAYS = 30
 
 
 # =================================================
 # REGION SALES ENGINE (ACCOUNT + REGION WISE)
 # =================================================
-def calculate_region_sales(account: str = "Nexlev") -> pd.DataFrame:
+@cached_result("region_sales")
+def calculate_region_sales(
+    account: str = "Nexlev",
+    window_days: int = REGION_WINDOW_DAYS
+) -> pd.DataFrame:
     """
     Region Sales Engine
 
     Logic:
     1. Select shipment file based on account
-    2. Load FBA shipments Excel file
-    3. Filter last 30 days
-    4. Group by SKU + Shipping State
-    5. Calculate total units, weekly velocity, and revenue
+    2. Read the SKU x Shipping State daily shipment tensor
+    3. Take the last window_days days (two slice reads)
+    4. Calculate total units, weekly velocity, and revenue
+
+    total_units_30d / revenue_30d keep their names for the frontend
+    and hold the totals of the requested window.
     """
 
     # -------------------------------------------------
     # Select File Based on Account
     # -------------------------------------------------
-    if account.lower() == "nexlev":
-        shipments_file = DATA_DIR / "fba_shipments_nexlev.csv"
-    else:
-        shipments_file = DATA_DIR / "fba_shipments_viomi.csv"
+    tensor_account = "nexlev" if account.lower() == "nexlev" else "viomi"
 
-    if not shipments_file.exists():
-        raise FileNotFoundError(f"Missing file: {shipments_file}")
+    tensor = state_tensor(tensor_account)
 
-    # -------------------------------------------------
-    # Load File (Excel)
-    # -------------------------------------------------
-    shipments = pd.read_csv(shipments_file)
-    shipments.columns = shipments.columns.str.strip()
-
-    # -------------------------------------------------
-    # Required Columns Validation
-    # -------------------------------------------------
-    required_cols = [
-        "Merchant SKU",
-        "Shipped Quantity",
-        "Shipment Date",
-        "Shipping State",
-        "Item Price",
-    ]
-
-    for col in required_cols:
-        if col not in shipments.columns:
-            raise ValueError(f"Missing column in shipments file: {col}")
-
-    # -------------------------------------------------
-    # Data Cleaning
-    # -------------------------------------------------
-    shipments["Shipment Date"] = pd.to_datetime(
-        shipments["Shipment Date"], errors="coerce"
-    )
-
-    shipments["Shipped Quantity"] = pd.to_numeric(
-        shipments["Shipped Quantity"], errors="coerce"
-    ).fillna(0)
-
-    shipments["Item Price"] = pd.to_numeric(
-        shipments["Item Price"], errors="coerce"
-    ).fillna(0)
-
-    # Revenue Calculation
-    shipments["Revenue"] = shipments["Item Price"]
+    if tensor.last_day is None:
+        return pd.DataFrame()
 
     # -------------------------------------------------
-    # Filter Last 30 Days
+    # Window Totals
     # -------------------------------------------------
-    last_date = shipments["Shipment Date"].max()
-
-    if pd.isna(last_date):
-        return pd.DataFrame()
+    window = tensor.window_total(window_days)
 
-    cutoff_date = last_date - pd.Timedelta(days=30)
-
-    shipments_30 = shipments[
-    shipments["Shipment Date"] >= cutoff_date
-]
+    window = window[
+        (window["lines"] > 0)
+        & window["Merchant SKU"].notna()
+        & window["Shipping State"].notna()
+    ]
 
-    if shipments_30.empty:
+    if window.empty:
         return pd.DataFrame()
 
-    # -------------------------------------------------
-    # Region Aggregation
-    # -------------------------------------------------
-    region_sales = (
-        shipments_30
-        .groupby(["Merchant SKU", "Shipping State"], as_index=False)
-        .agg(
-            total_units_30d=("Shipped Quantity", "sum"),
-            revenue_30d=("Revenue", "sum"),
-        )
-    )
+    region_sales = pd.DataFrame({
+        "Merchant SKU": window["Merchant SKU"].to_numpy(),
+        "Shipping State": window["Shipping State"].to_numpy(),
+        "total_units_30d": window["Shipped Quantity"].to_numpy(),
+        "revenue_30d": window["Item Price"].to_numpy(),
+    })
 
     # -------------------------------------------------
     # Weekly Velocity (30 days ≈ 4.285 weeks)
     # -------------------------------------------------
     region_sales["weekly_velocity"] = (
-        region_sales["total_units_30d"] / 4.285
+        region_sales["total_units_30d"] / (window_days / 7)
     )
 
     # -------------------------------------------------
@@ -117,4 +76,4 @@ def calculate_region_sales(account: str = "Nexlev") -> pd.DataFrame:
         "Shipping State": "region"
     })
 
-    return region_sales
\ No newline at end of file
+    return region_sales
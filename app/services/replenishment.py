@@ -1,6 +1,14 @@
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from typing import Tuple
+from typing import Dict, Iterable, Optional, Tuple
+
+from app.core.calculations.replenishment import ceil_to_carton
+from app.services.concurrent_load import load_concurrently
+from app.services.input_cache import read_input
+from app.services.master_carton import cartons_for, round_to_cartons
+from app.services.result_cache import cached_result
+from app.services.sales_cube import sales_cube, week_numbers
 
 # =================================================
 # CONFIG
@@ -22,65 +30,102 @@ AMAZON_INV_VIOMI = DATA_DIR / "inventory_amazon_viomi.csv"
 
 AA_WM_MASTER_FILE = DATA_DIR / "Audio Array & WM Replenishment" / "AA & WM Replenishment.xlsx"
 
+# Accounts covered by the dashboard (multi-account mode)
+REPLENISHMENT_ACCOUNTS = ["NEXLEV", "VIOMI", "AUDIO ARRAY", "WHITE MULBERRY"]
+
+# Largest cover-weeks axis of a sensitivity sweep
+SWEEP_MAX_WEEKS = 52
+
 
 # =================================================
 # LOADERS
 # =================================================
 def load_data(account: str):
 
+    loaded = load_concurrently({
+        "account": lambda: load_account_data(account),
+        "sales": load_sales,
+    })
+
+    master, inventory, amazon_inventory = loaded["account"]
+
+    return master, loaded["sales"], inventory, amazon_inventory
+
+
+def load_sales() -> pd.DataFrame:
+    """
+    Weekly sales snapshot (shared by all accounts).
+    """
+
     if not SALES_FILE.exists():
         raise FileNotFoundError(f"Missing file: {SALES_FILE}")
 
-    if not WAREHOUSE_INV_FILE.exists():
-        raise FileNotFoundError(f"Missing file: {WAREHOUSE_INV_FILE}")
+    sales = read_input(SALES_FILE)
+    sales.columns = sales.columns.str.strip()
 
-    if account.upper() == "NEXLEV":
-        master = pd.read_excel(DATA_DIR / "replenishment_master_nexlev.xlsx")
+    validate_columns(
+        sales,
+        ["model", "units_sold", "week"],
+        "sales snapshot"
+    )
 
-    elif account.upper() == "VIOMI":
-        master = pd.read_excel(DATA_DIR / "replenishment_master_viomi.xlsx")
+    return sales
 
-    elif account.upper() == "AUDIO ARRAY":
-        master = pd.read_excel(AA_WM_MASTER_FILE, sheet_name="AA")
 
-    elif account.upper() == "WHITE MULBERRY":
-        master = pd.read_excel(AA_WM_MASTER_FILE, sheet_name="WM")
+def load_account_data(account: str):
+    """
+    Per-account inputs: replenishment master, warehouse inventory,
+    Amazon inventory (files read concurrently).
+    """
 
-    else:
-        raise ValueError(f"Unsupported account: {account}")
-    
-    sales = pd.read_csv(SALES_FILE)
-    
-    if account.upper() == "NEXLEV":
-        amazon_inventory = pd.read_csv(AMAZON_INV_NEXLEV)
+    if not WAREHOUSE_INV_FILE.exists():
+        raise FileNotFoundError(f"Missing file: {WAREHOUSE_INV_FILE}")
 
-    elif account.upper() == "VIOMI":
-        amazon_inventory = pd.read_csv(AMAZON_INV_VIOMI)
+    account = account.upper()
 
-    elif account.upper() == "AUDIO ARRAY":
-        amazon_inventory = pd.read_csv(AMAZON_INV_AUDIO_ARRAY)
+    if account == "NEXLEV":
+        master = lambda: read_input(DATA_DIR / "replenishment_master_nexlev.xlsx")
+        amazon_files = [AMAZON_INV_NEXLEV]
 
-    elif account.upper() == "WHITE MULBERRY":
+    elif account == "VIOMI":
+        master = lambda: read_input(DATA_DIR / "replenishment_master_viomi.xlsx")
+        amazon_files = [AMAZON_INV_VIOMI]
 
-       wm = pd.read_csv(AMAZON_INV_WM)
-       viomi = pd.read_csv(AMAZON_INV_VIOMI)
+    elif account == "AUDIO ARRAY":
+        master = lambda: read_input(AA_WM_MASTER_FILE, sheet_name="AA")
+        amazon_files = [AMAZON_INV_AUDIO_ARRAY]
 
-       amazon_inventory = pd.concat([wm, viomi], ignore_index=True)
+    elif account == "WHITE MULBERRY":
+        master = lambda: read_input(AA_WM_MASTER_FILE, sheet_name="WM")
+        amazon_files = [AMAZON_INV_WM, AMAZON_INV_VIOMI]
 
     else:
-      raise ValueError(f"Unsupported account: {account}")
+        raise ValueError(f"Unsupported account: {account}")
 
-    if account.upper() == "AUDIO ARRAY":
-        inventory = pd.read_excel(WAREHOUSE_INV_AUDIO_ARRAY)
+    if account == "AUDIO ARRAY":
+        inventory_file = WAREHOUSE_INV_AUDIO_ARRAY
+
+    elif account == "WHITE MULBERRY":
+        inventory_file = WAREHOUSE_INV_WM
 
-    elif account.upper() == "WHITE MULBERRY":
-        inventory = pd.read_excel(WAREHOUSE_INV_WM)
-    
     else:
-        inventory = pd.read_excel(WAREHOUSE_INV_FILE)
-    
+        inventory_file = WAREHOUSE_INV_FILE
 
-    return master, sales, inventory, amazon_inventory
+    tasks = {
+        "master": master,
+        "inventory": lambda: read_input(inventory_file),
+    }
+    for i, path in enumerate(amazon_files):
+        tasks[f"amazon_{i}"] = lambda path=path: read_input(path)
+
+    loaded = load_concurrently(tasks)
+
+    amazon_inventory = pd.concat(
+        [loaded[f"amazon_{i}"] for i in range(len(amazon_files))],
+        ignore_index=True,
+    )
+
+    return loaded["master"], loaded["inventory"], amazon_inventory
 
 
 # =================================================
@@ -97,14 +142,7 @@ def normalize_week_column(sales_df: pd.DataFrame) -> pd.DataFrame:
 
     df = sales_df.copy()
 
-    df["week_num"] = (
-        df["week"]
-        .astype(str)
-        .str.extract(r"(\d+)")
-        .astype(float)
-        .fillna(0)
-        .astype(int)
-    )
+    df["week_num"] = week_numbers(df["week"])
 
     return df
 
@@ -123,6 +161,42 @@ def get_last_n_weeks_sales(sales_df: pd.DataFrame, weeks: int) -> pd.DataFrame:
     return df[(df["week_num"] >= min_week) & (df["week_num"] <= max_week)]
 
 
+def _brand_key(values: pd.Series) -> pd.Series:
+    return values.str.replace(" ", "").str.upper()
+
+
+def sales_velocity_by_brand(sales_window: int) -> pd.DataFrame:
+    """
+    Velocity of every (brand, model) from the sales cube.
+
+    Returns brand_key, model, total_units_sold, sales_velocity where
+    brand_key is the brand without spaces, upper-cased (matches
+    account.replace(" ", "").upper()).
+    """
+
+    if not SALES_FILE.exists():
+        raise FileNotFoundError(f"Missing file: {SALES_FILE}")
+
+    # Always cap to 12 weeks (same window as get_last_n_weeks_sales)
+    totals = sales_cube(SALES_FILE).window_total(min(sales_window, 12))
+
+    velocity = (
+        totals
+        .assign(brand_key=_brand_key(totals["brand"]))
+        .groupby(["brand_key", "model"], as_index=False)
+        .agg(
+            total_units_sold=("units_sold", "sum")
+        )
+    )
+
+    # Average weekly velocity
+    velocity["sales_velocity"] = (
+        velocity["total_units_sold"] / max(sales_window, 1)
+    ).round(0)
+
+    return velocity
+
+
 # =================================================
 # VALIDATION
 # =================================================
@@ -141,10 +215,12 @@ def validate_columns(df: pd.DataFrame, required_cols: list, file_label: str):
 # =================================================
 # MAIN BUSINESS LOGIC
 # =================================================
+@cached_result("replenishment")
 def calculate_replenishment(
     sales_window: int,
     replenish_weeks: int,
-    account: str = "NEXLEV"
+    account: str = "NEXLEV",
+    round_to_carton: bool = False
 ) -> pd.DataFrame:
     """
     Core replenishment calculation.
@@ -152,12 +228,70 @@ def calculate_replenishment(
     weeks:
       - number of weeks used from sales snapshot
       - SAME number of weeks used for coverage planning
+
+    round_to_carton:
+      - round replenishment_qty up to the model's master carton
+    """
+
+    # Sales cube and account files are independent reads
+    loaded = load_concurrently({
+        "velocity": lambda: sales_velocity_by_brand(sales_window),
+        "inputs": lambda: _account_inputs(account),
+    })
+
+    return _account_replenishment(
+        account, loaded["velocity"], replenish_weeks, round_to_carton,
+        inputs=loaded["inputs"],
+    )
+
+
+@cached_result("replenishment_all")
+def calculate_replenishment_all(
+    sales_window: int,
+    replenish_weeks: int,
+    accounts: Iterable[str] = REPLENISHMENT_ACCOUNTS,
+    round_to_carton: bool = False
+) -> Dict[str, pd.DataFrame]:
+    """
+    Multi-account replenishment in one pass.
+
+    Velocity of all accounts comes from one sales-cube lookup; only
+    the per-account masters and inventories are loaded per account
+    (all accounts at once).
+    Returns {account: same frame as calculate_replenishment}.
+    """
+
+    velocity = sales_velocity_by_brand(sales_window)
+
+    # Accounts read disjoint files: load them concurrently
+    return load_concurrently({
+        account: (
+            lambda account=account: _account_replenishment(
+                account, velocity, replenish_weeks, round_to_carton
+            )
+        )
+        for account in accounts
+    })
+
+
+def _account_velocity(account: str, brand_velocity: pd.DataFrame) -> pd.DataFrame:
+    return brand_velocity.loc[
+        brand_velocity["brand_key"] == account.replace(" ", "").upper(),
+        ["model", "total_units_sold", "sales_velocity"],
+    ]
+
+
+def _account_inputs(account: str) -> pd.DataFrame:
+    """
+    Master rows of an account with Amazon (sellable + inbound) and
+    AMPM warehouse inventory merged in. Independent of the sales
+    window and the cover weeks.
     """
 
     # ---------------------------------------------
     # LOAD
     # ---------------------------------------------
-    master, sales, inventory, amazon_inventory = load_data(account)
+    master, inventory, amazon_inventory = load_account_data(account)
 
     amazon_inventory["amazon_inventory"] = (
     amazon_inventory["afn-total-quantity"]
@@ -183,7 +317,6 @@ def calculate_replenishment(
     # NORMALIZE COLUMNS
     # ---------------------------------------------
     master.columns = master.columns.str.strip()
-    sales.columns = sales.columns.str.strip()
     inventory.columns = inventory.columns.str.strip()
 
     amazon_inventory.columns = amazon_inventory.columns.str.strip()
@@ -198,50 +331,10 @@ def calculate_replenishment(
         )
 
 
-    validate_columns(
-        sales,
-        ["model", "units_sold", "week"],
-        "sales snapshot"
-    )
-
-    # ---------------------------------------------
-    # SALES WINDOW
-    # ---------------------------------------------
-    sales_n = get_last_n_weeks_sales(sales, sales_window)
-
-    # filter sales for selected account
-    sales_n = sales_n[
-    sales_n["brand"].str.replace(" ", "").str.upper()
-    == account.replace(" ", "").upper()
-]
-
-    # ---------------------------------------------
-    # AGGREGATE SALES
-    # ---------------------------------------------
-    velocity = (
-        sales_n
-        .groupby("model", as_index=False)
-        .agg(
-            total_units_sold=("units_sold", "sum")
-        )
-    )
-
-    # Average weekly velocity
-    velocity["sales_velocity"] = (
-    velocity["total_units_sold"] / max(sales_window, 1)
-).round(0)
-
     # ---------------------------------------------
     # MERGE WITH MASTER
     # ---------------------------------------------
     df = master.merge(
-        velocity,
-        left_on="Model",
-        right_on="model",
-        how="left",
-    )
-    
-    df = df.merge(
         amazon_inventory,
         left_on="ASIN",
         right_on="asin",
@@ -252,12 +345,6 @@ def calculate_replenishment(
 
     df["inbound_inventory"] = df["inbound_inventory"].fillna(0)
 
-    # ---------------------------------------------
-    # NULL SAFETY
-    # ---------------------------------------------
-    df["sales_velocity"] = df["sales_velocity"].fillna(0)
-    df["total_units_sold"] = df["total_units_sold"].fillna(0)
-
     # ---------------------------------------------
     # UI-SAFE COLUMN ALIASES
     # (frontend depends on these exact keys)
@@ -280,6 +367,36 @@ def calculate_replenishment(
 
     df["amazon_inventory"] = df["amazon_inventory"].fillna(0)
     df["ampm_inventory"] = df["ampm_inventory"].fillna(0)
+
+    return df
+
+
+def _account_replenishment(
+    account: str,
+    brand_velocity: pd.DataFrame,
+    replenish_weeks: int,
+    round_to_carton: bool,
+    inputs: Optional[pd.DataFrame] = None
+) -> pd.DataFrame:
+
+    df = inputs if inputs is not None else _account_inputs(account)
+
+    # ---------------------------------------------
+    # SALES VELOCITY (selected account)
+    # ---------------------------------------------
+    df = df.merge(
+        _account_velocity(account, brand_velocity),
+        left_on="Model",
+        right_on="model",
+        how="left",
+    )
+
+    # ---------------------------------------------
+    # NULL SAFETY
+    # ---------------------------------------------
+    df["sales_velocity"] = df["sales_velocity"].fillna(0)
+    df["total_units_sold"] = df["total_units_sold"].fillna(0)
+
     # ---------------------------------------------
     # REQUIREMENT CALCULATION
     # ---------------------------------------------
@@ -296,6 +413,10 @@ def calculate_replenishment(
         df["required_units"] - df["amazon_inventory"]
     ).clip(lower=0)
 
+    # Optional: full master cartons only (before the AMPM check below)
+    if round_to_carton:
+        df = round_to_cartons(df, "replenishment_qty", model_col="Model")
+
     # ---------------------------------------------
     # WAREHOUSE SHORTFALL (REORDER SIGNAL)
     # ---------------------------------------------
@@ -346,4 +467,79 @@ def calculate_replenishment(
     # Uncomment if needed
     # print(df.columns.tolist())
 
-    return df
\ No newline at end of file
+    return df
+
+
+# =================================================
+# SENSITIVITY SWEEP (WEEKS x SALES WINDOWS)
+# =================================================
+@cached_result("replenishment_sweep")
+def calculate_replenishment_sweep(
+    sales_windows: Iterable[int],
+    replenish_weeks: Iterable[int],
+    account: str = "NEXLEV",
+    round_to_carton: bool = False
+) -> pd.DataFrame:
+    """
+    calculate_replenishment for every (sales_window, replenish_weeks)
+    pair in one call.
+
+    The account inputs are loaded once; per sales window the
+    requirement / replenishment / shortfall math is broadcast over a
+    models x weeks grid, with the same rounding as the single run.
+
+    Returns one row per (model, sales_window, replenish_weeks):
+      model, sales_window, replenish_weeks, sales_velocity,
+      required_units, replenishment_qty, warehouse_shortfall
+    """
+
+    weeks = np.array(sorted(set(int(w) for w in replenish_weeks)), dtype=float)
+    windows = sorted(set(int(w) for w in sales_windows))
+
+    if len(weeks) == 0 or not windows:
+        raise ValueError("Sweep needs at least one sales window and one cover week")
+
+    if weeks[0] < 1 or weeks[-1] > SWEEP_MAX_WEEKS:
+        raise ValueError(f"Cover weeks must be 1-{SWEEP_MAX_WEEKS}")
+
+    if windows[0] < 1:
+        raise ValueError("Sales windows must be at least 1 week")
+
+    inputs = _account_inputs(account)
+
+    models = inputs["Model"].to_numpy()
+    amazon = inputs["amazon_inventory"].to_numpy(float)[:, None]
+    ampm = inputs["ampm_inventory"].to_numpy(float)[:, None]
+    cartons = cartons_for(inputs["Model"])[:, None] if round_to_carton else None
+
+    n_models, n_weeks = len(models), len(weeks)
+    frames = []
+
+    for window in windows:
+        velocity = _account_velocity(account, sales_velocity_by_brand(window))
+        velocity = velocity.drop_duplicates("model").set_index("model")["sales_velocity"]
+
+        v = inputs["Model"].map(velocity).fillna(0).to_numpy(float)
+
+        # ---------------------------------------------
+        # BROADCAST: models x weeks
+        # ---------------------------------------------
+        required = np.round(v[:, None] * weeks[None, :])
+        replenishment = np.clip(required - amazon, 0, None)
+
+        if cartons is not None:
+            replenishment = ceil_to_carton(replenishment, cartons)
+
+        shortfall = np.clip(replenishment - ampm, 0, None)
+
+        frames.append(pd.DataFrame({
+            "model": np.repeat(models, n_weeks),
+            "sales_window": window,
+            "replenish_weeks": np.tile(weeks.astype(np.int64), n_models),
+            "sales_velocity": np.repeat(v, n_weeks),
+            "required_units": required.ravel(),
+            "replenishment_qty": replenishment.ravel(),
+            "warehouse_shortfall": shortfall.ravel(),
+        }))
+
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,321 @@
+import functools
+import hashlib
+import inspect
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+
+from app.core.ingestion.ingest_batches import data_version
+from app.db import engine
+from app.services import pipeline
+from app.services.input_cache import (
+    SIDECAR_DIR_NAME,
+    reads_unchanged,
+    record_reads,
+    track_reads,
+)
+
+# =================================================
+# CONFIG
+# =================================================
+BASE_DIR = Path(__file__).resolve().parents[2]
+DATA_DIR = BASE_DIR / "data" / "input"
+
+# Results older than this are recomputed even if no input changed
+RESULT_CACHE_TTL_SECONDS = int(os.getenv("RESULT_CACHE_TTL_SECONDS", 600))
+
+# LRU bounds (whichever is hit first)
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", 256))
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_MB", 256)) * 1024 * 1024
+
+# The DB data version is read at most this often
+DATA_VERSION_POLL_SECONDS = int(os.getenv("DATA_VERSION_POLL_SECONDS", 15))
+
+# data/input is walked at most this often (ETags / SKU index versions)
+FILES_FINGERPRINT_POLL_SECONDS = int(os.getenv("FILES_FINGERPRINT_POLL_SECONDS", 5))
+
+
+# =================================================
+# INPUT VERSION
+# =================================================
+# (DB data version, input files fingerprint). The DB part is bumped by
+# every load (upload_data.py / ingestion modules, see data_version);
+# the file part covers the spreadsheets / CSVs read from data/input.
+# Cached results are keyed on the DB part and on the files each engine
+# actually read (input_cache.track_reads), not on the whole directory.
+
+_db_version = {"value": None, "checked_at": 0.0}
+_db_version_lock = threading.Lock()
+
+
+def _poll_db_version():
+    with _db_version_lock:
+        if time.time() - _db_version["checked_at"] < DATA_VERSION_POLL_SECONDS:
+            return _db_version["value"]
+
+        try:
+            with engine.connect() as conn:
+                value = data_version(conn)
+        except Exception:
+            # Table not created yet / DB unreachable: keep the last value
+            value = _db_version["value"]
+
+        changed = value != _db_version["value"]
+        _db_version["value"] = value
+        _db_version["checked_at"] = time.time()
+
+    if changed:
+        # New data in the DB: memoized source stages are stale too
+        pipeline.invalidate()
+
+    return value
+
+
+_files_version = {"value": None, "checked_at": 0.0}
+_files_version_lock = threading.Lock()
+
+
+def _poll_files_fingerprint() -> str:
+    with _files_version_lock:
+        if time.time() - _files_version["checked_at"] >= FILES_FINGERPRINT_POLL_SECONDS:
+            _files_version["value"] = _files_fingerprint()
+            _files_version["checked_at"] = time.time()
+
+        return _files_version["value"]
+
+
+def _files_fingerprint() -> str:
+    entries = []
+
+    for root, dirs, files in os.walk(DATA_DIR):
+        # input_cache sidecars are written while results are computed:
+        # they are derived data, not inputs
+        dirs[:] = [d for d in dirs if d != SIDECAR_DIR_NAME]
+
+        for name in files:
+            try:
+                st = os.stat(os.path.join(root, name))
+            except OSError:
+                continue
+            rel = os.path.relpath(root, DATA_DIR)
+            entries.append((rel, name, st.st_mtime_ns, st.st_size))
+
+    # hashlib, not hash(): str hashes are salted per process and the
+    # token must agree across workers / restarts (ETags)
+    token = repr(sorted(entries)).encode("utf-8")
+    return hashlib.sha1(token).hexdigest()[:16]
+
+
+def db_version():
+    """
+    Current DB data version (polled, see DATA_VERSION_POLL_SECONDS).
+    """
+
+    return _poll_db_version()
+
+
+def input_version() -> tuple:
+    """
+    (DB data version, data/input fingerprint), both polled.
+    """
+
+    return _poll_db_version(), _poll_files_fingerprint()
+
+
+# =================================================
+# STORE
+# =================================================
+class _Entry:
+    __slots__ = ("version", "reads", "result", "size", "computed_at")
+
+    def __init__(self, version, reads, result, size):
+        self.version = version
+        self.reads = reads
+        self.result = result
+        self.size = size
+        self.computed_at = time.time()
+
+
+_store: "OrderedDict[tuple, _Entry]" = OrderedDict()
+_lock = threading.Lock()
+_bytes = [0]
+_stats: Dict[str, dict] = {}
+
+
+def _copy(value):
+    """
+    Private copy for the caller (results are mutated downstream).
+    """
+
+    if isinstance(value, pd.DataFrame):
+        return value.copy()
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy(v) for v in value]
+    return value
+
+
+def _size(value) -> int:
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_size(v) for v in value.values())
+    if isinstance(value, list):
+        return sys.getsizeof(value) + sum(_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def _freeze(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+def _count(name: str, field: str, ms: float = 0.0):
+    with _lock:
+        s = _stats.setdefault(
+            name, {"hits": 0, "misses": 0, "evictions": 0, "compute_ms": 0.0}
+        )
+        s[field] += 1
+        s["compute_ms"] += ms
+
+
+def _evict():
+    # Caller holds _lock
+    while _store and (
+        len(_store) > RESULT_CACHE_MAX_ENTRIES
+        or _bytes[0] > RESULT_CACHE_MAX_BYTES
+    ):
+        key, entry = _store.popitem(last=False)
+        _bytes[0] -= entry.size
+        _stats.setdefault(
+            key[0], {"hits": 0, "misses": 0, "evictions": 0, "compute_ms": 0.0}
+        )["evictions"] += 1
+
+
+# =================================================
+# DECORATOR
+# =================================================
+def cached_result(name: str):
+    """
+    Caches fn's result per (name, bound parameters).
+
+    A hit is returned as a private copy; an entry is stale once the DB
+    data version changes, once any input file fn read changes, or after
+    the TTL, and is dropped by LRU.
+    """
+
+    def wrap(fn: Callable):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def cached(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (name, _freeze(dict(bound.arguments)))
+            version = _poll_db_version()
+
+            with _lock:
+                entry = _store.get(key)
+
+            fresh = (
+                entry is not None
+                and entry.version == version
+                and time.time() - entry.computed_at <= RESULT_CACHE_TTL_SECONDS
+                and reads_unchanged(entry.reads)
+            )
+
+            if fresh:
+                with _lock:
+                    if key in _store:
+                        _store.move_to_end(key)
+
+                _count(name, "hits")
+                # An enclosing cached engine depends on these files too
+                record_reads(entry.reads)
+                return _copy(entry.result)
+
+            start = time.perf_counter()
+            with track_reads() as reads:
+                result = fn(*args, **kwargs)
+            ms = (time.perf_counter() - start) * 1000
+
+            record_reads(reads)
+            _count(name, "misses", ms)
+
+            stored = _Entry(version, reads, _copy(result), _size(result))
+
+            with _lock:
+                old = _store.pop(key, None)
+                if old is not None:
+                    _bytes[0] -= old.size
+
+                if stored.size <= RESULT_CACHE_MAX_BYTES:
+                    _store[key] = stored
+                    _bytes[0] += stored.size
+                    _evict()
+
+            return result
+
+        return cached
+
+    return wrap
+
+
+def invalidate_results(name: Optional[str] = None):
+    """
+    Drops cached results of one engine (or all).
+    """
+
+    with _lock:
+        for key in [k for k in _store if name is None or k[0] == name]:
+            _bytes[0] -= _store.pop(key).size
+
+
+# =================================================
+# DIAGNOSTICS
+# =================================================
+def result_cache_stats() -> dict:
+    with _lock:
+        per_engine = {}
+
+        for key, entry in _store.items():
+            e = per_engine.setdefault(key[0], {"entries": 0, "bytes": 0})
+            e["entries"] += 1
+            e["bytes"] += entry.size
+
+        engines = {}
+        hits = misses = 0
+
+        for name, s in _stats.items():
+            hits += s["hits"]
+            misses += s["misses"]
+            lookups = s["hits"] + s["misses"]
+            engines[name] = {
+                **s,
+                "compute_ms": round(s["compute_ms"], 2),
+                "hit_ratio": round(s["hits"] / lookups, 3) if lookups else 0.0,
+                **per_engine.get(name, {"entries": 0, "bytes": 0}),
+            }
+
+        return {
+            "entries": len(_store),
+            "bytes": _bytes[0],
+            "max_entries": RESULT_CACHE_MAX_ENTRIES,
+            "max_bytes": RESULT_CACHE_MAX_BYTES,
+            "ttl_seconds": RESULT_CACHE_TTL_SECONDS,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+            "data_version": _db_version["value"],
+            "engines": engines,
+        }
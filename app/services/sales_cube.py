@@ -0,0 +1,204 @@
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.services.input_cache import read_input, file_fingerprint
+from app.services.pipeline import stage, run_stage
+
+
+# =================================================
+# CONFIG
+# =================================================
+MAX_WINDOW_WEEKS = 52
+
+
+# =================================================
+# CUBE
+# =================================================
+class SalesCube:
+    """
+    Dense key x week cube of weekly sales with cumulative sums.
+
+    keys   : one row per key (e.g. brand, model[, channel])
+    weeks  : week numbers of the week axis, 1 .. last week
+    cum    : (n_keys, n_weeks + 1, n_values), cum[:, 0] = 0
+
+    Any trailing window total is cum[:, end] - cum[:, end - n],
+    i.e. two reads per key whatever the window length.
+    """
+
+    def __init__(
+        self,
+        keys: pd.DataFrame,
+        weeks: np.ndarray,
+        cum: np.ndarray,
+        values: Tuple[str, ...],
+    ):
+        self.keys = keys
+        self.weeks = weeks
+        self.cum = cum
+        self.values = values
+
+    @property
+    def last_week(self) -> int:
+        return int(self.weeks[-1]) if len(self.weeks) else 0
+
+    def _span(self, weeks: int, end_week: Optional[int]) -> Tuple[int, int]:
+        if not 1 <= weeks <= MAX_WINDOW_WEEKS:
+            raise ValueError(
+                f"Window must be 1-{MAX_WINDOW_WEEKS} weeks, got {weeks}"
+            )
+
+        # The week axis starts at week 1, so week w ends at cum[:, w]
+        if end_week is None:
+            end = len(self.weeks)
+        else:
+            end = int(np.clip(end_week, 0, len(self.weeks)))
+
+        return max(end - weeks, 0), end
+
+    def window_total(self, weeks: int, end_week: Optional[int] = None) -> pd.DataFrame:
+        """
+        Per-key totals of the `weeks` weeks ending at end_week
+        (default: last week of the snapshot).
+        """
+
+        lo, hi = self._span(weeks, end_week)
+        totals = self.cum[:, hi, :] - self.cum[:, lo, :]
+
+        out = self.keys.copy()
+        for i, col in enumerate(self.values):
+            out[col] = totals[:, i]
+
+        return out
+
+    def snapshot_total(self) -> pd.DataFrame:
+        """
+        Per-key totals over every week of the snapshot.
+        """
+
+        totals = self.cum[:, -1, :]
+
+        out = self.keys.copy()
+        for i, col in enumerate(self.values):
+            out[col] = totals[:, i]
+
+        return out
+
+    def window_average(self, weeks: int, end_week: Optional[int] = None) -> pd.DataFrame:
+        """
+        Per-key weekly averages over the window (total / weeks).
+        """
+
+        out = self.window_total(weeks, end_week)
+        for col in self.values:
+            out[col] = out[col] / weeks
+
+        return out
+
+
+def week_numbers(week: pd.Series) -> pd.Series:
+    """
+    'Week 4' / 'week 4' / '4' -> 4 (unparseable -> 0).
+    """
+
+    return (
+        week
+        .astype(str)
+        .str.extract(r"(\d+)", expand=False)
+        .astype(float)
+        .fillna(0)
+        .astype(int)
+    )
+
+
+def build_sales_cube(
+    sales: pd.DataFrame,
+    keys: Iterable[str],
+    values: Iterable[str] = ("units_sold",),
+    week_col: str = "week",
+) -> SalesCube:
+    """
+    Builds the cube from a weekly sales snapshot.
+    Key values are kept as stored (NaN included); rows without a
+    week number >= 1 are ignored.
+    """
+
+    keys = list(keys)
+    values = tuple(values)
+
+    missing = [c for c in keys + list(values) + [week_col] if c not in sales.columns]
+    if missing:
+        raise ValueError(
+            f"Missing columns in sales snapshot: {', '.join(missing)}"
+        )
+
+    week_num = week_numbers(sales[week_col])
+    df = sales.loc[week_num >= 1, keys + list(values)]
+    week_num = week_num[week_num >= 1].to_numpy()
+
+    n_weeks = int(week_num.max()) if len(week_num) else 0
+    weeks = np.arange(1, n_weeks + 1)
+
+    codes = df.groupby(keys, dropna=False, sort=True).ngroup().to_numpy()
+    n_keys = int(codes.max()) + 1 if len(codes) else 0
+
+    key_table = (
+        df[keys]
+        .assign(_code=codes)
+        .drop_duplicates("_code")
+        .sort_values("_code")
+        .drop(columns="_code")
+        .reset_index(drop=True)
+    )
+
+    cube = np.zeros((n_keys, n_weeks, len(values)))
+    flat = codes * n_weeks + (week_num - 1)
+
+    for i, col in enumerate(values):
+        weights = pd.to_numeric(df[col], errors="coerce").fillna(0).to_numpy()
+        cube[:, :, i] = np.bincount(
+            flat, weights=weights, minlength=n_keys * n_weeks
+        ).reshape(n_keys, n_weeks)
+
+    cum = np.zeros((n_keys, n_weeks + 1, len(values)))
+    cum[:, 1:, :] = np.cumsum(cube, axis=1)
+
+    return SalesCube(key_table, weeks, cum, values)
+
+
+# =================================================
+# PIPELINE STAGE (ONE BUILD PER SNAPSHOT VERSION)
+# =================================================
+def _cube_version(path: str, **_):
+    try:
+        return file_fingerprint(path)
+    except OSError:
+        return None
+
+
+@stage("sales_cube", params=("path", "keys", "values"), version=_cube_version)
+def _sales_cube_stage(path: str, keys: tuple, values: tuple) -> SalesCube:
+    sales = read_input(path)
+    sales.columns = sales.columns.str.strip().str.lower()
+    return build_sales_cube(sales, keys, values)
+
+
+def sales_cube(
+    path,
+    keys: Iterable[str] = ("brand", "model"),
+    values: Iterable[str] = ("units_sold",),
+) -> SalesCube:
+    """
+    Cube of a weekly sales snapshot file (column names stripped and
+    lower-cased), rebuilt only when the file changes.
+    Shared object - do not mutate.
+    """
+
+    return run_stage(
+        "sales_cube",
+        path=str(path),
+        keys=tuple(keys),
+        values=tuple(values),
+    )
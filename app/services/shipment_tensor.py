@@ -0,0 +1,422 @@
+import pickle
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from app.db import get_engine
+from app.services.input_cache import file_fingerprint
+from app.services.pipeline import stage, run_stage, SOURCE_TTL_SECONDS
+from app.services.shipments_reader import read_shipments
+
+# =================================================
+# CONFIG
+# =================================================
+BASE_DIR = Path(__file__).resolve().parents[2]
+DATA_DIR = BASE_DIR / "data" / "input"
+
+# Persisted tensors: <account>.<kind>.npy (cumulative array, memory
+# mapped on load) + <account>.<kind>.meta.pkl (keys, start day, stamp)
+TENSOR_DIR = BASE_DIR / "data" / "tensors"
+
+# Windows offered by the APIs (any 1..n_days window works)
+VELOCITY_WINDOWS = (7, 14, 30, 60, 90, 180)
+
+# Longest window the APIs accept (window_days le=365); the day axis
+# keeps one spare day so memory / file size stay bounded as history grows
+MAX_WINDOW_DAYS = 365
+TENSOR_MAX_DAYS = MAX_WINDOW_DAYS + 1
+
+# Bumped when the persisted layout changes (older files are rebuilt)
+TENSOR_FORMAT = 3
+
+SHIPMENT_FILES = {
+    "nexlev": DATA_DIR / "fba_shipments_nexlev.csv",
+    "viomi": DATA_DIR / "fba_shipments_viomi.csv",
+    "fossil": DATA_DIR / "Fossil Replenishment" / "fba_shipments_fossil.csv",
+}
+
+# sku x FC x channel per day, same SKU normalization as load_fc_data,
+# limited to the last :max_days days of the account's shipments
+FC_DAILY_SQL = text("""
+    WITH last AS (
+        SELECT MAX(CAST(CAST("Shipment Date" AS timestamp) AS date)) AS day
+        FROM shipments
+        WHERE LOWER(account) = :account
+    )
+    SELECT
+        COALESCE(UPPER(TRIM(CAST("Merchant SKU" AS text))), 'NAN') AS sku,
+        "FC",
+        LOWER(TRIM(CAST("Sales Channel" AS text))) AS channel,
+        CAST(CAST("Shipment Date" AS timestamp) AS date) AS day,
+        SUM(COALESCE(CAST("Shipped Quantity" AS double precision), 0)) AS units,
+        COUNT(*) AS lines,
+        SUM(CASE WHEN CAST("Shipped Quantity" AS double precision) < 0 THEN 1 ELSE 0 END)
+            AS negative_lines
+    FROM shipments
+    WHERE LOWER(account) = :account
+      AND "Shipment Date" IS NOT NULL
+      AND CAST(CAST("Shipment Date" AS timestamp) AS date)
+          > (SELECT day FROM last) - :max_days
+    GROUP BY 1, 2, 3, 4
+""")
+
+LAST_BATCH_SQL = text("""
+    SELECT MAX(id) FROM ingest_batches
+    WHERE table_name = 'shipments' AND account = :account
+""")
+
+FC_KEYS = ("sku", "FC", "channel")
+FC_VALUES = ("units", "lines", "negative_lines")
+
+STATE_KEYS = ("Merchant SKU", "Shipping State")
+STATE_VALUES = ("Shipped Quantity", "Item Price", "lines")
+
+
+# =================================================
+# TENSOR
+# =================================================
+class ShipmentTensor:
+    """
+    Daily cumulative shipments per key.
+
+    keys  : one row per key (e.g. sku, FC, channel)
+    start : first day of the day axis
+    cum   : (n_keys, n_days + 1, n_values), cum[:, 0] = 0
+
+    A window of the last N days is cum[:, end] - cum[:, end - N]:
+    two slice reads, whatever N is.
+    """
+
+    def __init__(
+        self,
+        keys: pd.DataFrame,
+        start: Optional[pd.Timestamp],
+        cum: np.ndarray,
+        values: Tuple[str, ...],
+    ):
+        self.keys = keys
+        self.start = start
+        self.cum = cum
+        self.values = values
+
+    @property
+    def n_days(self) -> int:
+        return self.cum.shape[1] - 1
+
+    @property
+    def last_day(self) -> Optional[pd.Timestamp]:
+        if self.start is None or self.n_days == 0:
+            return None
+        return self.start + pd.Timedelta(days=self.n_days - 1)
+
+    def window_total(self, days: int) -> pd.DataFrame:
+        """
+        Per-key totals of the `days` days ending on the last day.
+        """
+
+        if days < 1:
+            raise ValueError(f"Window must be at least 1 day, got {days}")
+
+        hi = self.n_days
+        lo = max(hi - days, 0)
+        totals = (
+            np.asarray(self.cum[:, hi, :], dtype=np.float64)
+            - np.asarray(self.cum[:, lo, :], dtype=np.float64)
+        )
+
+        if np.issubdtype(self.cum.dtype, np.floating):
+            # Differences of float64 sums of 2-decimal prices carry
+            # binary noise far below a paisa: snap back to paise
+            totals = totals.round(2)
+
+        out = self.keys.copy()
+        for i, col in enumerate(self.values):
+            out[col] = totals[:, i]
+
+        return out
+
+    def window_bounds(self, days: int) -> Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp]]:
+        last = self.last_day
+        if last is None:
+            return None, None
+        first = max(self.start, last - pd.Timedelta(days=days - 1))
+        return first, last
+
+    # ---------------------------------------------
+    # PERSISTENCE
+    # ---------------------------------------------
+    def save(self, stem: Path, stamp=None):
+        stem.parent.mkdir(parents=True, exist_ok=True)
+
+        tmp = stem.with_name(stem.name + ".tmp.npy")
+        np.save(tmp, np.ascontiguousarray(self.cum))
+        tmp.replace(stem.with_name(stem.name + ".npy"))
+
+        meta = {
+            "keys": self.keys,
+            "start": self.start,
+            "values": self.values,
+            "shape": tuple(self.cum.shape),
+            "format": TENSOR_FORMAT,
+            "stamp": stamp,
+        }
+        tmp = stem.with_name(stem.name + ".meta.tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(meta, f)
+        tmp.replace(stem.with_name(stem.name + ".meta.pkl"))
+
+    @classmethod
+    def load(cls, stem: Path) -> Tuple[Optional["ShipmentTensor"], object]:
+        """
+        (tensor, stamp), the array memory mapped read-only;
+        (None, None) when nothing is persisted.
+        """
+
+        array_path = stem.with_name(stem.name + ".npy")
+        meta_path = stem.with_name(stem.name + ".meta.pkl")
+
+        if not array_path.exists() or not meta_path.exists():
+            return None, None
+
+        try:
+            with open(meta_path, "rb") as f:
+                meta = pickle.load(f)
+            cum = np.load(array_path, mmap_mode="r")
+        except Exception as e:
+            print("⚠️ SHIPMENT TENSOR LOAD FAILED:", stem, e)
+            return None, None
+
+        # Array and meta are replaced one after the other
+        if tuple(cum.shape) != tuple(meta.get("shape", ())):
+            return None, None
+
+        if meta.get("format") != TENSOR_FORMAT:
+            return None, None
+
+        return cls(meta["keys"], meta["start"], cum, meta["values"]), meta["stamp"]
+
+
+def build_shipment_tensor(
+    df: pd.DataFrame,
+    keys: Iterable[str],
+    values: Iterable[str],
+    date_col: str,
+    dtype=np.float64,
+    max_days: Optional[int] = TENSOR_MAX_DAYS,
+) -> ShipmentTensor:
+    """
+    Builds the tensor from shipment lines (or per-day aggregates).
+    Key values are kept as stored (NaN included); rows without a date
+    or older than max_days before the last day are ignored. A "lines"
+    value missing from df counts rows.
+    dtype: storage type of the cumulative sums (int32 for integral
+    values, float64 otherwise: float32 loses paise on cumulative
+    revenue).
+    """
+
+    keys = list(keys)
+    values = tuple(values)
+
+    days = pd.to_datetime(df[date_col], errors="coerce").dt.normalize()
+    valid = days.notna()
+
+    if max_days is not None and valid.any():
+        valid &= days > days.max() - pd.Timedelta(days=max_days)
+
+    valid = valid.to_numpy()
+    df = df.loc[valid]
+    days = days[valid]
+
+    if df.empty:
+        return ShipmentTensor(
+            pd.DataFrame(columns=keys), None, np.zeros((0, 1, len(values)), dtype=dtype), values
+        )
+
+    start = days.min()
+    day_idx = (days - start).dt.days.to_numpy()
+    n_days = int(day_idx.max()) + 1
+
+    codes = df.groupby(keys, dropna=False, sort=True, observed=True).ngroup().to_numpy()
+    n_keys = int(codes.max()) + 1
+
+    key_table = (
+        df[keys]
+        .assign(_code=codes)
+        .drop_duplicates("_code")
+        .sort_values("_code")
+        .drop(columns="_code")
+        .reset_index(drop=True)
+    )
+
+    for col in keys:
+        if isinstance(key_table[col].dtype, pd.CategoricalDtype):
+            key_table[col] = key_table[col].astype(object)
+
+    flat = codes * n_days + day_idx
+    cum = np.zeros((n_keys, n_days + 1, len(values)), dtype=dtype)
+    integral = np.issubdtype(np.dtype(dtype), np.integer)
+
+    for i, col in enumerate(values):
+        if col in df.columns:
+            weights = pd.to_numeric(df[col], errors="coerce").fillna(0).to_numpy()
+        else:
+            weights = None
+
+        daily = np.bincount(
+            flat, weights=weights, minlength=n_keys * n_days
+        ).reshape(n_keys, n_days)
+        daily = np.cumsum(daily, axis=1)
+        cum[:, 1:, i] = np.rint(daily) if integral else daily
+
+    return ShipmentTensor(key_table, start, cum, values)
+
+
+# =================================================
+# BUILDERS (PER ACCOUNT)
+# =================================================
+def _stem(account: str, kind: str) -> Path:
+    return TENSOR_DIR / f"{account.lower()}.{kind}"
+
+
+def build_fc_tensor(conn, account: str) -> ShipmentTensor:
+    """
+    sku x FC x channel daily tensor from the shipments table.
+    """
+
+    daily = pd.read_sql(
+        FC_DAILY_SQL,
+        conn,
+        params={"account": account.lower(), "max_days": TENSOR_MAX_DAYS},
+    )
+
+    # Shipped quantities and line counts are whole numbers
+    return build_shipment_tensor(
+        daily, FC_KEYS, FC_VALUES, date_col="day", dtype=np.int32
+    )
+
+
+def build_state_tensor(path) -> ShipmentTensor:
+    """
+    sku x shipping state daily tensor from the shipments export.
+    """
+
+    shipments = read_shipments(
+        path,
+        columns=["Merchant SKU", "Shipped Quantity", "Shipment Date", "Shipping State", "Item Price"],
+    )
+    # Cumulative Item Price runs into crores: kept in float64
+    return build_shipment_tensor(
+        shipments, STATE_KEYS, STATE_VALUES, date_col="Shipment Date", dtype=np.float64
+    )
+
+
+def _last_shipment_batch(conn, account: str):
+    try:
+        return conn.execute(LAST_BATCH_SQL, {"account": account.lower()}).scalar()
+    except Exception:
+        # ingest_batches not created yet (no upload since it was added)
+        conn.rollback()
+        return None
+
+
+def refresh_fc_tensor(conn, account: str) -> ShipmentTensor:
+    """
+    Rebuilds + persists the FC tensor (called at ingest).
+    """
+
+    tensor = build_fc_tensor(conn, account)
+    tensor.save(_stem(account, "fc"), stamp=_last_shipment_batch(conn, account))
+    return tensor
+
+
+def refresh_state_tensor(account: str, path=None) -> Optional[ShipmentTensor]:
+    """
+    Rebuilds + persists the state tensor of an account's export
+    (called at ingest). None when the export is missing.
+    """
+
+    path = Path(path or SHIPMENT_FILES[account.lower()])
+    if not path.exists():
+        return None
+
+    tensor = build_state_tensor(path)
+    tensor.save(_stem(account, "state"), stamp=file_fingerprint(path))
+    return tensor
+
+
+# =================================================
+# PIPELINE STAGES
+# =================================================
+# The FC tensor follows the shipments table: the persisted copy is used
+# while its stamp matches the latest shipments ingest batch, otherwise
+# it is rebuilt from one per-day aggregate query.
+
+@stage("fc_tensor", params=("account",), ttl=SOURCE_TTL_SECONDS)
+def _fc_tensor_stage(account: str) -> ShipmentTensor:
+    engine = get_engine()
+
+    with engine.connect() as conn:
+        stamp = _last_shipment_batch(conn, account)
+        tensor, saved = ShipmentTensor.load(_stem(account, "fc"))
+
+        if tensor is not None and stamp is not None and saved == stamp:
+            return tensor
+
+        tensor = build_fc_tensor(conn, account)
+
+    try:
+        tensor.save(_stem(account, "fc"), stamp=stamp)
+    except OSError as e:
+        print("⚠️ SHIPMENT TENSOR SAVE FAILED:", e)
+
+    return tensor
+
+
+def _state_tensor_version(account: str):
+    path = SHIPMENT_FILES.get(account.lower())
+    try:
+        return file_fingerprint(path) if path else None
+    except OSError:
+        return None
+
+
+@stage("state_tensor", params=("account",), version=_state_tensor_version)
+def _state_tensor_stage(account: str) -> Optional[ShipmentTensor]:
+    path = SHIPMENT_FILES.get(account.lower())
+
+    if path is None or not path.exists():
+        raise FileNotFoundError(f"Missing file: {path}")
+
+    fingerprint = file_fingerprint(path)
+    tensor, saved = ShipmentTensor.load(_stem(account, "state"))
+
+    if tensor is not None and saved == fingerprint:
+        return tensor
+
+    tensor = build_state_tensor(path)
+
+    try:
+        tensor.save(_stem(account, "state"), stamp=fingerprint)
+    except OSError as e:
+        print("⚠️ SHIPMENT TENSOR SAVE FAILED:", e)
+
+    return tensor
+
+
+def fc_tensor(account: str) -> ShipmentTensor:
+    """
+    sku x FC x channel daily tensor of an account (shared, read-only).
+    """
+
+    return run_stage("fc_tensor", account=account.lower())
+
+
+def state_tensor(account: str) -> ShipmentTensor:
+    """
+    sku x shipping state daily tensor of an account (shared, read-only).
+    """
+
+    return run_stage("state_tensor", account=account.lower())
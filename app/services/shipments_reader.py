@@ -0,0 +1,122 @@
+from pathlib import Path
+from typing import Iterator, Optional, Sequence
+
+import pandas as pd
+
+from app.services.input_cache import cached_frame
+
+
+# =================================================
+# CONFIG
+# =================================================
+# The FBA shipments export has ~48 columns (buyer, address, tracking,
+# titles ...). The engines only use these.
+CORE_COLUMNS = [
+    "Merchant SKU",
+    "Shipped Quantity",
+    "Shipment Date",
+    "FC",
+    "Sales Channel",
+    "Shipping State",
+    "Item Price",
+]
+
+# Extra columns kept for DB ingestion (dedupe key + high-water mark)
+INGEST_COLUMNS = ["Shipment Item Id", "Reporting Date"] + CORE_COLUMNS
+
+CATEGORY_COLUMNS = ("Merchant SKU", "FC", "Sales Channel", "Shipping State")
+NUMERIC_COLUMNS = ("Shipped Quantity", "Item Price")
+DATE_COLUMNS = ("Shipment Date", "Reporting Date")
+
+# Export timestamps carry a +05:30 offset; they are stored as naive
+# local (IST) datetime64 so day boundaries match the report.
+REPORT_TZ = "Asia/Kolkata"
+
+DEFAULT_CHUNK_ROWS = 100_000
+
+
+# =================================================
+# TYPING
+# =================================================
+def _read_kwargs(columns: Sequence[str]) -> dict:
+    wanted = set(columns)
+
+    return {
+        # Header names sometimes carry stray spaces
+        "usecols": lambda c: c.strip() in wanted,
+        "dtype": {c: "category" for c in CATEGORY_COLUMNS if c in wanted},
+    }
+
+
+def parse_report_dates(values: pd.Series) -> pd.Series:
+    """
+    ISO timestamps (with offset) -> naive datetime64[ns] in REPORT_TZ.
+    Unparseable values become NaT.
+    """
+
+    parsed = pd.to_datetime(values, errors="coerce", utc=True, format="ISO8601")
+    return parsed.dt.tz_convert(REPORT_TZ).dt.tz_localize(None).astype("datetime64[ns]")
+
+
+def _apply_types(df: pd.DataFrame) -> pd.DataFrame:
+    df.columns = df.columns.str.strip()
+
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = parse_report_dates(df[col])
+
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and df[col].dtype != "category":
+            df[col] = df[col].astype("category")
+
+    return df
+
+
+def _check_columns(df: pd.DataFrame, columns: Sequence[str], path):
+    missing = [c for c in columns if c not in df.columns]
+    if missing:
+        raise ValueError(f"Missing column(s) in shipments file {path}: {missing}")
+
+
+# =================================================
+# PUBLIC READERS
+# =================================================
+def read_shipments(path, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Reads an FBA shipments CSV with only `columns` (default CORE_COLUMNS):
+    SKU / FC / channel / state as categoricals, quantities and prices
+    numeric, dates parsed once. Cached on the file fingerprint.
+    """
+
+    columns = list(columns or CORE_COLUMNS)
+
+    def build(p: Path) -> pd.DataFrame:
+        df = _apply_types(pd.read_csv(p, **_read_kwargs(columns)))
+        _check_columns(df, columns, p)
+        return df[columns]
+
+    return cached_frame(path, f"shipments:{columns}", build)
+
+
+def iter_shipments(
+    path,
+    columns: Optional[Sequence[str]] = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> Iterator[pd.DataFrame]:
+    """
+    Chunked variant of read_shipments for files too large to hold at once.
+    Chunks are typed the same way (categories differ per chunk) and are
+    not cached.
+    """
+
+    columns = list(columns or CORE_COLUMNS)
+
+    with pd.read_csv(path, chunksize=chunk_rows, **_read_kwargs(columns)) as reader:
+        for chunk in reader:
+            chunk = _apply_types(chunk)
+            _check_columns(chunk, columns, path)
+            yield chunk[columns]
@@ -0,0 +1,254 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.services.fc_final_allocation import calculate_final_allocation
+from app.services.fc_planning import calculate_fc_plan
+from app.services.fc_transfer import calculate_fc_transfers
+from app.services.region_sales import calculate_region_sales
+from app.services.replenishment import calculate_replenishment
+from app.services.result_cache import input_version
+
+# =================================================
+# CONFIG
+# =================================================
+# Indexed result frames kept (distinct engine + parameter sets)
+MAX_SKU_INDEXES = 32
+
+# Engine -> (compute(params), {identifier kind: column})
+# Identifier kinds: "sku", "model", "asin"
+SKU_ENGINES: Dict[str, Tuple[Callable, Dict[str, str]]] = {
+    "replenishment": (
+        lambda p: calculate_replenishment(
+            sales_window=p["sales_window"],
+            replenish_weeks=p["replenish_weeks"],
+            account=p["account"].upper(),
+        ),
+        {"sku": "SKU", "model": "model", "asin": "ASIN"},
+    ),
+    "fc_plan": (
+        lambda p: calculate_fc_plan(
+            replenish_weeks=p["replenish_weeks"],
+            channel=p["channel"],
+            account=p["account"],
+            window_days=p["window_days"],
+        ),
+        {"sku": "sku"},
+    ),
+    "fc_transfers": (
+        lambda p: calculate_fc_transfers(
+            replenish_weeks=p["replenish_weeks"],
+            channel=p["channel"],
+            account=p["account"],
+            window_days=p["window_days"],
+        ),
+        {"sku": "sku"},
+    ),
+    "final_allocation": (
+        lambda p: calculate_final_allocation(
+            replenish_weeks=p["replenish_weeks"],
+            channel=p["channel"],
+            account=p["account"],
+            window_days=p["window_days"],
+        ),
+        {"sku": "sku", "model": "model"},
+    ),
+    "region_sales": (
+        lambda p: calculate_region_sales(
+            account=p["account"],
+            window_days=p["region_window_days"],
+        ),
+        {"sku": "sku"},
+    ),
+}
+
+# Parameters each engine's result depends on (index key)
+ENGINE_PARAMS = {
+    "replenishment": ("sales_window", "replenish_weeks", "account"),
+    "fc_plan": ("replenish_weeks", "channel", "account", "window_days"),
+    "fc_transfers": ("replenish_weeks", "channel", "account", "window_days"),
+    "final_allocation": ("replenish_weeks", "channel", "account", "window_days"),
+    "region_sales": ("account", "region_window_days"),
+}
+
+# Engines whose rows carry several identifier kinds (used to resolve
+# a model / ASIN into SKUs and back)
+RESOLVER_ENGINES = ("replenishment", "final_allocation")
+
+
+def normalize_ids(values: pd.Series) -> pd.Series:
+    return values.astype("string").str.strip().str.upper()
+
+
+# =================================================
+# HASH INDEX OVER A RESULT FRAME
+# =================================================
+class FrameIndex:
+    """
+    normalized identifier -> row positions, per identifier kind.
+    """
+
+    def __init__(self, df: pd.DataFrame, columns: Dict[str, str]):
+        self.df = (df if df is not None else pd.DataFrame()).reset_index(drop=True)
+        self.columns = {k: c for k, c in columns.items() if c in self.df.columns}
+        self.positions: Dict[str, Dict[str, np.ndarray]] = {}
+
+        for kind, col in self.columns.items():
+            keys = normalize_ids(self.df[col])
+            self.positions[kind] = {
+                key: rows
+                for key, rows in keys.groupby(keys, sort=False).indices.items()
+                if key
+            }
+
+    def lookup(self, ids: Dict[str, set]) -> np.ndarray:
+        """
+        Row positions matching any of ids[kind] on any indexed kind.
+        """
+
+        hits = [
+            self.positions[kind][key]
+            for kind, keys in ids.items()
+            if kind in self.positions
+            for key in keys
+            if key in self.positions[kind]
+        ]
+
+        if not hits:
+            return np.empty(0, dtype=np.int64)
+
+        return np.unique(np.concatenate(hits))
+
+    def identifiers(self, positions: np.ndarray) -> Dict[str, set]:
+        out = {}
+        for kind, col in self.columns.items():
+            values = normalize_ids(self.df[col].iloc[positions]).dropna()
+            out[kind] = {v for v in values if v}
+        return out
+
+
+# =================================================
+# INDEX STORE (ONE BUILD PER DATA VERSION)
+# =================================================
+_indexes: "OrderedDict[tuple, Tuple[tuple, FrameIndex]]" = OrderedDict()
+_lock = threading.Lock()
+# One lock per stored (or in-flight) index, dropped with it
+_build_locks: Dict[tuple, threading.Lock] = {}
+
+
+def engine_index(engine: str, params: dict, version: Optional[tuple] = None) -> FrameIndex:
+    """
+    Index over the (cached) result of an engine, rebuilt only when the
+    input version changes.
+    """
+
+    compute, columns = SKU_ENGINES[engine]
+    key = (engine, tuple((p, params[p]) for p in ENGINE_PARAMS[engine]))
+    version = version if version is not None else input_version()
+
+    with _lock:
+        build_lock = _build_locks.setdefault(key, threading.Lock())
+
+    with build_lock:
+        with _lock:
+            cached = _indexes.get(key)
+            if cached is not None and cached[0] == version:
+                _indexes.move_to_end(key)
+                return cached[1]
+
+        try:
+            index = FrameIndex(compute(params), columns)
+        except BaseException:
+            with _lock:
+                if key not in _indexes:
+                    _build_locks.pop(key, None)
+            raise
+
+        with _lock:
+            _indexes[key] = (version, index)
+            _indexes.move_to_end(key)
+            while len(_indexes) > MAX_SKU_INDEXES:
+                evicted, _ = _indexes.popitem(last=False)
+                _build_locks.pop(evicted, None)
+
+    return index
+
+
+# =================================================
+# SKU 360
+# =================================================
+def sku_360(
+    identifier: str,
+    params: dict,
+    engines: Iterable[str] = tuple(SKU_ENGINES),
+) -> dict:
+    """
+    Rows of one SKU (or model / ASIN) from every engine.
+
+    The identifier is first resolved through the engines carrying
+    several identifier kinds (replenishment: SKU / model / ASIN,
+    final allocation: SKU / model), then every engine's index is
+    probed with the resolved set.
+
+    Returns {"resolved": {kind: [...]}, "frames": {engine: df},
+    "errors": {engine: message}, "timings_ms": {engine: ms}}.
+    """
+
+    query = str(identifier).strip().upper()
+    ids = {"sku": {query}, "model": {query}, "asin": {query}}
+
+    indexes: Dict[str, Optional[FrameIndex]] = {}
+    errors: Dict[str, str] = {}
+    timings: Dict[str, float] = {}
+
+    version = input_version()
+
+    for engine in engines:
+        start = time.perf_counter()
+        try:
+            indexes[engine] = engine_index(engine, params, version)
+        except Exception as e:
+            print(f"⚠️ SKU INDEX {engine} FAILED:", e)
+            indexes[engine] = None
+            errors[engine] = str(e)
+        timings[engine] = round((time.perf_counter() - start) * 1000, 2)
+
+    # -------------------------------------------------
+    # Resolve model / ASIN <-> SKU
+    # -------------------------------------------------
+    resolved = {kind: set(values) for kind, values in ids.items()}
+
+    for engine in RESOLVER_ENGINES:
+        index = indexes.get(engine)
+        if index is None:
+            continue
+
+        for kind, values in index.identifiers(index.lookup(ids)).items():
+            resolved[kind] |= values
+
+    # -------------------------------------------------
+    # Probe every engine
+    # -------------------------------------------------
+    frames = {}
+    found = {"sku": set(), "model": set(), "asin": set()}
+
+    for engine, index in indexes.items():
+        if index is None:
+            continue
+
+        positions = index.lookup(resolved)
+        frames[engine] = index.df.iloc[positions]
+
+        for kind, values in index.identifiers(positions).items():
+            found[kind] |= values
+
+    return {
+        "resolved": {kind: sorted(values) for kind, values in found.items()},
+        "frames": frames,
+        "errors": errors,
+        "timings_ms": timings,
+    }
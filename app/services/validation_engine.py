@@ -22,20 +22,43 @@ def _check_no_negative(df: pd.DataFrame, cols: list) -> Dict:
     return {"passed": len(issues) == 0, "issues": issues}
 
 
+def _negative_check(negative_rows: int, col: str) -> Dict:
+    issues = [f"Negative values found in {col}"] if negative_rows else []
+    return {"passed": len(issues) == 0, "issues": issues}
+
+
 # ==========================================================
 # SHIPMENT VALIDATION
 # ==========================================================
+# Validators accept either the raw frame or a pre-aggregated summary
+# (see load_fc_data, which aggregates in SQL).
+
+def summarize_shipments(shipments: pd.DataFrame) -> Dict[str, Any]:
+    return {
+        "row_count": len(shipments),
+        "total_units": shipments["Shipped Quantity"].sum(),
+        "unique_skus": shipments["sku"].nunique(),
+        "min_date": shipments["Shipment Date"].min(),
+        "max_date": shipments["Shipment Date"].max(),
+        "negative_rows": int((shipments["Shipped Quantity"] < 0).sum()),
+    }
+
+
+def validate_shipments(shipments) -> Dict[str, Any]:
+    summary = (
+        shipments if isinstance(shipments, dict)
+        else summarize_shipments(shipments)
+    )
 
-def validate_shipments(shipments: pd.DataFrame) -> Dict[str, Any]:
     report = {}
 
-    report["row_count"] = len(shipments)
-    report["total_units"] = shipments["Shipped Quantity"].sum()
-    report["unique_skus"] = shipments["sku"].nunique()
-    report["min_date"] = shipments["Shipment Date"].min()
-    report["max_date"] = shipments["Shipment Date"].max()
+    report["row_count"] = summary["row_count"]
+    report["total_units"] = summary["total_units"]
+    report["unique_skus"] = summary["unique_skus"]
+    report["min_date"] = summary["min_date"]
+    report["max_date"] = summary["max_date"]
 
-    numeric_check = _check_no_negative(shipments, ["Shipped Quantity"])
+    numeric_check = _negative_check(summary["negative_rows"], "Shipped Quantity")
 
     report["numeric_integrity"] = numeric_check
     report["status"] = "PASS" if numeric_check["passed"] else "FAIL"
@@ -47,16 +70,30 @@ def validate_shipments(shipments: pd.DataFrame) -> Dict[str, Any]:
 # LEDGER VALIDATION
 # ==========================================================
 
-def validate_ledger(ledger: pd.DataFrame) -> Dict[str, Any]:
+def summarize_ledger(ledger: pd.DataFrame) -> Dict[str, Any]:
+    return {
+        "row_count": len(ledger),
+        "total_inventory": ledger["Ending Warehouse Balance"].sum(),
+        "unique_skus": ledger["MSKU"].nunique(),
+        "negative_rows": int((ledger["Ending Warehouse Balance"] < 0).sum()),
+    }
+
+
+def validate_ledger(ledger) -> Dict[str, Any]:
+    summary = (
+        ledger if isinstance(ledger, dict)
+        else summarize_ledger(ledger)
+    )
+
     report = {}
 
-    report["row_count"] = len(ledger)
-    report["total_inventory"] = ledger["Ending Warehouse Balance"].sum()
-    report["unique_skus"] = ledger["MSKU"].nunique()
+    report["row_count"] = summary["row_count"]
+    report["total_inventory"] = summary["total_inventory"]
+    report["unique_skus"] = summary["unique_skus"]
 
-    numeric_check = _check_no_negative(
-        ledger,
-        ["Ending Warehouse Balance"]
+    numeric_check = _negative_check(
+        summary["negative_rows"],
+        "Ending Warehouse Balance"
     )
 
     report["numeric_integrity"] = numeric_check
@@ -124,8 +161,8 @@ def validate_fc_plan(df: pd.DataFrame) -> Dict[str, Any]:
 # ==========================================================
 
 def run_full_validation(
-    shipments: pd.DataFrame,
-    ledger: pd.DataFrame,
+    shipments,
+    ledger,
     fc_plan: pd.DataFrame,
 ) -> Dict[str, Any]:
 
@@ -1,50 +1,113 @@
+import os
+import time
 import uuid
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 
-from app.persistence.readers import (
+from app.core.persistence.readers import (
     load_outward_shipments,
     load_inventory_ledger,
     load_sales_velocity,
     load_b2b_inventory,
 )
-from app.persistence.writers import (
+from app.core.persistence.writers import (
     create_replenishment_run,
     write_replenishment_lines,
     update_run_status,
 )
 
-from app.validation.invoice_checks import (
+from app.core.validation.invoice_checks import (
     validate_invoice_duplicates,
     validate_invoice_quantities,
 )
-from app.validation.stock_checks import validate_inventory_ledger
-from app.validation.reconciliation import reconcile_replenishment_vs_stock
+from app.core.validation.stock_checks import validate_inventory_ledger
+from app.core.validation.reconciliation import reconcile_replenishment_vs_stock
 
-from app.calculations.net_inventory import compute_net_inventory
-from app.calculations.demand import (
+from app.core.calculations.net_inventory import compute_net_inventory
+from app.core.calculations.demand import (
     compute_avg_weekly_sales,
     compute_requirement,
 )
-from app.calculations.replenishment import compute_replenishment
+from app.core.calculations.replenishment import compute_replenishment
 
 
 # -------------------------------------------------
-# MAIN WEEKLY RUNNER
+# CONFIG
 # -------------------------------------------------
-def run_weekly_replenishment(
+# Default process pool size for batch runs
+WEEKLY_RUN_WORKERS = int(os.getenv("WEEKLY_RUN_WORKERS", 4))
+
+
+# -------------------------------------------------
+# SHARED INPUTS
+# -------------------------------------------------
+def sales_weeks(week: str) -> list:
+    """
+    Sales weeks of a run: last 8 weeks incl. current.
+    """
+
+    year, wk = week.split("-")
+    wk = int(wk)
+    return [
+        f"{year}-{str(w).zfill(2)}"
+        for w in range(wk - 7, wk + 1)
+    ]
+
+
+def load_week_inputs(week: str) -> dict:
+    """
+    All DB inputs of a run. They depend on the week only, so brands
+    planned for the same week share one read.
+    """
+
+    return {
+        "outward": load_outward_shipments(week),
+        "ledger": load_inventory_ledger(week),
+        "sales": load_sales_velocity(sales_weeks(week)),
+        "b2b": load_b2b_inventory(week),
+    }
+
+
+# -------------------------------------------------
+# SINGLE RUN
+# -------------------------------------------------
+def execute_run(
     brand: str,
     week: str,
     target_weeks: int = 2,
-):
+    inputs: dict | None = None,
+) -> dict:
     """
-    Executes one full weekly replenishment run.
+    Executes one full weekly replenishment run with its own run_id.
+    inputs: pre-loaded load_week_inputs(week) (read here when None).
+
+    Never raises - returns a summary:
+    run_id, brand, week, status (locked / blocked), error, timings.
     """
 
     run_id = str(uuid.uuid4())
     print(f"\n🚀 Starting replenishment run: {run_id}")
     print(f"Brand: {brand} | Week: {week}\n")
 
+    timings = {}
+    started = time.perf_counter()
+    mark = [started]
+
+    def lap(name):
+        now = time.perf_counter()
+        timings[name] = round(now - mark[0], 3)
+        mark[0] = now
+
+    summary = {
+        "run_id": run_id,
+        "brand": brand,
+        "week": week,
+        "status": "blocked",
+        "error": None,
+        "timings": timings,
+    }
+
     try:
         # -----------------------------------------
         # CREATE RUN
@@ -54,19 +117,14 @@ def run_weekly_replenishment(
         # -----------------------------------------
         # INGEST DATA
         # -----------------------------------------
-        outward_df = load_outward_shipments(week)
-        ledger_df = load_inventory_ledger(week)
-
-        # last 8 weeks incl current
-        year, wk = week.split("-")
-        wk = int(wk)
-        weeks = [
-            f"{year}-{str(w).zfill(2)}"
-            for w in range(wk - 7, wk + 1)
-        ]
+        if inputs is None:
+            inputs = load_week_inputs(week)
 
-        sales_df = load_sales_velocity(weeks)
-        b2b_df = load_b2b_inventory(week)
+        outward_df = inputs["outward"]
+        ledger_df = inputs["ledger"]
+        sales_df = inputs["sales"]
+        b2b_df = inputs["b2b"]
+        lap("ingest")
 
         # -----------------------------------------
         # VALIDATION LAYER
@@ -75,6 +133,7 @@ def run_weekly_replenishment(
         validate_invoice_quantities(outward_df)
 
         validate_inventory_ledger(ledger_df)
+        lap("validation")
 
         # -----------------------------------------
         # CALCULATIONS
@@ -102,6 +161,7 @@ def run_weekly_replenishment(
             net_available_df=net_inventory_df,
             replenishment_df=replenishment_df,
         )
+        lap("calculations")
 
         # -----------------------------------------
         # WRITE OUTPUT
@@ -109,6 +169,9 @@ def run_weekly_replenishment(
         write_replenishment_lines(run_id, replenishment_df)
 
         update_run_status(run_id, "locked")
+        lap("write")
+
+        summary["status"] = "locked"
 
         print("\n✅ Replenishment run completed successfully")
         print(f"Run ID: {run_id}")
@@ -117,14 +180,118 @@ def run_weekly_replenishment(
         print("\n❌ Replenishment run FAILED")
         print(str(e))
 
+        summary["error"] = str(e)
+
         try:
             update_run_status(run_id, "blocked")
         except Exception:
             pass
 
+    timings["total"] = round(time.perf_counter() - started, 3)
+    return summary
+
+
+# -------------------------------------------------
+# MAIN WEEKLY RUNNER
+# -------------------------------------------------
+def run_weekly_replenishment(
+    brand: str,
+    week: str,
+    target_weeks: int = 2,
+):
+    """
+    Executes one full weekly replenishment run.
+    """
+
+    summary = execute_run(brand, week, target_weeks=target_weeks)
+
+    if summary["status"] != "locked":
         sys.exit(1)
 
 
+# -------------------------------------------------
+# BATCH RUNNER (MANY BRANDS / WEEKS)
+# -------------------------------------------------
+def run_weekly_batch(
+    brands: list,
+    weeks: list,
+    target_weeks: int = 2,
+    workers: int = WEEKLY_RUN_WORKERS,
+) -> list:
+    """
+    Runs every brand x week combination across a process pool.
+
+    1. Inputs of each distinct week are read once (in parallel).
+    2. Runs execute in parallel, each with its own run_id and
+       locked / blocked status. A week whose inputs failed to load
+       is retried inside its runs, so the failure lands on them.
+    """
+
+    batch_started = time.perf_counter()
+    weeks = list(dict.fromkeys(weeks))
+    jobs = [(brand, week) for week in weeks for brand in brands]
+
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+
+        # -----------------------------------------
+        # SHARED READS (ONE PER WEEK)
+        # -----------------------------------------
+        loads = {pool.submit(load_week_inputs, week): week for week in weeks}
+        week_inputs = {}
+
+        for future in as_completed(loads):
+            week = loads[future]
+            try:
+                week_inputs[week] = future.result()
+            except Exception as e:
+                print(f"⚠️ INPUT LOAD FAILED FOR {week}:", e)
+                week_inputs[week] = None
+
+        # -----------------------------------------
+        # RUNS
+        # -----------------------------------------
+        futures = [
+            pool.submit(
+                execute_run,
+                brand,
+                week,
+                target_weeks,
+                week_inputs[week],
+            )
+            for brand, week in jobs
+        ]
+
+        results = [f.result() for f in futures]
+
+    print_batch_summary(results, time.perf_counter() - batch_started)
+    return results
+
+
+def print_batch_summary(results: list, wall_seconds: float):
+    print("\n📊 Weekly batch summary")
+    print(
+        f"{'BRAND':<16}{'WEEK':<10}{'STATUS':<9}"
+        f"{'INGEST':>8}{'VALID':>8}{'CALC':>8}{'WRITE':>8}{'TOTAL':>8}  RUN ID"
+    )
+
+    for r in results:
+        t = r["timings"]
+        print(
+            f"{r['brand']:<16}{r['week']:<10}{r['status']:<9}"
+            + "".join(
+                f"{t.get(k, 0):>8.2f}"
+                for k in ("ingest", "validation", "calculations", "write", "total")
+            )
+            + f"  {r['run_id']}"
+        )
+
+        if r["error"]:
+            print(f"    ↳ {r['error']}")
+
+    serial = sum(r["timings"]["total"] for r in results)
+    print(f"\nWall time: {wall_seconds:.2f}s | Sum of runs: {serial:.2f}s")
+
+
 # -------------------------------------------------
 # CLI ENTRYPOINT
 # -------------------------------------------------
@@ -132,15 +299,46 @@ if __name__ == "__main__":
     """
     Example:
     python run_weekly.py Nexlev 2026-05 2
+    python run_weekly.py --batch Nexlev,Viomi 2026-05,2026-06 2 --workers=4
     """
 
-    if len(sys.argv) < 3:
+    args = [a for a in sys.argv[1:] if not a.startswith("--workers=")]
+    workers = next(
+        (int(a.split("=", 1)[1]) for a in sys.argv[1:] if a.startswith("--workers=")),
+        WEEKLY_RUN_WORKERS,
+    )
+
+    if args and args[0] == "--batch":
+        if len(args) < 3:
+            print(
+                "Usage: python run_weekly.py --batch <BRAND,BRAND..> "
+                "<YYYY-WW,YYYY-WW..> [TARGET_WEEKS] [--workers=N]"
+            )
+            sys.exit(1)
+
+        brands = [b.strip() for b in args[1].split(",") if b.strip()]
+        weeks = [w.strip() for w in args[2].split(",") if w.strip()]
+        target_weeks = int(args[3]) if len(args) > 3 else 2
+
+        results = run_weekly_batch(
+            brands=brands,
+            weeks=weeks,
+            target_weeks=target_weeks,
+            workers=workers,
+        )
+
+        if any(r["status"] != "locked" for r in results):
+            sys.exit(1)
+
+        sys.exit(0)
+
+    if len(args) < 2:
         print("Usage: python run_weekly.py <BRAND> <YYYY-WW> [TARGET_WEEKS]")
         sys.exit(1)
 
-    brand = sys.argv[1]
-    week = sys.argv[2]
-    target_weeks = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+    brand = args[0]
+    week = args[1]
+    target_weeks = int(args[2]) if len(args) > 2 else 2
 
     run_weekly_replenishment(
         brand=brand,
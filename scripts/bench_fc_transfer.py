@@ -0,0 +1,171 @@
+"""
+Benchmark + equivalence check for the FC transfer engine.
+
+    python scripts/bench_fc_transfer.py
+    python scripts/bench_fc_transfer.py --sizes 1000 10000 100000 --reference-max 20000
+
+For every size a synthetic FC plan (sku x FC rows, 2-decimal values like
+calculate_fc_plan) is built. build_fc_transfers is timed; up to
+--reference-max rows the former per-SKU iterrows loop runs as well and
+the transfer lines are compared.
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.services.fc_transfer import build_fc_transfers
+
+FCS = [
+    "BLR7", "BLR8", "BOM5", "BOM7", "CCX1", "CJB1", "DED4", "DEL4",
+    "DEL5", "HYD3", "HYD8", "LKO1", "MAA4", "PNQ3", "CCU1", "AMD2",
+]
+
+
+# =================================================
+# SYNTHETIC PLAN
+# =================================================
+def make_plan(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+
+    fcs_per_sku = len(FCS)
+    n_skus = max(1, rows // fcs_per_sku)
+
+    sku = np.repeat([f"FBA{80000 + i}" for i in range(n_skus)], fcs_per_sku)[:rows]
+    fc = np.tile(FCS, n_skus)[:rows]
+
+    # Units sold over 90 days -> weekly velocity, like the planning engine
+    units = rng.poisson(rng.choice([0, 2, 8, 30], size=len(sku)))
+    weekly_velocity = np.round(units / 12.857, 2)
+    required = np.round(weekly_velocity * 8, 2)
+    inventory = rng.poisson(required * rng.choice([0.0, 0.5, 1.0, 2.5], size=len(sku))).astype(float)
+
+    return pd.DataFrame({
+        "sku": sku,
+        "fulfillment_center": fc,
+        "weekly_velocity": weekly_velocity,
+        "fc_inventory": inventory,
+        "required_units": required,
+        "fc_shortfall": np.round(np.clip(required - inventory, 0, None), 2),
+    })
+
+
+# =================================================
+# REFERENCE (former nested iterrows loop)
+# =================================================
+def reference_transfers(df: pd.DataFrame) -> pd.DataFrame:
+    transfers = []
+
+    df["excess"] = (df["fc_inventory"] - df["required_units"]).clip(lower=0)
+
+    for sku in df["sku"].unique():
+
+        sku_df = df[df["sku"] == sku].copy()
+
+        shortage_fcs = (
+            sku_df[sku_df["fc_shortfall"] > 0]
+            .sort_values("fc_shortfall", ascending=False)
+        )
+
+        excess_fcs = (
+            sku_df[sku_df["excess"] > 0]
+            .sort_values("excess", ascending=False)
+        )
+
+        for s_idx, short_row in shortage_fcs.iterrows():
+
+            remaining_shortage = short_row["fc_shortfall"]
+
+            for e_idx, excess_row in excess_fcs.iterrows():
+
+                if remaining_shortage <= 0:
+                    break
+
+                available_excess = df.loc[e_idx, "excess"]
+
+                transfer_qty = min(available_excess, remaining_shortage)
+
+                if transfer_qty > 0:
+                    transfers.append(
+                        {
+                            "sku": sku,
+                            "from_fc": excess_row["fulfillment_center"],
+                            "to_fc": short_row["fulfillment_center"],
+                            "transfer_qty": int(round(transfer_qty, 0)),
+                        }
+                    )
+
+                    df.loc[e_idx, "excess"] -= transfer_qty
+                    remaining_shortage -= transfer_qty
+
+    df_transfer = pd.DataFrame(transfers)
+
+    if not df_transfer.empty:
+        df_transfer = (
+            df_transfer
+            .groupby(["sku", "from_fc", "to_fc"], as_index=False)
+            .agg(transfer_qty=("transfer_qty", "sum"))
+        )
+
+    return df_transfer
+
+
+def compare(reference: pd.DataFrame, vectorized: pd.DataFrame) -> dict:
+    keys = ["sku", "from_fc", "to_fc"]
+
+    merged = reference.merge(
+        vectorized, on=keys, how="outer", suffixes=("_ref", "_new"), indicator=True
+    )
+    diff = merged[merged["transfer_qty_ref"].ne(merged["transfer_qty_new"])]
+
+    # The float loop can leave sub-cent excess behind and emit 0-unit
+    # lines from it; integer hundredths do not.
+    residue = diff[(diff["_merge"] == "left_only") & (diff["transfer_qty_ref"] == 0)]
+
+    return {
+        "lines": len(reference),
+        "mismatches": len(diff) - len(residue),
+        "zero_qty_residue_lines": len(residue),
+    }
+
+
+# =================================================
+# MAIN
+# =================================================
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000, 100_000])
+    parser.add_argument("--reference-max", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'vectorized ms':>14} {'us/row':>8} {'reference ms':>13}  check")
+
+    for rows in args.sizes:
+        plan = make_plan(rows)
+
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = build_fc_transfers(plan.copy())
+            timings.append(time.perf_counter() - start)
+
+        best = min(timings)
+        ref_ms = "-"
+        check = "skipped"
+
+        if rows <= args.reference_max:
+            start = time.perf_counter()
+            reference = reference_transfers(plan.copy())
+            ref_ms = f"{(time.perf_counter() - start) * 1000:.0f}"
+            check = compare(reference, result)
+
+        print(
+            f"{rows:>8} {best * 1000:>14.1f} {best / rows * 1e6:>8.2f} {ref_ms:>13}  {check}"
+        )
+
+
+if __name__ == "__main__":
+    main()
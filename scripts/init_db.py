@@ -1,7 +1,7 @@
-from sqlalchemy import create_engine, text
-from app.config import DATABASE_URL
+from sqlalchemy import text
+from app.db import get_engine
 
-engine = create_engine(DATABASE_URL)
+engine = get_engine()
 
 DDL = """
 -- ===============================
@@ -17,6 +17,9 @@ CREATE TABLE IF NOT EXISTS outward_shipments (
     week TEXT
 );
 
+CREATE UNIQUE INDEX IF NOT EXISTS ux_outward_shipments_line
+    ON outward_shipments (invoice_no, sku, fc);
+
 CREATE TABLE IF NOT EXISTS inventory_ledger (
     sku TEXT,
     fc TEXT,